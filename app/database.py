@@ -1,12 +1,149 @@
+import os
+import logging
+from typing import Callable
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy import event, inspect, text
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 
-DATABASE_URL = "postgresql://user:password@db:5432/project_db"
+from app.utils.pool_metrics import PoolMetrics, instrumented_pool_class
 
-engine = create_engine(DATABASE_URL, echo=True)
+logger = logging.getLogger(__name__)
+
+DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://user:password@db:5432/project_db")
+# 비동기 라우터용 (asyncpg 드라이버)
+ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+# 커넥션 풀 설정 (워커 수에 맞춰 환경 변수로 조정)
+# 동기/비동기 엔진이 각각 풀을 가지므로 워커당 최대 연결 수는 2 * (POOL_SIZE + MAX_OVERFLOW)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # 초 단위, -1이면 재활용 안 함
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# SQL 로그 출력은 부하가 크므로 기본 비활성화 (디버깅 시 DB_ECHO=true)
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
+pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
+
+_pool_kwargs = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+
+engine = create_engine(
+    DATABASE_URL,
+    echo=DB_ECHO,
+    poolclass=instrumented_pool_class(QueuePool, pool_metrics),
+    **_pool_kwargs
+)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=DB_ECHO,
+    poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, async_pool_metrics),
+    **_pool_kwargs
+)
+
+# commit 후에도 객체 속성을 그대로 읽을 수 있도록 expire_on_commit=False
+# (비동기 세션에서는 만료된 속성 접근 시 lazy load가 일어나면 에러가 남)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
 def get_db():
     with Session(engine) as session:
         yield session
 
+async def get_async_db():
+    """async def 라우터 전용 세션 (이벤트 루프를 막지 않음)"""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+def run_after_commit(session: AsyncSession, callback: Callable[[], None]):
+    """
+    현재 트랜잭션이 커밋된 직후 callback 실행 (롤백되면 버림)
+    callback은 커밋 처리 중에 동기로 호출되므로 await 없이 끝나는 작업만 넣을 것
+    """
+    _transaction_callbacks(session, "after_commit_callbacks").append(callback)
+
+def run_after_rollback(session: AsyncSession, callback: Callable[[], None]):
+    """
+    현재 트랜잭션이 롤백된 직후 callback 실행 (커밋되면 버림)
+    커밋 전에 미리 해 둔 작업(파일 이동 등)을 되돌릴 때 사용 - run_after_commit과 같은 제약
+    """
+    _transaction_callbacks(session, "after_rollback_callbacks").append(callback)
+
+def _transaction_callbacks(session: AsyncSession, key: str) -> list:
+    sync_session = session.sync_session
+    if "after_commit_callbacks" not in sync_session.info:
+        sync_session.info["after_commit_callbacks"] = []
+        sync_session.info["after_rollback_callbacks"] = []
+        event.listen(sync_session, "after_commit", _on_commit)
+        event.listen(sync_session, "after_rollback", _on_rollback)
+    return sync_session.info[key]
+
+def _on_commit(sync_session):
+    sync_session.info["after_rollback_callbacks"].clear()
+    _run_callbacks(sync_session.info["after_commit_callbacks"])
+
+def _on_rollback(sync_session):
+    sync_session.info["after_commit_callbacks"].clear()
+    _run_callbacks(sync_session.info["after_rollback_callbacks"])
+
+def _run_callbacks(callbacks: list):
+    pending, callbacks[:] = list(callbacks), []
+    for callback in pending:
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"[Database] Transaction callback failed: {e}")
+
+def get_pool_stats():
+    """풀 사이징용 지표 (체크아웃 수, overflow, 대기 시간)"""
+    return {
+        "sync": pool_metrics.snapshot(engine.pool),
+        "async": async_pool_metrics.snapshot(async_engine.sync_engine.pool),
+    }
+
 def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
\ No newline at end of file
+    SQLModel.metadata.create_all(engine)
+    # create_all은 이미 있는 테이블에 새로 추가된 컬럼/인덱스는 만들지 않으므로 따로 확인
+    _add_missing_columns()
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+    _drop_obsolete_indexes()
+
+# 복합 인덱스로 대체되어 더 이상 쓰지 않는 인덱스 (기존 DB에서 쓰기 비용만 늘리므로 시작 시 삭제)
+OBSOLETE_INDEXES = [
+    "ix_files_project_id",        # -> ix_files_project_id_id
+    "ix_files_filename",          # -> ix_files_project_id_filename
+    "ix_file_versions_file_id",   # -> ix_file_versions_file_id_version
+    "ix_chat_messages_project_id",  # -> ix_chat_messages_project_id_id
+]
+
+def _drop_obsolete_indexes():
+    with engine.begin() as conn:
+        for name in OBSOLETE_INDEXES:
+            conn.execute(text(f'DROP INDEX IF EXISTS "{name}"'))
+
+def _add_missing_columns():
+    """기존 테이블에 없는 nullable 컬럼만 ALTER TABLE로 추가 (NOT NULL 컬럼은 직접 마이그레이션 필요)"""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    logger.warning(f"[Database] Column {table.name}.{column.name} is missing and NOT NULL, skipped")
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+                logger.info(f"[Database] Added column {table.name}.{column.name}")
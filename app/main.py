@@ -1,7 +1,14 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
-from app.database import create_db_and_tables
+from app.database import create_db_and_tables, async_engine, get_pool_stats
+from app.utils.session_cache import activity_tracker
+from app.utils.board_cache import board_cache
+from app.utils.backplane import backplane
+from app.utils.presence import presence_registry
+from app.utils.chat_writer import chat_writer
+from app.utils.file_storage import upload_session_sweeper
+from app.utils.thumbnails import thumbnail_generator
 import time
 import asyncio
 from fastapi.staticfiles import StaticFiles
@@ -59,9 +66,34 @@ async def lifespan(app: FastAPI):
             print("❌ [VectorWave] Failed to connect after multiple attempts.", flush=True)
             print("   -> Weaviate 컨테이너 로그를 확인해보세요.", flush=True)
 
+    # 3. last_active_at 일괄 반영 작업 시작
+    activity_tracker.start()
+
+    # 4. 실시간 이벤트 backplane 연결 (여러 워커 간 이벤트 전달)
+    await backplane.start()
+
+    # 5. 온라인 상태 관리 (오프라인 판정, 다른 워커와 공유)
+    presence_registry.start()
+
+    # 6. 채팅 메시지 일괄 저장 작업 시작
+    chat_writer.start()
+
+    # 7. 중단된 이어받기 업로드 정리 작업 시작
+    upload_session_sweeper.start()
+
+    # 8. 썸네일 생성 작업 시작 (이전에 끝나지 않은 작업 포함)
+    thumbnail_generator.start()
+
     print("===============================================\n", flush=True)
     yield
     print("\n👋 Server Shutting Down...", flush=True)
+    await thumbnail_generator.stop()
+    await upload_session_sweeper.stop()
+    await chat_writer.stop()
+    await presence_registry.stop()
+    await backplane.stop()
+    await activity_tracker.stop()
+    await async_engine.dispose()
 
 
 app = FastAPI(
@@ -108,3 +140,15 @@ def read_root():
         "system": "FastAPI + PostgreSQL + VectorWave",
         "status": "Healthy"
     }
+
+
+@app.get("/metrics/db-pool")
+def read_db_pool_metrics():
+    """DB 커넥션 풀 상태 (워커 수 대비 풀 크기 조정용)"""
+    return get_pool_stats()
+
+
+@app.get("/metrics/board-cache")
+def read_board_cache_metrics():
+    """보드 조회 캐시 상태 (메모리 사용량, 히트율)"""
+    return board_cache.stats()
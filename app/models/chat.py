@@ -1,13 +1,16 @@
 from typing import Optional
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 from datetime import datetime
 from app.models.user import User
 
 class ChatMessage(SQLModel, table=True):
     __tablename__ = "chat_messages"
+    # 프로젝트별 id 순 조회(keyset 페이지네이션)용 복합 인덱스 (project_id 단독 조회도 커버)
+    __table_args__ = (Index("ix_chat_messages_project_id_id", "project_id", "id"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    project_id: int = Field(foreign_key="projects.id", index=True)
+    project_id: int = Field(foreign_key="projects.id")
     user_id: int = Field(foreign_key="users.id")
 
     content: str
@@ -13,6 +13,7 @@ class CommunityPost(SQLModel, table=True):
     title: str
     content: str
     image_url: Optional[str] = None  # ✅ 사진 1장 (필수 아님, 선택)
+    image_thumbnail_url: Optional[str] = None  # 썸네일 URL (백그라운드 생성)
 
     user_id: int = Field(foreign_key="users.id")
     created_at: datetime = Field(default_factory=datetime.now)
@@ -1,5 +1,6 @@
 from typing import Optional, List
 from datetime import datetime
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 from app.models.board import Card, CardFileLink
 
@@ -7,10 +8,16 @@ from app.models.board import Card, CardFileLink
 # 1. 파일 메타데이터 (프로젝트 내의 '파일' 개념)
 class FileMetadata(SQLModel, table=True):
     __tablename__ = "files"
+    __table_args__ = (
+        # 프로젝트별 id 순 목록(keyset 페이지네이션)용 (project_id 단독 조회도 커버)
+        Index("ix_files_project_id_id", "project_id", "id"),
+        # 파일명 접두어 검색(LIKE 'abc%')과 같은 이름 조회용 (text_pattern_ops: DB 콜레이션과 무관하게 접두어 검색에 사용 가능)
+        Index("ix_files_project_id_filename", "project_id", "filename", postgresql_ops={"filename": "text_pattern_ops"}),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    project_id: int = Field(foreign_key="projects.id", index=True)
-    filename: str = Field(index=True)  # 원본 파일명 (예: 기획서.pdf)
+    project_id: int = Field(foreign_key="projects.id")
+    filename: str  # 원본 파일명 (예: 기획서.pdf)
     owner_id: int = Field(foreign_key="users.id")
 
     created_at: datetime = Field(default_factory=datetime.now)
@@ -27,22 +34,64 @@ class FileMetadata(SQLModel, table=True):
     def latest_version(self):
         if not self.versions:
             return None
-        # 버전 숫자(version)를 기준으로 내림차순 정렬 후 첫 번째 것 반환
-        return sorted(self.versions, key=lambda v: v.version, reverse=True)[0]
+        # 버전 숫자(version)가 가장 큰 것 반환 (목록 API는 쿼리에서 바로 조회하므로 이 프로퍼티를 쓰지 않음)
+        return max(self.versions, key=lambda v: v.version)
 
 
 # 2. 파일 버전 (실제 물리적 파일 정보)
 class FileVersion(SQLModel, table=True):
     __tablename__ = "file_versions"
+    # 파일별 최신 버전 조회(file_id, version DESC)용 (file_id 단독 조회도 커버)
+    __table_args__ = (Index("ix_file_versions_file_id_version", "file_id", "version"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    file_id: int = Field(foreign_key="files.id", index=True)
+    file_id: int = Field(foreign_key="files.id")
 
     version: int = Field(default=1)  # v1, v2, ...
     saved_path: str  # 서버에 저장된 실제 경로 (UUID 등으로 변환됨)
     file_size: int  # 바이트 단위
+    sha256: Optional[str] = Field(default=None, index=True)  # 내용 해시 (업로드 중 계산)
+    thumbnail_url: Optional[str] = None  # 이미지/PDF 썸네일 URL (백그라운드 생성)
+    thumbnail_unsupported: Optional[bool] = None  # 썸네일을 만들 수 없는 내용(문서, 압축 파일 등) -> 다시 시도하지 않음
 
     uploader_id: int = Field(foreign_key="users.id")  # 버전을 올린 사람
     created_at: datetime = Field(default_factory=datetime.now)
 
     file_metadata: Optional[FileMetadata] = Relationship(back_populates="versions")
+
+
+# 3. 실제 저장된 내용 (SHA-256 기준으로 한 번만 저장하고 같은 내용의 버전들이 공유)
+class FileBlob(SQLModel, table=True):
+    __tablename__ = "file_blobs"
+
+    sha256: str = Field(primary_key=True)
+    saved_path: str
+    file_size: int
+    ref_count: int = Field(default=0)  # 이 blob을 가리키는 FileVersion 수 (0이 되면 삭제)
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
+# 4. 이어받기(청크) 업로드 세션 - 청크는 임시 파일(sparse)의 해당 위치에 바로 기록
+class UploadSession(SQLModel, table=True):
+    __tablename__ = "upload_sessions"
+
+    id: str = Field(primary_key=True)  # uuid
+    project_id: int = Field(foreign_key="projects.id", index=True)
+    user_id: int = Field(foreign_key="users.id")
+
+    filename: str
+    file_size: int  # 전체 크기 (바이트)
+    chunk_size: int
+    temp_path: str
+
+    created_at: datetime = Field(default_factory=datetime.now)
+    expires_at: datetime = Field(index=True)  # 마지막 청크 이후 이 시간이 지나면 정리
+    committing_at: Optional[datetime] = None  # commit 처리 시작 시각 (처리 중에는 청크 업로드/취소 거절)
+
+
+# 받은 청크 번호 (순서와 상관없이 받을 수 있으므로 번호별로 기록)
+class UploadChunk(SQLModel, table=True):
+    __tablename__ = "upload_chunks"
+
+    upload_id: str = Field(foreign_key="upload_sessions.id", primary_key=True)
+    chunk_index: int = Field(primary_key=True)
@@ -0,0 +1,12 @@
+from datetime import datetime
+from typing import Optional
+from sqlmodel import SQLModel, Field
+
+
+# NOTIFY 크기 한도를 넘는 실시간 이벤트 본문 (알림에는 id만 실어 보냄)
+class RealtimePayload(SQLModel, table=True):
+    __tablename__ = "realtime_payloads"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    payload: str  # 인코딩된 JSON 전체
+    created_at: datetime = Field(default_factory=datetime.now, index=True)
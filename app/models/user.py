@@ -13,6 +13,7 @@ class User(SQLModel, table=True):
     name: str
     nickname: Optional[str] = Field(default=None)
     profile_image: Optional[str] = None
+    profile_image_thumbnail: Optional[str] = None  # 썸네일 URL (백그라운드 생성, 없으면 원본 사용)
 
     is_student_verified: bool = Field(default=False)
 
@@ -12,6 +12,7 @@ from app.models.session import UserSession
 from app.models.verification import EmailVerification # 👈 추가
 from app.schemas import UserCreate, UserLogin, UserResponse, VerificationRequest # 👈 추가
 from app.utils.email import send_verification_email # 👈 추가
+from app.utils.session_cache import session_cache
 from app.models.workspace import Workspace, WorkspaceMember # 👈 워크스페이스 모델 필요
 from passlib.context import CryptContext
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -187,6 +188,8 @@ def logout(response: Response, request: Request, db: Session = Depends(get_db)):
         if session:
             db.delete(session)
             db.commit()
+        # 삭제가 커밋된 뒤에 캐시 제거 (먼저 지우면 그 사이 요청이 DB에서 다시 캐시할 수 있음), 다른 워커에도 전달
+        session_cache.invalidate(session_id)
 
     response.delete_cookie("session_id")
     return {"message": "로그아웃 되었습니다."}
\ No newline at end of file
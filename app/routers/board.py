@@ -7,9 +7,13 @@ import json
 import asyncio
 
 from fastapi.encoders import jsonable_encoder  # 👈 [핵심] 이걸로 datetime 직렬화 문제 해결!
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, Response
+from sqlalchemy import update, delete, insert, bindparam
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.routers.workspace import get_current_user_id
 from app.models.board import BoardColumn, Card, CardAssignee
 from app.models.workspace import Project, WorkspaceMember
@@ -17,18 +21,24 @@ from app.schemas import (
     BoardColumnCreate, BoardColumnResponse, CardCreate, CardResponse, CardUpdate,
     CardCommentCreate, CardCommentResponse, BoardColumnUpdate, FileResponse,
     CardConnectionCreate, CardConnectionResponse, TransformSchema, CardConnectionUpdate,
-    BatchCardUpdateRequest
+    BatchCardUpdateRequest, BoardSnapshotResponse
 )
 from app.models.user import User
 from app.models.file import FileMetadata
 from app.models.board import CardFileLink, CardComment, CardDependency
-from app.utils.logger import log_activity
+from app.utils.logger import log_activity, log_activity_async
 from vectorwave import *
 from fastapi import WebSocket, WebSocketDisconnect
 from app.utils.connection_manager import board_event_manager
+from app.utils.board_cache import board_cache
+from app.utils.profile_cache import profile_cache
+from app.utils.json_frame import encode_frame
+from app.utils.etag import project_etag, etag_matches, not_modified
 
 router = APIRouter(tags=["Board & Cards"])
 
+PONG_FRAME = encode_frame({"type": "pong"})
+
 # =================================================================
 # Card ORM -> dict serialization helper
 # jsonable_encoder(card) cannot serialize SQLModel Relationship fields
@@ -39,6 +49,66 @@ def serialize_card(card: Card) -> dict:
     return CardResponse.model_validate(card, from_attributes=True).model_dump(mode="json")
 
 
+def card_relation_options():
+    """
+    CardResponse에 필요한 관계(assignees, files -> versions)를 미리 로드하는 옵션
+    비동기 세션에서는 lazy load가 불가능하므로 반드시 eager loading 해야 함
+    (모든 모델이 import된 뒤에 매퍼가 구성되도록 함수로 생성)
+    """
+    return (
+        selectinload(Card.assignees),
+        selectinload(Card.files).selectinload(FileMetadata.versions),
+    )
+
+
+def column_to_response(col: BoardColumn) -> BoardColumnResponse:
+    """BoardColumn ORM -> BoardColumnResponse (scale/rotation -> transform 조립)"""
+    return BoardColumnResponse(
+        id=col.id,
+        title=col.title,
+        local_x=col.local_x,
+        local_y=col.local_y,
+        width=col.width,
+        height=col.height,
+        parent_id=col.parent_id,
+        depth=col.depth,
+        color=col.color,
+        collapsed=col.collapsed,
+        order=col.order,
+        project_id=col.project_id,
+        transform=TransformSchema(
+            scaleX=col.scale_x,
+            scaleY=col.scale_y,
+            rotation=col.rotation
+        )
+    )
+
+
+def connection_to_response(conn: CardDependency, project_id: int) -> CardConnectionResponse:
+    """CardDependency ORM -> CardConnectionResponse"""
+    return CardConnectionResponse(
+        id=conn.id,
+        from_card_id=conn.from_card_id,
+        to_card_id=conn.to_card_id,
+        board_id=project_id,
+        style=conn.style or "solid",
+        shape=conn.shape or "bezier",
+        source_handle=conn.source_handle,
+        target_handle=conn.target_handle
+    )
+
+
+async def load_card(db: AsyncSession, card_id: int) -> Optional[Card]:
+    """관계까지 로드된 Card 조회 (identity map에 있는 객체도 DB 값으로 갱신)"""
+    statement = (
+        select(Card)
+        .where(Card.id == card_id)
+        .options(*card_relation_options())
+        .execution_options(populate_existing=True)
+    )
+    return (await db.exec(statement)).first()
+
+
 # =================================================================
 # 📡 [신규] 보드 실시간 구독 (SSE)
 # =================================================================
@@ -47,18 +117,18 @@ async def stream_board_events(
         project_id: int,
         request: Request,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     보드 변경 사항을 실시간으로 수신합니다. (SSE)
     """
     # 1. 프로젝트 확인
-    project = db.get(Project, project_id)
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
     # 2. 이벤트 큐 생성 및 등록
-    queue = await board_event_manager.connect(project_id)
+    subscriber = board_event_manager.subscribe(project_id)
 
     async def event_generator():
         try:
@@ -69,15 +139,17 @@ async def stream_board_events(
 
                 try:
                     # 큐에서 메시지 꺼내기 (15초 대기)
-                    data = await asyncio.wait_for(queue.get(), timeout=15.0)
+                    data = await asyncio.wait_for(subscriber.next(), timeout=15.0)
+                    if data is None:  # 너무 느려서 연결이 정리된 경우
+                        break
 
-                    # 딕셔너리를 JSON 문자열로 변환 (jsonable_encoder 덕분에 datetime 문제 없음)
-                    yield f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+                    # 브로드캐스트 시 한 번 인코딩된 JSON 문자열을 그대로 전송
+                    yield f"data: {data}\n\n"
                 except asyncio.TimeoutError:
                     # 연결 유지용 핑 (Ping)
                     yield ": keep-alive\n\n"
         finally:
-            board_event_manager.disconnect(project_id, queue)
+            board_event_manager.unsubscribe(subscriber, project_id)
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
@@ -87,29 +159,33 @@ async def stream_board_events(
 # =================================================================
 
 @router.websocket("/ws/projects/{project_id}/board")
-async def board_events_endpoint(websocket: WebSocket, project_id: int):
-    await board_event_manager.connect(websocket, project_id)
+async def board_events_endpoint(
+        websocket: WebSocket, project_id: int,
+        last_seq: Optional[int] = None, epoch: Optional[str] = None
+):
+    # 재접속 시 ?last_seq=&epoch= (HELLO로 받은 epoch, 마지막으로 받은 seq)을 보내면 누락분만 재전송
+    subscriber = await board_event_manager.connect(websocket, project_id, last_seq, epoch)
     try:
         while True:
             raw = await websocket.receive_text()
             try:
                 msg = json.loads(raw)
                 msg_type = msg.get("type")
+                # 소켓 전송은 writer task만 하도록 모두 큐를 거침
                 if msg_type == "ping":
-                    await websocket.send_json({"type": "pong"})
+                    subscriber.offer(PONG_FRAME)
                 elif msg_type == "CURSOR_MOVE":
-                    # 커서 위치를 다른 사용자들에게 relay (발신자 제외)
-                    if project_id in board_event_manager.active_connections:
-                        for conn in board_event_manager.active_connections[project_id]:
-                            if conn != websocket:
-                                try:
-                                    await conn.send_json(msg)
-                                except Exception:
-                                    pass
+                    # 보낸 사람별 마지막 위치만 남겨 두고 tick마다 CURSORS로 묶어서 전송
+                    sender = msg.get("user_id")
+                    if not isinstance(sender, (int, str)):
+                        sender = id(subscriber)
+                    board_event_manager.move_cursor(project_id, sender, msg)
             except json.JSONDecodeError:
                 pass
     except WebSocketDisconnect:
-        board_event_manager.disconnect(websocket, project_id)
+        pass
+    finally:
+        board_event_manager.unsubscribe(subscriber, project_id)
 
 
 @router.post("/projects/{project_id}/columns", response_model=BoardColumnResponse)
@@ -118,9 +194,9 @@ async def create_column(
         project_id: int,
         col_data: BoardColumnCreate,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    project = db.get(Project, project_id)
+    project = await db.get(Project, project_id)
     if not project: raise HTTPException(status_code=404, detail="Project not found")
 
     if col_data.parent_id == 0: col_data.parent_id = None
@@ -129,15 +205,16 @@ async def create_column(
     if new_col.parent_id == 0: new_col.parent_id = None
 
     db.add(new_col)
-    db.commit()
-    db.refresh(new_col)
+    await db.flush()
 
-    # 🔥 [SSE] jsonable_encoder 사용
+    # 🔥 [SSE] 같은 트랜잭션에서 발행 (커밋되면 전달)
     await board_event_manager.broadcast(project_id, {
         "type": "COLUMN_CREATED",
         "user_id": user_id,
         "data": jsonable_encoder(new_col)
-    })
+    }, db=db)
+    await db.commit()
+    await db.refresh(new_col)
 
     return BoardColumnResponse(
         id=new_col.id,
@@ -165,9 +242,9 @@ async def update_column(
         column_id: int,
         col_data: BoardColumnUpdate,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    col = db.get(BoardColumn, column_id)
+    col = await db.get(BoardColumn, column_id)
     if not col: raise HTTPException(status_code=404, detail="Column not found")
 
     update_dict = col_data.model_dump(exclude_unset=True, by_alias=False, exclude={"transform"})
@@ -182,15 +259,16 @@ async def update_column(
     if col.parent_id == 0: col.parent_id = None
 
     db.add(col)
-    db.commit()
-    db.refresh(col)
+    await db.flush()
 
-    # 🔥 [SSE] jsonable_encoder 사용
+    # 🔥 [SSE] 같은 트랜잭션에서 발행 (커밋되면 전달)
     await board_event_manager.broadcast(col.project_id, {
         "type": "COLUMN_UPDATED",
         "user_id": user_id,
         "data": jsonable_encoder(col)
-    })
+    }, db=db)
+    await db.commit()
+    await db.refresh(col)
 
     return BoardColumnResponse(
         id=col.id,
@@ -217,46 +295,54 @@ async def update_column(
 async def delete_column(
         column_id: int,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    column = db.get(BoardColumn, column_id)
+    column = await db.get(BoardColumn, column_id)
     if not column: raise HTTPException(status_code=404, detail="Column not found")
 
-    project = db.get(Project, column.project_id)
+    project = await db.get(Project, column.project_id)
     col_title = column.title
-    card_count = len(column.cards)
     project_id = column.project_id
 
+    # column.cards는 lazy load라 비동기 세션에서 접근 불가 -> 직접 조회
+    cards = (await db.exec(select(Card).where(Card.column_id == column_id))).all()
+    card_count = len(cards)
+
     # 카드 대피 (column_id = None)
-    for card in column.cards:
+    for card in cards:
         card.column_id = None
         db.add(card)
-    db.commit() # 대피 내용 저장
+    await db.commit() # 대피 내용 저장
 
     # 컬럼 삭제
-    db.refresh(column)
-    db.delete(column)
-    db.commit()
+    await db.refresh(column)
+    await db.delete(column)
+    await board_event_manager.broadcast(project_id, {
+        "type": "COLUMN_DELETED",
+        "user_id": user_id,
+        "data": {"id": column_id}
+    }, db=db)
+    await db.commit()
 
     if project:
-        user = db.get(User, user_id)
-        log_activity(
+        user = await profile_cache.load(db, user_id)
+        await log_activity_async(
             db=db, user_id=user_id, workspace_id=project.workspace_id, action_type="DELETE",
             content=f"🗑️ '{user.name}'님이 그룹 '{col_title}'을(를) 삭제했습니다. (카드 {card_count}개는 보관됨)"
         )
 
-    await board_event_manager.broadcast(project_id, {
-        "type": "COLUMN_DELETED",
-        "user_id": user_id,
-        "data": {"id": column_id}
-    })
-
     return {"message": "그룹이 삭제되었으며, 포함된 카드들은 보관함으로 이동되었습니다."}
 
 
 @router.get("/projects/{project_id}/columns", response_model=List[BoardColumnResponse])
-def get_project_columns(project_id: int, db: Session = Depends(get_db)):
+def get_project_columns(project_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    # 변경이 없으면 304로 응답 (조회/직렬화 생략)
+    etag = project_etag(project_id, "columns")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     columns = db.exec(select(BoardColumn).where(BoardColumn.project_id == project_id).order_by(BoardColumn.order)).all()
+    response.headers["ETag"] = etag
     return columns
 
 
@@ -267,37 +353,36 @@ def get_project_columns(project_id: int, db: Session = Depends(get_db)):
 
 @router.get("/projects/{project_id}/connections", response_model=List[CardConnectionResponse])
 @vectorize(search_description="Get project card connections", capture_return_value=True)
-def get_project_connections(project_id: int, db: Session = Depends(get_db)):
-    statement = (
-        select(CardDependency)
-        .join(Card, CardDependency.from_card_id == Card.id)
-        .where(Card.project_id == project_id) # ✅ 컬럼 조인 없이 카드에서 바로 프로젝트 확인
-    )
-    connections = db.exec(statement).all()
-
-    results = []
-    for conn in connections:
-        results.append(CardConnectionResponse(
-            id=conn.id,
-            from_card_id=conn.from_card_id,
-            to_card_id=conn.to_card_id,
-            board_id=project_id,
-            style=conn.style if hasattr(conn, 'style') else "solid",
-            shape=conn.shape if hasattr(conn, 'shape') else "bezier",
-            source_handle=conn.source_handle,
-            target_handle=conn.target_handle
-        ))
-    return results
+def get_project_connections(project_id: int, request: Request, db: Session = Depends(get_db)):
+    etag = project_etag(project_id, "connections")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # 캐시 히트 시 DB 조회/직렬화 생략
+    version = board_cache.version(project_id)
+    body = board_cache.get(project_id, "connections")
+    if body is None:
+        statement = (
+            select(CardDependency)
+            .join(Card, CardDependency.from_card_id == Card.id)
+            .where(Card.project_id == project_id) # ✅ 컬럼 조인 없이 카드에서 바로 프로젝트 확인
+        )
+        connections = db.exec(statement).all()
+
+        results = [connection_to_response(conn, project_id).model_dump(mode="json", by_alias=True) for conn in connections]
+        body = board_cache.encode(results)
+        board_cache.set(project_id, "connections", body, version)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 @router.post("/cards/connections", response_model=CardConnectionResponse) # 👈 반환 모델 변경
 @vectorize(search_description="Create dependency between cards", capture_return_value=True)
 async def create_card_connection(
         connection_data: CardConnectionCreate,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    from_card = db.get(Card, connection_data.from_card_id)
-    to_card = db.get(Card, connection_data.to_card_id)
+    from_card = await db.get(Card, connection_data.from_card_id)
+    to_card = await db.get(Card, connection_data.to_card_id)
 
     if not from_card or not to_card:
         raise HTTPException(status_code=404, detail="카드를 찾을 수 없습니다.")
@@ -324,8 +409,7 @@ async def create_card_connection(
         new_dependency.shape = connection_data.shape
 
     db.add(new_dependency)
-    db.commit()
-    db.refresh(new_dependency)
+    await db.flush()
 
     response_data = CardConnectionResponse(
         id=new_dependency.id,
@@ -338,18 +422,19 @@ async def create_card_connection(
         target_handle=new_dependency.target_handle
     )
 
-    # 🔥 [SSE] jsonable_encoder 사용
+    # 🔥 [SSE] 같은 트랜잭션에서 발행 (커밋되면 전달)
     await board_event_manager.broadcast(from_card.project_id, {
         "type": "CONNECTION_CREATED",
         "user_id": user_id,
         "data": jsonable_encoder(response_data)
-    })
+    }, db=db)
+    await db.commit()
 
     # 로그 기록
-    project = db.get(Project, from_card.project_id)
-    user = db.get(User, user_id)
+    project = await db.get(Project, from_card.project_id)
+    user = await profile_cache.load(db, user_id)
 
-    log_activity(
+    await log_activity_async(
         db=db, user_id=user_id, workspace_id=project.workspace_id, action_type="UPDATE",
         content=f"🔗 '{user.name}'님이 카드 '{from_card.title}'와(과) '{to_card.title}'을(를) 연결했습니다."
     )
@@ -362,10 +447,10 @@ async def update_card_connection(
         connection_id: int,
         update_data: CardConnectionUpdate,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     # 1. 기존 연결 조회
-    conn = db.get(CardDependency, connection_id)
+    conn = await db.get(CardDependency, connection_id)
     if not conn:
         raise HTTPException(status_code=404, detail="Connection not found")
 
@@ -378,8 +463,8 @@ async def update_card_connection(
         raise HTTPException(status_code=400, detail="Cannot connect to self")
 
     # 4. 카드 및 프로젝트 유효성 검사
-    card_from = db.get(Card, target_from_id)
-    card_to = db.get(Card, target_to_id)
+    card_from = await db.get(Card, target_from_id)
+    card_to = await db.get(Card, target_to_id)
 
     if not card_from or not card_to:
         raise HTTPException(status_code=404, detail="One of the cards not found")
@@ -395,35 +480,35 @@ async def update_card_connection(
         setattr(conn, key, value)
 
     db.add(conn)
-    db.commit()
-    db.refresh(conn)
-
-    # 6. 로그 기록
-    project = db.get(Project, card_from.project_id)
-    user = db.get(User, user_id)
-
-    log_activity(
-        db=db, user_id=user_id, workspace_id=project.workspace_id, action_type="UPDATE",
-        content=f"🔗 '{user.name}'님이 카드 연결을 수정했습니다."
-    )
+    await db.flush()
 
     response_data = CardConnectionResponse(
         id=conn.id,
         from_card_id=conn.from_card_id,
         to_card_id=conn.to_card_id,
-        board_id=project.id,
+        board_id=card_from.project_id,
         style=conn.style,
         shape=conn.shape,
         source_handle=conn.source_handle,
         target_handle=conn.target_handle
     )
 
-    # 🔥 [SSE] jsonable_encoder 사용
+    # 🔥 [SSE] 같은 트랜잭션에서 발행 (커밋되면 전달)
     await board_event_manager.broadcast(card_from.project_id, {
         "type": "CONNECTION_UPDATED",
         "user_id": user_id,
         "data": jsonable_encoder(response_data)
-    })
+    }, db=db)
+    await db.commit()
+
+    # 6. 로그 기록
+    project = await db.get(Project, card_from.project_id)
+    user = await profile_cache.load(db, user_id)
+
+    await log_activity_async(
+        db=db, user_id=user_id, workspace_id=project.workspace_id, action_type="UPDATE",
+        content=f"🔗 '{user.name}'님이 카드 연결을 수정했습니다."
+    )
 
     # 7. 응답 반환
     return response_data
@@ -433,28 +518,28 @@ async def update_card_connection(
 async def delete_card_connection(
         connection_id: int,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     # 1. 삭제할 연결 정보 조회
-    conn = db.get(CardDependency, connection_id)
+    conn = await db.get(CardDependency, connection_id)
     if not conn:
         raise HTTPException(status_code=404, detail="연결을 찾을 수 없습니다.")
 
     # 2. 브로드캐스트를 위해 프로젝트 ID 확보 (시작점 카드를 통해 조회)
-    from_card = db.get(Card, conn.from_card_id)
+    from_card = await db.get(Card, conn.from_card_id)
     project_id = from_card.project_id if from_card else None
 
     # 3. 데이터 삭제
-    db.delete(conn)
-    db.commit()
+    await db.delete(conn)
 
-    # 4. 실시간 브로드캐스트 전송
+    # 4. 실시간 브로드캐스트 (같은 트랜잭션에서 발행, 커밋되면 전달)
     if project_id:
         await board_event_manager.broadcast(project_id, {
             "type": "CONNECTION_DELETED",
             "user_id": user_id,
             "data": {"id": connection_id}
-        })
+        }, db=db)
+    await db.commit()
 
     return {"message": "연결이 성공적으로 삭제되었습니다."}
 
@@ -476,54 +561,83 @@ def delete_comment(
 @vectorize(search_description="Batch update cards", capture_return_value=True)
 async def update_cards_batch(
         request: BatchCardUpdateRequest,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         user_id: int = Depends(get_current_user_id)
 ):
-    updated_cards = []
-    project_id = None
-
-    # 1. 요청받은 모든 카드를 순회
-    for item in request.cards:
-        card = db.get(Card, item.id)
-        if not card:
-            continue  # 없으면 스킵 (혹은 에러 처리)
-
-        # 프로젝트 ID 확보
-        if project_id is None:
-            project_id = card.project_id
-
-        # 2. 데이터 업데이트 (값이 있는 것만)
-        update_data = item.model_dump(exclude_unset=True)
-
-        # id는 업데이트 대상이 아니므로 제외
-        if "id" in update_data:
-            del update_data["id"]
-
+    items = {item.id: item for item in request.cards}  # 같은 카드가 여러 번 오면 마지막 요청 사용
+    if not items:
+        return []
+
+    # 1. 대상 카드를 IN 쿼리 한 번으로 조회 (응답에 필요한 관계 포함)
+    cards = (await db.exec(
+        select(Card).where(Card.id.in_(list(items))).options(*card_relation_options())
+    )).all()
+    cards_by_id = {card.id: card for card in cards}  # 없는 카드는 스킵
+
+    # 2. 변경할 컬럼 조합별로 묶어서 executemany
+    now = datetime.now()
+    rows_by_keys = {}
+    assignee_map = {}
+    for card_id, item in items.items():
+        if card_id not in cards_by_id:
+            continue
+        update_data = item.model_dump(exclude_unset=True, exclude={"id"})
         if "assignee_ids" in update_data:
-            # 담당자 변경 로직이 필요하다면 여기에 추가 (기존 로직 참조)
-            pass
-
-        for key, value in update_data.items():
-            if key != "assignee_ids": # 관계형 필드 제외하고 속성 변경
-                setattr(card, key, value)
-
-        db.add(card)
-        updated_cards.append(card)
-
-    # 3. 한 번에 커밋 (Bulk Update 효과)
-    db.commit()
-
-    # 4. 최신 상태로 갱신
+            assignee_map[card_id] = update_data.pop("assignee_ids") or []
+        update_data["updated_at"] = now
+        rows_by_keys.setdefault(tuple(sorted(update_data)), []).append((card_id, update_data))
+
+    card_table = Card.__table__
+    for keys, rows in rows_by_keys.items():
+        statement = (
+            update(card_table)
+            .where(card_table.c.id == bindparam("b_id"))
+            .values({key: bindparam(f"b_{key}") for key in keys})
+        )
+        await db.execute(statement, [
+            {"b_id": card_id, **{f"b_{key}": value for key, value in data.items()}}
+            for card_id, data in rows
+        ])
+        # 메모리의 객체에도 반영 (refresh 없이 응답 생성)
+        for card_id, data in rows:
+            for key, value in data.items():
+                set_committed_value(cards_by_id[card_id], key, value)
+
+    # 3. 담당자 일괄 교체: DELETE 한 번 + INSERT executemany 한 번
+    if assignee_map:
+        requested_ids = {uid for ids in assignee_map.values() for uid in ids}
+        users = (await db.exec(select(User).where(User.id.in_(requested_ids)))).all() if requested_ids else []
+        users_by_id = {user.id: user for user in users}
+
+        await db.execute(delete(CardAssignee).where(CardAssignee.card_id.in_(list(assignee_map))))
+        links = [
+            {"card_id": card_id, "user_id": uid}
+            for card_id, ids in assignee_map.items()
+            for uid in dict.fromkeys(ids) if uid in users_by_id
+        ]
+        if links:
+            await db.execute(insert(CardAssignee), links)
+        for card_id, ids in assignee_map.items():
+            set_committed_value(
+                cards_by_id[card_id], "assignees",
+                [users_by_id[uid] for uid in dict.fromkeys(ids) if uid in users_by_id]
+            )
+
+    updated_cards = [cards_by_id[card_id] for card_id in items if card_id in cards_by_id]
+
+    # 🔥 [SSE] 프로젝트별로 묶어서 같은 트랜잭션에서 발행 (커밋되면 전달)
+    cards_by_project = {}
     for card in updated_cards:
-        db.refresh(card)
-
-    # 🔥 [SSE] jsonable_encoder 사용
-    if project_id and updated_cards:
+        cards_by_project.setdefault(card.project_id, []).append(card)
+    for project_id, project_cards in cards_by_project.items():
         await board_event_manager.broadcast(project_id, {
             "type": "CARD_BATCH_UPDATED",
             "user_id": user_id,
-            "data": jsonable_encoder(updated_cards)
-        })
+            "data": jsonable_encoder(project_cards)
+        }, db=db)
+
+    # 4. 한 번에 커밋
+    await db.commit()
 
     return updated_cards
 
@@ -537,15 +651,15 @@ async def create_card(
         project_id: int,
         card_data: CardCreate,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    project = db.get(Project, project_id)
+    project = await db.get(Project, project_id)
     if not project: raise HTTPException(status_code=404, detail="Project not found")
 
     final_column_id = card_data.column_id if card_data.column_id else None
 
     if final_column_id:
-        column = db.get(BoardColumn, final_column_id)
+        column = await db.get(BoardColumn, final_column_id)
         if not column: raise HTTPException(status_code=404, detail="지정된 컬럼을 찾을 수 없습니다.")
         if column.project_id != project_id: raise HTTPException(status_code=400, detail="해당 컬럼은 이 프로젝트에 속하지 않습니다.")
 
@@ -561,27 +675,28 @@ async def create_card(
     )
 
     if card_data.assignee_ids:
-        users = db.exec(select(User).where(User.id.in_(card_data.assignee_ids))).all()
+        users = (await db.exec(select(User).where(User.id.in_(card_data.assignee_ids)))).all()
         new_card.assignees = users
 
     db.add(new_card)
-    db.commit()
-    db.refresh(new_card)
+    await db.flush()
 
-    # 🔥 [SSE] jsonable_encoder 사용 (datetime 에러 해결!)
+    # 🔥 [SSE] 같은 트랜잭션에서 발행 (커밋되면 전달)
     await board_event_manager.broadcast(project_id, {
         "type": "CARD_CREATED",
         "user_id": user_id,
         "data": jsonable_encoder(new_card)
-    })
+    }, db=db)
+    await db.commit()
+    new_card = await load_card(db, new_card.id)
 
-    user = db.get(User, user_id)
+    user = await profile_cache.load(db, user_id)
     location = f"'{project.name}' 프로젝트"
     if final_column_id:
-        col = db.get(BoardColumn, final_column_id)
+        col = await db.get(BoardColumn, final_column_id)
         if col: location += f"의 '{col.title}' 컬럼"
 
-    log_activity(
+    await log_activity_async(
         db=db, user_id=user_id, workspace_id=project.workspace_id, action_type="CREATE",
         content=f"📝 '{user.name}'님이 {location}에 카드 '{new_card.title}'을(를) 생성했습니다."
     )
@@ -589,19 +704,101 @@ async def create_card(
 
 @router.get("/projects/{project_id}/board")
 @vectorize(search_description="Get project kanban board", capture_return_value=True, replay=True)
-def get_board(project_id: int, db: Session = Depends(get_db)):
-    columns = db.exec(select(BoardColumn).where(BoardColumn.project_id == project_id).order_by(BoardColumn.order)).all()
-    result = []
-    for col in columns:
-        cards = db.exec(select(Card).where(Card.column_id == col.id).order_by(Card.order)).all()
-        result.append({"column": col, "cards": cards})
-    return result
+def get_board(project_id: int, request: Request, db: Session = Depends(get_db)):
+    etag = project_etag(project_id, "board")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    version = board_cache.version(project_id)
+    body = board_cache.get(project_id, "board")
+    if body is None:
+        columns = db.exec(select(BoardColumn).where(BoardColumn.project_id == project_id).order_by(BoardColumn.order)).all()
+
+        # 컬럼마다 카드를 조회하지 않고 한 번에 가져와서 column_id로 묶음
+        cards = db.exec(
+            select(Card)
+            .where(Card.project_id == project_id, Card.column_id.is_not(None))
+            .order_by(Card.order)
+        ).all()
+        cards_by_column = {}
+        for card in cards:
+            cards_by_column.setdefault(card.column_id, []).append(card)
+
+        result = [{"column": col, "cards": cards_by_column.get(col.id, [])} for col in columns]
+        body = board_cache.encode(jsonable_encoder(result))
+        board_cache.set(project_id, "board", body, version)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+@router.get("/projects/{project_id}/board/snapshot", response_model=BoardSnapshotResponse)
+@vectorize(search_description="Get project board snapshot", capture_return_value=True)
+async def get_board_snapshot(project_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    캔버스 렌더링에 필요한 그룹/카드/연결선을 한 번에 반환
+    보드 크기와 관계없이 쿼리 수가 고정됨:
+    1) 컬럼 2) 카드 3) 담당자 4) 파일 5) 파일 버전 6) 연결선
+    """
+    etag = project_etag(project_id, "snapshot")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    version = board_cache.version(project_id)
+    body = board_cache.get(project_id, "snapshot")
+    if body is not None:
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+    project = await db.get(Project, project_id)
+    if not project: raise HTTPException(status_code=404, detail="Project not found")
+
+    # 1. 그룹(컬럼)
+    columns = (await db.exec(
+        select(BoardColumn).where(BoardColumn.project_id == project_id).order_by(BoardColumn.order)
+    )).all()
+
+    # 2. 카드 + 담당자/파일/버전 (selectinload: 관계마다 IN 쿼리 1번)
+    cards = (await db.exec(
+        select(Card)
+        .where(Card.project_id == project_id)
+        .options(*card_relation_options())
+        .order_by(Card.id)
+    )).all()
+
+    # 3. 연결선
+    connections = (await db.exec(
+        select(CardDependency)
+        .join(Card, CardDependency.from_card_id == Card.id)
+        .where(Card.project_id == project_id)
+    )).all()
+
+    snapshot = BoardSnapshotResponse(
+        project_id=project_id,
+        columns=[column_to_response(col) for col in columns],
+        cards=[CardResponse.model_validate(card, from_attributes=True) for card in cards],
+        connections=[connection_to_response(conn, project_id) for conn in connections],
+    )
+    body = board_cache.encode(snapshot.model_dump(mode="json", by_alias=True))
+    board_cache.set(project_id, "snapshot", body, version)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 @router.get("/projects/{project_id}/cards", response_model=List[CardResponse])
 @vectorize(search_description="Get all cards in project", capture_return_value=True, replay=True)
-def get_project_cards(project_id: int, db: Session = Depends(get_db)):
-    cards = db.exec(select(Card).where(Card.project_id == project_id).order_by(Card.id)).all()
-    return cards
+def get_project_cards(project_id: int, request: Request, db: Session = Depends(get_db)):
+    etag = project_etag(project_id, "cards")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    version = board_cache.version(project_id)
+    body = board_cache.get(project_id, "cards")
+    if body is None:
+        cards = db.exec(
+            select(Card)
+            .where(Card.project_id == project_id)
+            .options(*card_relation_options())
+            .order_by(Card.id)
+        ).all()
+        body = board_cache.encode([serialize_card(card) for card in cards])
+        board_cache.set(project_id, "cards", body, version)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 # -----------------------------------------------------------------
 # 여기서부터 /cards/{card_id} 패턴 사용 (connections보다 아래에 있어야 함!)
@@ -612,16 +809,16 @@ def get_project_cards(project_id: int, db: Session = Depends(get_db)):
 async def update_card(
         card_id: int,
         card_data: CardUpdate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         user_id: int = Depends(get_current_user_id)
 ):
-    card = db.get(Card, card_id)
+    card = await load_card(db, card_id)
     if not card: raise HTTPException(status_code=404, detail="카드를 찾을 수 없습니다.")
 
     card_data_dict = card_data.model_dump(exclude_unset=True)
     if "assignee_ids" in card_data_dict:
         assignee_ids = card_data_dict.pop("assignee_ids")
-        users = db.exec(select(User).where(User.id.in_(assignee_ids))).all()
+        users = (await db.exec(select(User).where(User.id.in_(assignee_ids)))).all()
         card.assignees = users
 
     for key, value in card_data_dict.items():
@@ -629,15 +826,14 @@ async def update_card(
 
     card.updated_at = datetime.now()
     db.add(card)
-    db.commit()
-    db.refresh(card)
 
-    # 🔥 [SSE] jsonable_encoder 사용
+    # 🔥 [SSE] 같은 트랜잭션에서 발행 (커밋되면 전달, 롤백되면 버려짐)
     await board_event_manager.broadcast(card.project_id, {
         "type": "CARD_UPDATED",
         "user_id": user_id,
         "data": serialize_card(card)
-    })
+    }, db=db)
+    await db.commit()
 
     return card
 
@@ -646,26 +842,26 @@ async def update_card(
 async def delete_card(
         card_id: int,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    card = db.get(Card, card_id)
+    card = await db.get(Card, card_id)
     if not card: raise HTTPException(status_code=404, detail="카드를 찾을 수 없습니다.")
 
-    column = db.get(BoardColumn, card.column_id) if card.column_id else None
-    project = db.get(Project, card.project_id) if card.project_id else (db.get(Project, column.project_id) if column else None)
+    column = await db.get(BoardColumn, card.column_id) if card.column_id else None
+    project = await db.get(Project, card.project_id) if card.project_id else (await db.get(Project, column.project_id) if column else None)
     project_id = card.project_id
-    db.delete(card)
-    db.commit()
+    await db.delete(card)
 
     await board_event_manager.broadcast(project_id, {
         "type": "CARD_DELETED",
         "user_id": user_id,
         "data": {"id": card_id}
-    })
+    }, db=db)
+    await db.commit()
 
     if project:
-        user = db.get(User, user_id)
-        log_activity(
+        user = await profile_cache.load(db, user_id)
+        await log_activity_async(
             db=db, user_id=user_id, workspace_id=project.workspace_id, action_type="DELETE",
             content=f"🗑️ '{user.name}'님이 카드 '{card.title}'을(를) 삭제했습니다."
         )
@@ -673,62 +869,63 @@ async def delete_card(
 
 @router.post("/cards/{card_id}/files/{file_id}", response_model=CardResponse)
 @vectorize(search_description="Attach file to card", capture_return_value=True, replay=True)
-async def attach_file_to_card(card_id: int, file_id: int, user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
-    card = db.get(Card, card_id)
-    file = db.get(FileMetadata, file_id)
+async def attach_file_to_card(card_id: int, file_id: int, user_id: int = Depends(get_current_user_id), db: AsyncSession = Depends(get_async_db)):
+    card = await db.get(Card, card_id)
+    file = await db.get(FileMetadata, file_id)
     if not card or not file: raise HTTPException(status_code=404, detail="카드 또는 파일을 찾을 수 없습니다.")
 
-    existing_link = db.get(CardFileLink, (card_id, file_id))
-    if existing_link: return card
+    existing_link = await db.get(CardFileLink, (card_id, file_id))
+    if existing_link: return await load_card(db, card_id)
 
     link = CardFileLink(card_id=card_id, file_id=file_id)
     db.add(link)
-    db.commit()
-    db.refresh(card)
+    await db.flush()
+    card = await load_card(db, card_id)
 
-    user = db.get(User, user_id)
-    project = db.get(Project, card.project_id)
-    log_activity(
-        db=db, user_id=user_id, workspace_id=project.workspace_id, action_type="ATTACH",
-        content=f"📎 '{user.name}'님이 카드 '{card.title}'에 파일 '{file.filename}'을(를) 첨부했습니다."
-    )
-
-    # 🔥 [SSE] jsonable_encoder 사용
+    # 🔥 [SSE] 같은 트랜잭션에서 발행 (커밋되면 전달)
     await board_event_manager.broadcast(card.project_id, {
         "type": "CARD_UPDATED",
         "user_id": user_id,
         "data": serialize_card(card)
-    })
+    }, db=db)
+    await db.commit()
+
+    user = await profile_cache.load(db, user_id)
+    project = await db.get(Project, card.project_id)
+    await log_activity_async(
+        db=db, user_id=user_id, workspace_id=project.workspace_id, action_type="ATTACH",
+        content=f"📎 '{user.name}'님이 카드 '{card.title}'에 파일 '{file.filename}'을(를) 첨부했습니다."
+    )
 
     return card
 
 @router.delete("/cards/{card_id}/files/{file_id}")
 @vectorize(search_description="Detach file from card", capture_return_value=True, replay=True)
-async def detach_file_from_card(card_id: int, file_id: int, user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
-    link = db.get(CardFileLink, (card_id, file_id))
+async def detach_file_from_card(card_id: int, file_id: int, user_id: int = Depends(get_current_user_id), db: AsyncSession = Depends(get_async_db)):
+    link = await db.get(CardFileLink, (card_id, file_id))
     if not link: raise HTTPException(status_code=404, detail="해당 파일이 카드에 첨부되어 있지 않습니다.")
 
-    db.delete(link)
-    db.commit()
-
-    user = db.get(User, user_id)
-    card = db.get(Card, card_id)
-    db.refresh(card)  # relationship(files) stale 방지
-    file = db.get(FileMetadata, file_id)
+    await db.delete(link)
+    await db.flush()
+    card = await load_card(db, card_id)  # relationship(files) stale 방지
     project_id = card.project_id
-    project = db.get(Project, card.project_id)
-
-    log_activity(
-        db=db, user_id=user_id, workspace_id=project.workspace_id, action_type="DETACH",
-        content=f"📎 '{user.name}'님이 카드 '{card.title}'에서 파일 '{file.filename}'을(를) 분리했습니다."
-    )
 
-    # 🔥 [SSE] jsonable_encoder 사용
+    # 🔥 [SSE] 같은 트랜잭션에서 발행 (커밋되면 전달)
     await board_event_manager.broadcast(project_id, {
         "type": "CARD_UPDATED",
         "user_id": user_id,
         "data": serialize_card(card)
-    })
+    }, db=db)
+    await db.commit()
+
+    user = await profile_cache.load(db, user_id)
+    file = await db.get(FileMetadata, file_id)
+    project = await db.get(Project, card.project_id)
+
+    await log_activity_async(
+        db=db, user_id=user_id, workspace_id=project.workspace_id, action_type="DETACH",
+        content=f"📎 '{user.name}'님이 카드 '{card.title}'에서 파일 '{file.filename}'을(를) 분리했습니다."
+    )
 
     return {"message": "파일 연결이 해제되었습니다."}
 
@@ -741,22 +938,22 @@ def get_card(card_id: int, db: Session = Depends(get_db)):
 
 @router.post("/cards/{card_id}/comments", response_model=CardCommentResponse)
 @vectorize(search_description="Add comment to card", capture_return_value=True)
-async def create_comment(card_id: int, comment_data: CardCommentCreate, user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
-    card = db.get(Card, card_id)
-    project_id = card.project_id
+async def create_comment(card_id: int, comment_data: CardCommentCreate, user_id: int = Depends(get_current_user_id), db: AsyncSession = Depends(get_async_db)):
+    card = await load_card(db, card_id)
     if not card: raise HTTPException(status_code=404, detail="Card not found")
+    project_id = card.project_id
 
     new_comment = CardComment(card_id=card_id, user_id=user_id, content=comment_data.content)
     db.add(new_comment)
-    db.commit()
-    db.refresh(new_comment)
 
-    # 🔥 [SSE] jsonable_encoder 사용
+    # 🔥 [SSE] 같은 트랜잭션에서 발행 (커밋되면 전달)
     await board_event_manager.broadcast(project_id, {
         "type": "CARD_UPDATED",
         "user_id": user_id,
         "data": serialize_card(card)
-    })
+    }, db=db)
+    await db.commit()
+    await db.refresh(new_comment, attribute_names=["user"])  # 응답에 작성자 정보 포함
 
     return new_comment
 
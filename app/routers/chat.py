@@ -2,37 +2,65 @@
 
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
 from sqlmodel import Session, select
-from typing import List
+from typing import List, Optional
+from sqlalchemy.orm import selectinload
 from datetime import datetime
-from app.database import get_db, engine
+from app.database import get_db, AsyncSessionLocal
 from app.models.chat import ChatMessage
-from app.models.user import User
 from app.schemas import ChatMessageResponse
 from app.routers.workspace import get_current_user_id
 from app.utils.connection_manager import chat_manager
+from app.utils.json_frame import encode_frame
+from app.utils.profile_cache import profile_cache
+from app.utils.chat_writer import ChatWriter, chat_writer, CHAT_DURABILITY
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Project Chat"])
 
+# 채팅 목록 1회 조회 최대 건수
+CHAT_PAGE_MAX_LIMIT = 200
+
+
+def chat_page_query(project_id: int, limit: int, after_id: int = 0, before_id: Optional[int] = None):
+    """
+    채팅 목록 조회 쿼리: (project_id, id) 인덱스 범위 스캔만으로 조회 (정렬/OFFSET 없음)
+    after_id가 있으면 오래된 순, 없으면 최신 순
+    """
+    query = (
+        select(ChatMessage)
+        .where(ChatMessage.project_id == project_id)
+        .options(selectinload(ChatMessage.user))  # 작성자 정보 N+1 방지
+    )
+
+    if before_id is not None:
+        query = query.where(ChatMessage.id < before_id)
+
+    if after_id > 0:
+        return query.where(ChatMessage.id > after_id).order_by(ChatMessage.id.asc()).limit(limit)
+    return query.order_by(ChatMessage.id.desc()).limit(limit)
+
 
 # 1. 채팅 메시지 목록 조회 (입장 시 이전 메시지 로드용)
+#    id 기준 keyset 페이지네이션 (chat_page_query)
+#    - 파라미터 없음: 최신 limit개
+#    - before_id: 그보다 이전 메시지 limit개 (위로 스크롤)
+#    - after_id: 그 이후 메시지를 오래된 순으로 limit개 (재접속 시 누락분 따라잡기)
 @router.get("/projects/{project_id}/chat", response_model=List[ChatMessageResponse])
 def get_chat_messages(
         project_id: int,
         limit: int = 50,
         after_id: int = 0,
+        before_id: Optional[int] = None,
         db: Session = Depends(get_db),
         user_id: int = Depends(get_current_user_id)
 ):
-    query = select(ChatMessage).where(ChatMessage.project_id == project_id)
-
+    limit = max(1, min(limit, CHAT_PAGE_MAX_LIMIT))
+    messages = db.exec(chat_page_query(project_id, limit, after_id, before_id)).all()
     if after_id > 0:
-        query = query.where(ChatMessage.id > after_id)
-
-    messages = db.exec(query.order_by(ChatMessage.created_at.desc()).limit(limit)).all()
-
+        return messages
     return list(reversed(messages))
 
 
@@ -42,6 +70,13 @@ async def chat_websocket(websocket: WebSocket, project_id: int):
     await chat_manager.connect(websocket, project_id)
     logger.info(f"[Chat] WebSocket connected: project {project_id}")
 
+    def notify_failed(future, message_id: int):
+        """저장에 실패한 메시지는 이미 받은 화면에서 지울 수 있도록 전체에 알림"""
+        if future.cancelled() or future.exception() is None:
+            return
+        failed = encode_frame({"type": "MESSAGE_FAILED", "data": {"id": message_id, "project_id": project_id}})
+        asyncio.create_task(chat_manager.broadcast(failed, project_id, None))
+
     try:
         while True:
             data = await websocket.receive_json()
@@ -54,44 +89,50 @@ async def chat_websocket(websocket: WebSocket, project_id: int):
                 if not content or not user_id:
                     continue
 
-                # DB 세션 생성 (WebSocket 내에서는 Depends 사용 불가)
-                with Session(engine) as db:
-                    user = db.get(User, user_id)
+                # 작성자 프로필은 캐시에서 조회 (미스일 때만 DB, WebSocket 내에서는 Depends 사용 불가)
+                user = profile_cache.get(user_id)
+                if user is None:
+                    async with AsyncSessionLocal() as db:
+                        user = await profile_cache.load(db, user_id)
                     if not user:
                         continue
 
-                    new_msg = ChatMessage(
-                        project_id=project_id,
-                        user_id=user_id,
-                        content=content
-                    )
-                    db.add(new_msg)
-                    db.commit()
-                    db.refresh(new_msg)
-
-                    # 응답 데이터 구성
-                    response = {
-                        "type": "MESSAGE_SENT",
-                        "data": {
-                            "id": new_msg.id,
-                            "project_id": new_msg.project_id,
-                            "user_id": new_msg.user_id,
-                            "content": new_msg.content,
-                            "created_at": new_msg.created_at.isoformat(),
-                            "user": {
-                                "id": user.id,
-                                "name": user.name,
-                                "nickname": user.nickname,
-                                "email": user.email,
-                                "profile_image": getattr(user, 'profile_image', None),
-                            }
+                # 1. id는 시퀀스에서 먼저 받고, 저장은 chat_writer가 모아서 일괄 INSERT
+                message_id = await chat_writer.next_id()
+                row = ChatWriter.new_row(message_id, project_id, user.id, content)
+                saved = chat_writer.add(row)
+                saved.add_done_callback(lambda f, mid=message_id: notify_failed(f, mid))
+
+                # 응답 데이터 구성
+                response = {
+                    "type": "MESSAGE_SENT",
+                    "data": {
+                        "id": row["id"],
+                        "project_id": row["project_id"],
+                        "user_id": row["user_id"],
+                        "content": row["content"],
+                        "created_at": row["created_at"].isoformat(),
+                        "user": {
+                            "id": user.id,
+                            "name": user.name,
+                            "nickname": user.nickname,
+                            "email": user.email,
+                            "profile_image": getattr(user, 'profile_image', None),
                         }
                     }
-
-                    # 발신자에게도 전송 (ID 확인용)
-                    await websocket.send_json(response)
-                    # 다른 사용자들에게 브로드캐스트
-                    await chat_manager.broadcast(response, project_id, websocket)
+                }
+
+                # 한 번만 인코딩해서 발신자/다른 사용자에게 같은 프레임 전송
+                frame = encode_frame(response)
+                # 2. 다른 사용자들에게는 저장을 기다리지 않고 바로 브로드캐스트
+                await chat_manager.broadcast(frame, project_id, websocket)
+                # 3. 발신자 응답 (ID 확인용): CHAT_DURABILITY=flush면 커밋된 뒤에 전송
+                if CHAT_DURABILITY == "flush":
+                    try:
+                        await saved
+                    except Exception:
+                        continue  # 실패 알림은 notify_failed에서 전송
+                await websocket.send_text(frame)
 
             elif msg_type == "PING":
                 await websocket.send_json({"type": "PONG"})
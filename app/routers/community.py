@@ -10,8 +10,10 @@ import json
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, WebSocket, WebSocketDisconnect
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
-from app.database import get_db
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import get_db, get_async_db
 from app.models.user import User
 from app.models.community import CommunityPost, CommunityComment
 from app.routers.workspace import get_current_user_id
@@ -21,8 +23,11 @@ from app.schemas import (
     CommunityCommentCreate,
     CommunityCommentUpdate
 )
-from app.utils.logger import log_activity
+from app.utils.logger import log_activity_async
 from app.utils.connection_manager import community_event_manager
+from app.utils.profile_cache import profile_cache
+from app.utils.thumbnails import thumbnail_generator
+from app.utils.thumbnail_render import remove_thumbnails
 from vectorwave import vectorize
 
 router = APIRouter(tags=["Community"])
@@ -76,6 +81,7 @@ def get_community_posts(
         ]
         results.append(CommunityPostResponse(
             id=post.id, title=post.title, content=post.content, image_url=post.image_url,
+            image_thumbnail_url=post.image_thumbnail_url,
             user_id=post.user_id,
             user=post.user,  # 👈 작성자 정보 전체 전달
             created_at=post.created_at, updated_at=post.updated_at,
@@ -93,10 +99,11 @@ async def create_community_post(
         content: str = Form(...),
         file: Optional[UploadFile] = File(None),  # ✅ 사진 1장 (선택)
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     # 1. 이미지 저장 처리
     image_url = None
+    file_path = None
     if file:
         if not file.content_type.startswith("image/"):
             raise HTTPException(status_code=400, detail="이미지 파일만 업로드 가능합니다.")
@@ -118,14 +125,16 @@ async def create_community_post(
         user_id=user_id
     )
     db.add(new_post)
-    db.commit()
-    db.refresh(new_post)
+    await db.commit()
+    await db.refresh(new_post)
+    if file_path:
+        thumbnail_generator.enqueue("community_post", new_post.id, file_path)
 
     # 3. 작성자 정보 조회 (응답용)
-    user = db.get(User, user_id)
+    user = await profile_cache.load(db, user_id)
 
     # 4. 로그 기록
-    log_activity(
+    await log_activity_async(
         db=db, user_id=user_id, workspace_id=None, action_type="POST",
         content=f"📢 '{user.name}'님이 전체 게시판에 글을 남겼습니다: {title}"
     )
@@ -133,6 +142,7 @@ async def create_community_post(
     # 5. 응답 반환
     response = CommunityPostResponse(
         id=new_post.id, title=new_post.title, content=new_post.content, image_url=new_post.image_url,
+        image_thumbnail_url=new_post.image_thumbnail_url,
         user_id=new_post.user_id,
         user=user,
         created_at=new_post.created_at, updated_at=new_post.updated_at,
@@ -157,9 +167,9 @@ async def create_community_comment(
         post_id: int,
         comment_data: CommunityCommentCreate,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    post = db.get(CommunityPost, post_id)
+    post = await db.get(CommunityPost, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
 
@@ -169,11 +179,11 @@ async def create_community_comment(
         content=comment_data.content
     )
     db.add(new_comment)
-    db.commit()
-    db.refresh(new_comment)
+    await db.commit()
+    await db.refresh(new_comment)
 
     # 작성자 정보 조회
-    user = db.get(User, user_id)
+    user = await profile_cache.load(db, user_id)
 
     response = CommunityCommentResponse(
         id=new_comment.id, content=new_comment.content, user_id=new_comment.user_id,
@@ -214,6 +224,7 @@ def get_community_post(
 
     return CommunityPostResponse(
         id=post.id, title=post.title, content=post.content, image_url=post.image_url,
+        image_thumbnail_url=post.image_thumbnail_url,
         user_id=post.user_id,
         user=post.user,  # 👈 User 객체 전달
         created_at=post.created_at, updated_at=post.updated_at,
@@ -228,9 +239,9 @@ def get_community_post(
 async def delete_community_post(
         post_id: int,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    post = db.get(CommunityPost, post_id)
+    post = await db.get(CommunityPost, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="게시글이 없습니다.")
 
@@ -244,11 +255,12 @@ async def delete_community_post(
             file_path = os.path.join(UPLOAD_DIR, filename)
             if os.path.exists(file_path):
                 os.remove(file_path)
+            remove_thumbnails(file_path)
         except Exception:
             pass # 파일 삭제 실패는 무시
 
-    db.delete(post)
-    db.commit()
+    await db.delete(post)
+    await db.commit()
 
     await community_event_manager.broadcast({
         "type": "POST_DELETED",
@@ -266,10 +278,10 @@ async def delete_community_post(
 async def delete_community_comment(
         comment_id: int,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     # 1. 댓글 조회
-    comment = db.get(CommunityComment, comment_id)
+    comment = await db.get(CommunityComment, comment_id)
     if not comment:
         raise HTTPException(status_code=404, detail="댓글을 찾을 수 없습니다.")
 
@@ -280,8 +292,8 @@ async def delete_community_comment(
     post_id = comment.post_id
 
     # 3. 삭제
-    db.delete(comment)
-    db.commit()
+    await db.delete(comment)
+    await db.commit()
 
     await community_event_manager.broadcast({
         "type": "COMMENT_DELETED",
@@ -303,10 +315,17 @@ async def update_community_post(
         file: Optional[UploadFile] = File(None),
         remove_image: Optional[str] = Form(None),
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    # 1. 게시글 조회
-    post = db.get(CommunityPost, post_id)
+    # 1. 게시글 조회 (응답용 작성자/댓글 정보까지 한 번에 로드)
+    post = (await db.exec(
+        select(CommunityPost)
+        .where(CommunityPost.id == post_id)
+        .options(
+            selectinload(CommunityPost.user),
+            selectinload(CommunityPost.comments).selectinload(CommunityComment.user),
+        )
+    )).first()
     if not post:
         raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
 
@@ -328,9 +347,11 @@ async def update_community_post(
             old_path = os.path.join(UPLOAD_DIR, old_filename)
             if os.path.exists(old_path):
                 os.remove(old_path)
+            remove_thumbnails(old_path)
         except Exception:
             pass
         post.image_url = None
+        post.image_thumbnail_url = None
 
     if file:
         if not file.content_type.startswith("image/"):
@@ -343,6 +364,7 @@ async def update_community_post(
                 old_path = os.path.join(UPLOAD_DIR, old_filename)
                 if os.path.exists(old_path):
                     os.remove(old_path)
+                remove_thumbnails(old_path)
             except Exception:
                 pass
 
@@ -353,12 +375,14 @@ async def update_community_post(
         with open(new_path, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
         post.image_url = f"/static/community/{new_filename}"
+        post.image_thumbnail_url = None  # 새 썸네일은 백그라운드에서 생성
 
     post.updated_at = datetime.now()
 
     db.add(post)
-    db.commit()
-    db.refresh(post)
+    await db.commit()
+    if file:
+        thumbnail_generator.enqueue("community_post", post.id, new_path)
 
     # 응답 형식 맞추기 (댓글 목록 포함)
     comments_resp = [
@@ -371,6 +395,7 @@ async def update_community_post(
 
     response = CommunityPostResponse(
         id=post.id, title=post.title, content=post.content, image_url=post.image_url,
+        image_thumbnail_url=post.image_thumbnail_url,
         user_id=post.user_id,
         user=post.user,
         created_at=post.created_at, updated_at=post.updated_at,
@@ -394,10 +419,10 @@ async def update_community_comment(
         comment_id: int,
         comment_data: CommunityCommentUpdate,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     # 1. 댓글 조회
-    comment = db.get(CommunityComment, comment_id)
+    comment = await db.get(CommunityComment, comment_id)
     if not comment:
         raise HTTPException(status_code=404, detail="댓글을 찾을 수 없습니다.")
 
@@ -408,8 +433,8 @@ async def update_community_comment(
     # 3. 내용 수정
     comment.content = comment_data.content
     db.add(comment)
-    db.commit()
-    db.refresh(comment)
+    await db.commit()
+    await db.refresh(comment, attribute_names=["user"])  # 응답에 작성자 정보 포함
 
     response = CommunityCommentResponse(
         id=comment.id, content=comment.content, user_id=comment.user_id,
@@ -2,22 +2,35 @@
 
 import os
 import uuid
-import shutil
-from typing import List
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
+import asyncio
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks, Request, Response, Query
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import FileResponse  # 👈 파일 전송용
+from fastapi.responses import FileResponse, StreamingResponse  # 👈 파일 전송용
 from sqlmodel import Session, select, desc
+from sqlalchemy import func, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import aliased
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.routers.workspace import get_current_user_id
-from app.models.file import FileMetadata, FileVersion
+from app.models.file import FileMetadata, FileVersion, UploadSession, UploadChunk
 from app.models.workspace import Project
 from app.models.user import User
-from app.schemas import FileResponse as FileSchema, FileVersionResponse
-from app.utils.logger import log_activity
+from app.schemas import FileResponse as FileSchema, FileVersionResponse, UploadSessionCreate, UploadSessionResponse
+from app.utils.logger import log_activity_async
 from app.utils.connection_manager import board_event_manager
+from app.utils.thumbnails import thumbnail_generator
+from app.utils.etag import project_etag, etag_matches, not_modified, http_date, not_modified_since
+from app.utils.file_storage import (
+    project_quota_remaining, upload_limit, save_upload, save_uploads, acquire_blob, release_blob, remove_temp_files,
+    UPLOAD_SESSION_DIR, RESUMABLE_CHUNK_SIZE, RESUMABLE_MIN_CHUNK_SIZE, RESUMABLE_MAX_CHUNK_SIZE, RESUMABLE_MAX_CHUNKS,
+    UPLOAD_SESSION_TTL,
+    total_chunks, create_sparse_file, write_chunk, hash_file, discard_upload_session, stream_zip
+)
 from vectorwave import vectorize
 
 router = APIRouter(tags=["Files"])
@@ -25,12 +38,15 @@ router = APIRouter(tags=["Files"])
 UPLOAD_DIR = "/app/uploads/files"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# 파일 버전은 바뀌지 않으므로 브라우저가 재검증 없이 재사용 (로그인 사용자 데이터라 공유 캐시는 제외)
+FILE_VERSION_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
 # =================================================================
 # 📥 1. 파일 다운로드 (특정 버전) - [복구됨]
 # =================================================================
 @router.get("/files/download/{version_id}")
 @vectorize(search_description="Download file version", capture_return_value=False)
-def download_file_version(version_id: int, db: Session = Depends(get_db)):
+def download_file_version(version_id: int, request: Request, db: Session = Depends(get_db)):
     # 1. 버전 정보 조회
     version = db.get(FileVersion, version_id)
     if not version:
@@ -45,11 +61,23 @@ def download_file_version(version_id: int, db: Session = Depends(get_db)):
     if not os.path.exists(version.saved_path):
         raise HTTPException(status_code=404, detail="서버에 실제 파일이 존재하지 않습니다.")
 
-    # 4. 다운로드 제공 (파일명: v1_원래이름.ext)
+    # 4. 버전은 한 번 올라가면 바뀌지 않으므로 내용 해시를 ETag로 쓰고 오래 캐시
+    etag = f'"{version.sha256}"' if version.sha256 else f'"v{version.id}-{version.file_size}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(version.created_at),
+        "Cache-Control": FILE_VERSION_CACHE_CONTROL,
+    }
+    if etag_matches(request, etag) or not_modified_since(request, version.created_at):
+        return Response(status_code=304, headers=headers)
+
+    # 5. 다운로드 제공 (파일명: v1_원래이름.ext)
+    #    Range / If-Range는 FileResponse가 처리 (206 Partial Content, 여러 구간은 multipart/byteranges)
     return FileResponse(
         path=version.saved_path,
         filename=f"v{version.version}_{file_meta.filename}",
-        media_type="application/octet-stream"
+        media_type="application/octet-stream",
+        headers=headers
     )
 
 # =================================================================
@@ -79,91 +107,115 @@ def get_file_history(
 # 📤 3. 파일 업로드 API (단건 & 배치)
 # =================================================================
 
-@router.post("/projects/{project_id}/files", response_model=FileSchema)
-@vectorize(search_description="Upload file to project", capture_return_value=True, replay=True)
-async def upload_file(
-        project_id: int,
-        file: UploadFile = File(...),
-        user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
-):
-    project = db.get(Project, project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-
-    user = db.get(User, user_id)
-
-    file_ext = os.path.splitext(file.filename)[1]
-    saved_filename = f"{uuid.uuid4()}{file_ext}"
-    saved_path = os.path.join(UPLOAD_DIR, saved_filename)
-
-    with open(saved_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-
-    file_size = os.path.getsize(saved_path)
-
-    existing_file = db.exec(
+async def add_file_version(
+        db: AsyncSession, project_id: int, filename: str, user_id: int,
+        temp_path: str, file_size: int, sha256: str
+) -> Tuple[FileMetadata, FileVersion]:
+    """
+    save_upload()로 받은 임시 파일을 새 버전으로 등록
+    같은 이름의 파일이 있으면 버전 +1, 없으면 새 파일 (단건/이어받기 업로드 공통)
+    메타데이터/blob 참조/버전을 한 번에 커밋 (실패하면 호출 측에서 롤백 -> 버전 없는 파일이 남지 않음)
+    """
+    existing_file = (await db.exec(
         select(FileMetadata)
         .where(FileMetadata.project_id == project_id)
-        .where(FileMetadata.filename == file.filename)
-    ).first()
+        .where(FileMetadata.filename == filename)
+    )).first()
 
     current_version_num = 1
-    target_file_id = None
 
     if existing_file:
-        last_version = db.exec(
+        last_version = (await db.exec(
             select(FileVersion)
             .where(FileVersion.file_id == existing_file.id)
             .order_by(desc(FileVersion.version))
-        ).first()
+        )).first()
 
         if last_version:
             current_version_num = last_version.version + 1
 
-        target_file_id = existing_file.id
         existing_file.updated_at = datetime.now()
         db.add(existing_file)
     else:
-        new_file = FileMetadata(
+        existing_file = FileMetadata(
             project_id=project_id,
-            filename=file.filename,
+            filename=filename,
             owner_id=user_id
         )
-        db.add(new_file)
-        db.commit()
-        db.refresh(new_file)
-        target_file_id = new_file.id
-        existing_file = new_file
+        db.add(existing_file)
+        await db.flush()  # 새 파일 id 발급
+
+    # 같은 내용이 이미 저장되어 있으면 공유 (버전 추가와 같은 트랜잭션에서 참조 수 증가)
+    saved_path = await acquire_blob(db, temp_path, sha256, file_size)
 
     new_version = FileVersion(
-        file_id=target_file_id,
+        file_id=existing_file.id,
         version=current_version_num,
         saved_path=saved_path,
         file_size=file_size,
+        sha256=sha256,
         uploader_id=user_id
     )
     db.add(new_version)
-    db.commit()
-    db.refresh(new_version)
-
-    response_data = FileSchema(
-        id=existing_file.id,
-        project_id=existing_file.project_id,
-        filename=existing_file.filename,
-        owner_id=existing_file.owner_id,
-        created_at=existing_file.created_at,
+    await db.commit()
+    await db.refresh(new_version)
+
+    return existing_file, new_version
+
+
+def file_to_response(file_meta: FileMetadata, version: FileVersion) -> FileSchema:
+    return FileSchema(
+        id=file_meta.id,
+        project_id=file_meta.project_id,
+        filename=file_meta.filename,
+        owner_id=file_meta.owner_id,
+        created_at=file_meta.created_at,
         latest_version=FileVersionResponse(
-            id=new_version.id,
-            version=new_version.version,
-            file_size=new_version.file_size,
-            created_at=new_version.created_at,
-            uploader_id=new_version.uploader_id
+            id=version.id,
+            version=version.version,
+            file_size=version.file_size,
+            created_at=version.created_at,
+            uploader_id=version.uploader_id,
+            sha256=version.sha256,
+            thumbnail_url=version.thumbnail_url
         )
     )
 
+
+@router.post("/projects/{project_id}/files", response_model=FileSchema)
+@vectorize(search_description="Upload file to project", capture_return_value=True, replay=True)
+async def upload_file(
+        project_id: int,
+        file: UploadFile = File(...),
+        user_id: int = Depends(get_current_user_id),
+        db: AsyncSession = Depends(get_async_db)
+):
+    project = await db.get(Project, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    user = await db.get(User, user_id)
+
+    # 청크 단위로 임시 저장하면서 크기/해시 계산 (한도를 넘으면 중간에 중단)
+    temp_path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4()}.part")
+    max_bytes = upload_limit(await project_quota_remaining(db, project_id))
+    file_size, sha256 = await save_upload(file, temp_path, max_bytes)
+
+    try:
+        existing_file, new_version = await add_file_version(
+            db, project_id, file.filename, user_id, temp_path, file_size, sha256
+        )
+    except BaseException:
+        await db.rollback()
+        await remove_temp_files([temp_path])  # blob으로 옮겨지지 않았으면 남아 있음
+        raise
+    current_version_num = new_version.version
+    response_data = file_to_response(existing_file, new_version)
+    # 이미지/PDF면 백그라운드에서 썸네일 생성
+    thumbnail_generator.enqueue("file_version", new_version.id, new_version.saved_path, project_id)
+
     action_msg = "업로드" if current_version_num == 1 else f"새 버전(v{current_version_num}) 업데이트"
-    log_activity(
+    await log_activity_async(
         db=db, user_id=user_id, workspace_id=project.workspace_id, action_type="UPLOAD",
         content=f"💾 '{user.name}'님이 파일 '{file.filename}'을(를) {action_msg}했습니다."
     )
@@ -177,178 +229,251 @@ async def upload_file(
 
     return response_data
 
+async def add_file_versions(
+        db: AsyncSession, project_id: int, user_id: int,
+        uploads: List[Tuple[str, str, int, str]]
+) -> List[Tuple[FileMetadata, FileVersion]]:
+    """
+    배치 업로드용 add_file_version(): [(filename, temp_path, file_size, sha256), ...]를 한 트랜잭션으로 등록 (커밋은 호출 측에서)
+    - 기존 파일과 마지막 버전 번호를 쿼리 한 번으로 조회
+    - 같은 이름이 여러 번 있으면 순서대로 버전 +1
+    """
+    filenames = {filename for filename, _, _, _ in uploads}
+    rows = (await db.exec(
+        select(FileMetadata, func.max(FileVersion.version))
+        .outerjoin(FileVersion, FileVersion.file_id == FileMetadata.id)
+        .where(FileMetadata.project_id == project_id)
+        .where(FileMetadata.filename.in_(filenames))
+        .group_by(FileMetadata.id)
+        .order_by(FileMetadata.id)
+    )).all()
+
+    files_by_name = {}
+    last_versions = {}
+    for file_meta, last_version in rows:
+        if file_meta.filename in files_by_name:
+            continue  # 같은 이름이 여러 개면 단건 업로드처럼 먼저 만들어진 파일 사용
+        files_by_name[file_meta.filename] = file_meta
+        last_versions[file_meta.id] = last_version or 0
+
+    now = datetime.now()
+    for filename in filenames:
+        if filename in files_by_name:
+            files_by_name[filename].updated_at = now
+        else:
+            files_by_name[filename] = FileMetadata(project_id=project_id, filename=filename, owner_id=user_id)
+        db.add(files_by_name[filename])
+    await db.flush()  # 새 파일 id 발급
+
+    # blob 참조 수 증가는 sha256 순서로 (동시에 올라온 배치끼리 행 잠금 순서가 엇갈리지 않도록)
+    saved_paths = {}
+    for _, temp_path, file_size, sha256 in sorted(uploads, key=lambda upload: upload[3]):
+        saved_paths[temp_path] = await acquire_blob(db, temp_path, sha256, file_size)
+
+    results = []
+    for filename, temp_path, file_size, sha256 in uploads:
+        file_meta = files_by_name[filename]
+        last_versions[file_meta.id] = last_versions.get(file_meta.id, 0) + 1
+        new_version = FileVersion(
+            file_id=file_meta.id,
+            version=last_versions[file_meta.id],
+            saved_path=saved_paths[temp_path],
+            file_size=file_size,
+            sha256=sha256,
+            uploader_id=user_id
+        )
+        db.add(new_version)
+        results.append((file_meta, new_version))
+    await db.flush()  # 버전 id 발급
+
+    return results
+
+
 @router.post("/projects/{project_id}/files/batch", response_model=List[FileSchema])
 @vectorize(search_description="Batch upload files", capture_return_value=True)
 async def upload_files_batch(
         project_id: int,
         files: List[UploadFile] = File(...),
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    project = db.get(Project, project_id)
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    user = db.get(User, user_id)
-    results = []
+    user = await db.get(User, user_id)
 
-    for file in files:
-        file_ext = os.path.splitext(file.filename)[1]
-        saved_filename = f"{uuid.uuid4()}{file_ext}"
-        saved_path = os.path.join(UPLOAD_DIR, saved_filename)
-
-        with open(saved_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        file_size = os.path.getsize(saved_path)
-
-        existing_file = db.exec(
-            select(FileMetadata)
-            .where(FileMetadata.project_id == project_id)
-            .where(FileMetadata.filename == file.filename)
-        ).first()
-
-        current_version_num = 1
-        target_file_id = None
-
-        if existing_file:
-            last_version = db.exec(
-                select(FileVersion)
-                .where(FileVersion.file_id == existing_file.id)
-                .order_by(desc(FileVersion.version))
-            ).first()
-            if last_version:
-                current_version_num = last_version.version + 1
-            target_file_id = existing_file.id
-            existing_file.updated_at = datetime.now()
-            db.add(existing_file)
-        else:
-            new_file = FileMetadata(
-                project_id=project_id,
-                filename=file.filename,
-                owner_id=user_id
-            )
-            db.add(new_file)
-            db.commit()
-            db.refresh(new_file)
-            target_file_id = new_file.id
-            existing_file = new_file
+    # 1. 모든 파일을 동시에 임시 저장 (하나라도 실패하면 전체 취소)
+    temp_paths = [os.path.join(UPLOAD_DIR, f"{uuid.uuid4()}.part") for _ in files]
+    saved = await save_uploads(files, temp_paths, await project_quota_remaining(db, project_id))
 
-        new_version = FileVersion(
-            file_id=target_file_id,
-            version=current_version_num,
-            saved_path=saved_path,
-            file_size=file_size,
-            uploader_id=user_id
+    # 2. 파일/버전 등록 + 활동 로그 1건을 한 트랜잭션으로 커밋
+    try:
+        added = await add_file_versions(db, project_id, user_id, [
+            (file.filename, temp_path, file_size, sha256)
+            for file, temp_path, (file_size, sha256) in zip(files, temp_paths, saved)
+        ])
+        if len(files) == 1:
+            content = f"💾 '{user.name}'님이 파일 '{files[0].filename}'을(를) 업로드했습니다."
+        else:
+            content = f"💾 '{user.name}'님이 파일 '{files[0].filename}' 외 {len(files) - 1}개를 업로드했습니다."
+        await log_activity_async(
+            db=db, user_id=user_id, workspace_id=project.workspace_id, action_type="UPLOAD", content=content
         )
-        db.add(new_version)
-        db.commit()
-        db.refresh(new_version)
-
-        results.append(FileSchema(
-            id=existing_file.id,
-            project_id=existing_file.project_id,
-            filename=existing_file.filename,
-            owner_id=existing_file.owner_id,
-            created_at=existing_file.created_at,
-            latest_version=FileVersionResponse(
-                id=new_version.id,
-                version=new_version.version,
-                file_size=new_version.file_size,
-                created_at=new_version.created_at,
-                uploader_id=new_version.uploader_id
-            )
-        ))
-
-        try:
-            action_msg = "업로드" if current_version_num == 1 else f"새 버전(v{current_version_num}) 업데이트"
-            log_activity(
-                db=db,
-                user_id=user_id,
-                workspace_id=project.workspace_id,
-                action_type="UPLOAD",
-                content=f"💾 '{user.name}'님이 파일 '{file.filename}'을(를) {action_msg}했습니다."
-            )
-        except Exception:
-            pass
+    except BaseException:
+        await db.rollback()
+        await remove_temp_files(temp_paths)  # blob으로 옮겨지지 않은 것만 남아 있음
+        raise
+
+    results = [file_to_response(file_meta, new_version) for file_meta, new_version in added]
+    for _, new_version in added:
+        thumbnail_generator.enqueue("file_version", new_version.id, new_version.saved_path, project_id)
 
     # 🔥 [SSE] 배치 알림 (jsonable_encoder 사용)
-    if results:
-        await board_event_manager.broadcast(project_id, {
-            "type": "FILES_BATCH_UPLOADED",
-            "user_id": user_id,
-            "data": jsonable_encoder(results)
-        })
+    await board_event_manager.broadcast(project_id, {
+        "type": "FILES_BATCH_UPLOADED",
+        "user_id": user_id,
+        "data": jsonable_encoder(results)
+    })
 
     return results
 
 
+# 파일 목록 1회 조회 최대 건수
+FILE_PAGE_MAX_LIMIT = 500
+
+
+def latest_files_query(project_id: int):
+    """
+    (FileMetadata, 최신 FileVersion) 조회 쿼리 (목록/ZIP 내보내기 공통)
+    파일마다 (file_id, version) 인덱스에서 최신 버전 1건만 LATERAL 조인으로 읽음 (버전이 없는 파일은 제외)
+    """
+    latest = (
+        select(FileVersion)
+        .where(FileVersion.file_id == FileMetadata.id)
+        .order_by(desc(FileVersion.version))
+        .limit(1)
+        .lateral("latest_version")
+    )
+    latest_version = aliased(FileVersion, latest)
+    return (
+        select(FileMetadata, latest_version)
+        .join(latest, true())
+        .where(FileMetadata.project_id == project_id)
+    )
+
+
+# 파일 목록: 파일별 최신 버전을 같은 쿼리에서 LATERAL 조인으로 조회 (파일 수만큼 추가 쿼리 없음)
+#    - id 기준 keyset 페이지네이션: after_id 이후 파일을 limit개 (limit 없으면 전체)
+#    - prefix: 파일명 접두어 검색 ((project_id, filename) 인덱스 사용)
 @router.get("/projects/{project_id}/files", response_model=List[FileSchema])
 @vectorize(search_description="List project files", capture_return_value=True)
 def get_project_files(
         project_id: int,
+        request: Request,
+        response: Response,
+        limit: Optional[int] = None,
+        after_id: int = 0,
+        prefix: Optional[str] = None,
         db: Session = Depends(get_db)
 ):
-    files = db.exec(select(FileMetadata).where(FileMetadata.project_id == project_id)).all()
+    # 변경이 없으면 304로 응답 (조회/직렬화 생략)
+    etag = project_etag(project_id, "files", request)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # 1. 파일별 최신 버전 (한 번의 쿼리)
+    query = latest_files_query(project_id)
+
+    # 2. 필터 / 페이지네이션
+    if prefix:
+        query = query.where(FileMetadata.filename.startswith(prefix, autoescape=True))
+    if after_id > 0:
+        query = query.where(FileMetadata.id > after_id)
+    query = query.order_by(FileMetadata.id)
+    if limit is not None:
+        query = query.limit(max(1, min(limit, FILE_PAGE_MAX_LIMIT)))
+
+    results = [file_to_response(f, v) for f, v in db.exec(query).all()]
+
+    response.headers["ETag"] = etag
+    return results
 
-    results = []
-    for f in files:
-        latest_v = db.exec(
-            select(FileVersion)
-            .where(FileVersion.file_id == f.id)
-            .order_by(desc(FileVersion.version))
-        ).first()
-
-        if latest_v:
-            results.append(FileSchema(
-                id=f.id,
-                project_id=f.project_id,
-                filename=f.filename,
-                owner_id=f.owner_id,
-                created_at=f.created_at,
-                latest_version=FileVersionResponse(
-                    id=latest_v.id,
-                    version=latest_v.version,
-                    file_size=latest_v.file_size,
-                    created_at=latest_v.created_at,
-                    uploader_id=latest_v.uploader_id
-                )
-            ))
+# 📦 프로젝트 파일 ZIP 내보내기 (파일별 최신 버전)
+#    - file_ids를 주면 해당 파일만, 없으면 전체
+#    - 압축하면서 바로 전송하므로 프로젝트 크기와 관계없이 메모리 사용량 일정
+@router.get("/projects/{project_id}/files/export")
+@vectorize(search_description="Export project files as zip", capture_return_value=False)
+async def export_project_files(
+        project_id: int,
+        request: Request,
+        file_ids: Optional[List[int]] = Query(None),
+        user_id: int = Depends(get_current_user_id),
+        db: AsyncSession = Depends(get_async_db)
+):
+    project = await db.get(Project, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
 
-    return results
+    # 1. 파일별 최신 버전 조회
+    query = latest_files_query(project_id)
+    if file_ids:
+        query = query.where(FileMetadata.id.in_(file_ids))
+    rows = (await db.exec(query.order_by(FileMetadata.filename, FileMetadata.id))).all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="내보낼 파일이 없습니다.")
+
+    # 2. 압축 파일 안의 이름 정리 (경로 구분자 제거, 같은 이름은 번호 추가)
+    entries = []
+    used_names = set()
+    for file_meta, version in rows:
+        name = file_meta.filename.replace("/", "_").replace("\\", "_").lstrip(".") or f"file_{file_meta.id}"
+        stem, ext = os.path.splitext(name)
+        counter = 1
+        while name in used_names:
+            counter += 1
+            name = f"{stem} ({counter}){ext}"
+        used_names.add(name)
+        entries.append((name, version.saved_path, version.created_at, version.file_size))
+
+    # 3. 스트림이 끝날 때까지 DB 커넥션을 잡고 있지 않도록 반납
+    archive_name = f"{project.name}.zip"
+    await db.close()
+
+    return StreamingResponse(
+        stream_zip(entries, request.is_disconnected),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(archive_name)}"}
+    )
 
 @router.delete("/files/{file_id}")
 @vectorize(search_description="Delete file", capture_return_value=True)
 async def delete_file(
         file_id: int,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    file_meta = db.get(FileMetadata, file_id)
+    file_meta = await db.get(FileMetadata, file_id)
     if not file_meta:
         raise HTTPException(status_code=404, detail="File not found")
 
-    project = db.get(Project, file_meta.project_id)
+    project = await db.get(Project, file_meta.project_id)
     filename = file_meta.filename
     project_id = file_meta.project_id
 
-    # 1. 버전 정보(자식) 먼저 삭제
-    versions = db.exec(select(FileVersion).where(FileVersion.file_id == file_id)).all()
+    # 1. 버전 정보(자식) 먼저 삭제 (다른 버전/프로젝트가 같은 내용을 쓰고 있으면 실제 파일은 유지)
+    versions = (await db.exec(select(FileVersion).where(FileVersion.file_id == file_id))).all()
     for v in versions:
-        if os.path.exists(v.saved_path):
-            try:
-                os.remove(v.saved_path)
-            except OSError:
-                pass
-        db.delete(v)
+        await release_blob(db, v)
+        await db.delete(v)
 
     # 2. 메타데이터(부모) 삭제
-    db.delete(file_meta)
-    db.commit()
+    await db.delete(file_meta)
+    await db.commit()
 
     if project:
-        user = db.get(User, user_id)
-        log_activity(
+        user = await db.get(User, user_id)
+        await log_activity_async(
             db=db, user_id=user_id, workspace_id=project.workspace_id, action_type="DELETE",
             content=f"🗑️ '{user.name}'님이 파일 '{filename}'을(를) 삭제했습니다."
         )
@@ -360,4 +485,251 @@ async def delete_file(
         "data": {"id": file_id}
     })
 
-    return {"message": "파일이 삭제되었습니다."}
\ No newline at end of file
+    return {"message": "파일이 삭제되었습니다."}
+
+# =================================================================
+# 🧩 4. 이어받기(청크) 업로드 API
+#    세션 생성 -> 청크 전송(순서 무관, 실패한 청크만 재전송) -> commit
+# =================================================================
+
+async def _get_upload_session(db: AsyncSession, upload_id: str, user_id: int, lock: bool = False) -> UploadSession:
+    """본인이 만든, 만료되지 않은 세션만 반환 (없으면 404)"""
+    statement = select(UploadSession).where(UploadSession.id == upload_id)
+    if lock:
+        # 잠근 시점의 값으로 갱신 (같은 세션에서 이미 읽은 객체가 있어도 다시 읽음)
+        statement = statement.with_for_update().execution_options(populate_existing=True)
+    upload = (await db.exec(statement)).first()
+    if not upload or upload.user_id != user_id or upload.expires_at < datetime.now():
+        raise HTTPException(status_code=404, detail="업로드 세션이 없거나 만료되었습니다.")
+    return upload
+
+
+def _ensure_not_committing(upload: UploadSession):
+    if upload.committing_at is not None:
+        raise HTTPException(status_code=409, detail="이미 처리 중인 업로드입니다.")
+
+
+async def _received_chunks(db: AsyncSession, upload_id: str) -> List[int]:
+    return list((await db.exec(
+        select(UploadChunk.chunk_index)
+        .where(UploadChunk.upload_id == upload_id)
+        .order_by(UploadChunk.chunk_index)
+    )).all())
+
+
+async def _abort_upload_session(db: AsyncSession, upload_id: str):
+    """commit 실패 시 세션/청크 기록 삭제 (실패해도 만료 후 sweeper가 정리)"""
+    try:
+        upload = await db.get(UploadSession, upload_id)
+        if upload is not None:
+            await discard_upload_session(db, upload, remove_file=False)
+            await db.commit()
+    except Exception:
+        await db.rollback()
+
+
+def _upload_session_response(upload: UploadSession, received: List[int]) -> UploadSessionResponse:
+    # 앞에서부터 끊김 없이 받은 청크 수
+    contiguous = 0
+    for chunk_index in received:
+        if chunk_index != contiguous:
+            break
+        contiguous += 1
+    return UploadSessionResponse(
+        id=upload.id,
+        project_id=upload.project_id,
+        filename=upload.filename,
+        file_size=upload.file_size,
+        chunk_size=upload.chunk_size,
+        total_chunks=total_chunks(upload.file_size, upload.chunk_size),
+        received_chunks=received,
+        offset=min(contiguous * upload.chunk_size, upload.file_size),
+        expires_at=upload.expires_at
+    )
+
+
+@router.post("/projects/{project_id}/uploads", response_model=UploadSessionResponse)
+@vectorize(search_description="Create resumable upload session", capture_return_value=True)
+async def create_upload_session(
+        project_id: int,
+        session_data: UploadSessionCreate,
+        user_id: int = Depends(get_current_user_id),
+        db: AsyncSession = Depends(get_async_db)
+):
+    project = await db.get(Project, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    # 1. 크기 검증 (한도는 commit 시점에 한 번 더 확인)
+    if session_data.file_size < 0:
+        raise HTTPException(status_code=400, detail="파일 크기가 올바르지 않습니다.")
+    max_bytes = upload_limit(await project_quota_remaining(db, project_id))
+    if max_bytes is not None and session_data.file_size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"업로드 가능한 용량을 초과했습니다. (최대 {max_bytes} bytes)")
+
+    chunk_size = session_data.chunk_size or RESUMABLE_CHUNK_SIZE
+    # 파일 전체가 청크 1개에 들어가는 경우가 아니면 최소 크기 이상 (작은 청크로 청크 기록이 폭증하지 않도록)
+    min_chunk_size = min(RESUMABLE_MIN_CHUNK_SIZE, max(session_data.file_size, 1))
+    if chunk_size < min_chunk_size or chunk_size > RESUMABLE_MAX_CHUNK_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"청크 크기는 {min_chunk_size} ~ {RESUMABLE_MAX_CHUNK_SIZE} bytes 입니다."
+        )
+    if total_chunks(session_data.file_size, chunk_size) > RESUMABLE_MAX_CHUNKS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"청크 수는 최대 {RESUMABLE_MAX_CHUNKS}개입니다. 청크 크기를 늘려 주세요."
+        )
+
+    # 2. 전체 크기의 임시 파일 생성 (청크는 각자 위치에 바로 기록)
+    upload_id = uuid.uuid4().hex
+    temp_path = os.path.join(UPLOAD_SESSION_DIR, f"{upload_id}.part")
+    await asyncio.to_thread(create_sparse_file, temp_path, session_data.file_size)
+
+    upload = UploadSession(
+        id=upload_id,
+        project_id=project_id,
+        user_id=user_id,
+        filename=session_data.filename,
+        file_size=session_data.file_size,
+        chunk_size=chunk_size,
+        temp_path=temp_path,
+        expires_at=datetime.now() + timedelta(seconds=UPLOAD_SESSION_TTL)
+    )
+    db.add(upload)
+    await db.commit()
+
+    return _upload_session_response(upload, [])
+
+
+@router.put("/uploads/{upload_id}/chunks/{chunk_index}", response_model=UploadSessionResponse)
+@vectorize(search_description="Upload file chunk", capture_return_value=False)
+async def upload_chunk(
+        upload_id: str,
+        chunk_index: int,
+        request: Request,
+        user_id: int = Depends(get_current_user_id),
+        db: AsyncSession = Depends(get_async_db)
+):
+    upload = await _get_upload_session(db, upload_id, user_id)
+    _ensure_not_committing(upload)
+    count = total_chunks(upload.file_size, upload.chunk_size)
+    if chunk_index < 0 or chunk_index >= count:
+        raise HTTPException(status_code=400, detail=f"청크 번호는 0 ~ {count - 1} 입니다.")
+
+    # 1. 본문을 받는 동안 DB 연결을 잡고 있지 않도록 트랜잭션 종료
+    await db.commit()
+
+    # 2. 요청 본문을 해당 위치에 바로 기록 (마지막 청크만 짧을 수 있음)
+    offset = chunk_index * upload.chunk_size
+    length = min(upload.chunk_size, upload.file_size - offset)
+    await write_chunk(request.stream(), upload.temp_path, offset, length)
+
+    # 3. 받는 동안 세션이 commit/취소/만료되었을 수 있으므로 잠그고 다시 확인 (없으면 404, 처리 중이면 409)
+    upload = await _get_upload_session(db, upload_id, user_id, lock=True)
+    _ensure_not_committing(upload)
+
+    # 4. 받은 청크 기록 + 만료 시간 연장 (같은 청크 재전송은 덮어쓰기)
+    await db.execute(
+        pg_insert(UploadChunk).values(upload_id=upload_id, chunk_index=chunk_index).on_conflict_do_nothing()
+    )
+    upload.expires_at = datetime.now() + timedelta(seconds=UPLOAD_SESSION_TTL)
+    db.add(upload)
+    await db.commit()
+
+    return _upload_session_response(upload, await _received_chunks(db, upload_id))
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadSessionResponse)
+@vectorize(search_description="Get resumable upload status", capture_return_value=True)
+async def get_upload_session(
+        upload_id: str,
+        user_id: int = Depends(get_current_user_id),
+        db: AsyncSession = Depends(get_async_db)
+):
+    # 연결이 끊긴 뒤 어디서부터 다시 보낼지 확인
+    upload = await _get_upload_session(db, upload_id, user_id)
+    return _upload_session_response(upload, await _received_chunks(db, upload_id))
+
+
+@router.post("/uploads/{upload_id}/commit", response_model=FileSchema)
+@vectorize(search_description="Complete resumable upload", capture_return_value=True)
+async def commit_upload_session(
+        upload_id: str,
+        user_id: int = Depends(get_current_user_id),
+        db: AsyncSession = Depends(get_async_db)
+):
+    # 1. 세션 잠금 후 확인 (같은 세션을 동시에 commit 해도 한 번만 등록)
+    upload = await _get_upload_session(db, upload_id, user_id, lock=True)
+    _ensure_not_committing(upload)
+    received = await _received_chunks(db, upload_id)
+    count = total_chunks(upload.file_size, upload.chunk_size)
+    if len(received) != count:
+        missing = sorted(set(range(count)) - set(received))
+        raise HTTPException(status_code=409, detail={"message": "받지 못한 청크가 있습니다.", "missing_chunks": missing})
+
+    project = await db.get(Project, upload.project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    # 2. 세션을 만든 뒤 다른 업로드로 용량이 찼을 수 있으므로 다시 확인
+    max_bytes = upload_limit(await project_quota_remaining(db, upload.project_id))
+    if max_bytes is not None and upload.file_size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"업로드 가능한 용량을 초과했습니다. (최대 {max_bytes} bytes)")
+
+    # 3. 처리 중으로 표시하고 잠금 해제 (이후 청크 업로드/취소/중복 commit은 409)
+    upload.committing_at = datetime.now()
+    upload.expires_at = upload.committing_at + timedelta(seconds=UPLOAD_SESSION_TTL)
+    db.add(upload)
+    await db.commit()
+
+    project_id, filename, temp_path, file_size = upload.project_id, upload.filename, upload.temp_path, upload.file_size
+    try:
+        # 4. 해시 계산 (큰 파일은 오래 걸리므로 행 잠금/DB 연결 없이)
+        sha256 = await hash_file(temp_path)
+
+        # 5. 세션 정리 + 새 버전 등록을 한 트랜잭션으로 커밋 (임시 파일은 blob 저장소로 이동)
+        upload = await _get_upload_session(db, upload_id, user_id, lock=True)
+        await discard_upload_session(db, upload, remove_file=False)
+        existing_file, new_version = await add_file_version(
+            db, project_id, filename, user_id, temp_path, file_size, sha256
+        )
+    except BaseException:
+        # 이어서 진행할 수 없으므로 세션과 임시 파일 모두 정리 (처음부터 다시 업로드)
+        await db.rollback()
+        await _abort_upload_session(db, upload_id)
+        await remove_temp_files([temp_path])
+        raise
+    current_version_num = new_version.version
+    response_data = file_to_response(existing_file, new_version)
+    thumbnail_generator.enqueue("file_version", new_version.id, new_version.saved_path, project_id)
+
+    user = await db.get(User, user_id)
+    action_msg = "업로드" if current_version_num == 1 else f"새 버전(v{current_version_num}) 업데이트"
+    await log_activity_async(
+        db=db, user_id=user_id, workspace_id=project.workspace_id, action_type="UPLOAD",
+        content=f"💾 '{user.name}'님이 파일 '{filename}'을(를) {action_msg}했습니다."
+    )
+
+    # 🔥 [SSE] 단건 업로드와 같은 알림
+    await board_event_manager.broadcast(project_id, {
+        "type": "FILE_UPLOADED",
+        "user_id": user_id,
+        "data": jsonable_encoder(response_data)
+    })
+
+    return response_data
+
+
+@router.delete("/uploads/{upload_id}")
+@vectorize(search_description="Cancel resumable upload", capture_return_value=True)
+async def cancel_upload_session(
+        upload_id: str,
+        user_id: int = Depends(get_current_user_id),
+        db: AsyncSession = Depends(get_async_db)
+):
+    upload = await _get_upload_session(db, upload_id, user_id, lock=True)
+    _ensure_not_committing(upload)
+    await discard_upload_session(db, upload)
+    await db.commit()
+    return {"message": "업로드가 취소되었습니다."}
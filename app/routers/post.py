@@ -1,28 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
-from typing import List
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional
 from vectorwave import vectorize
 from datetime import datetime
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.routers.workspace import get_current_user_id
 from app.models.post import Post, PostComment
 from app.models.user import User
 from app.schemas import PostCreate, PostUpdate, PostResponse, PostCommentCreate, PostCommentResponse
-from app.utils.logger import log_activity
+from app.utils.logger import log_activity_async
 from app.models.workspace import Project
 from app.utils.connection_manager import board_event_manager
+from app.utils.profile_cache import profile_cache
+from app.utils.etag import project_etag, etag_matches, not_modified
 
 router = APIRouter(tags=["Project Board"])
 
 
+async def load_post(db: AsyncSession, post_id: int) -> Optional[Post]:
+    """PostResponse에 필요한 관계(작성자, 댓글 + 댓글 작성자)까지 로드된 게시글 조회"""
+    statement = (
+        select(Post)
+        .where(Post.id == post_id)
+        .options(
+            selectinload(Post.user),
+            selectinload(Post.comments).selectinload(PostComment.user),
+        )
+        .execution_options(populate_existing=True)
+    )
+    return (await db.exec(statement)).first()
+
+
 # 1. 게시글 목록 조회
 @router.get("/projects/{project_id}/posts", response_model=List[PostResponse])
 @vectorize(search_description="List project posts", capture_return_value=True) # 👈 추가
-def get_project_posts(project_id: int, db: Session = Depends(get_db)):
+def get_project_posts(project_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    # 변경이 없으면 304로 응답 (조회/직렬화 생략)
+    etag = project_etag(project_id, "posts")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     posts = db.exec(
         select(Post).where(Post.project_id == project_id).order_by(Post.created_at.desc())
     ).all()
+    response.headers["ETag"] = etag
     return posts
 
 
@@ -33,16 +57,16 @@ async def create_post(
         project_id: int,
         post_data: PostCreate,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     new_post = Post(project_id=project_id, user_id=user_id, **post_data.model_dump())
     db.add(new_post)
-    db.commit()
-    db.refresh(new_post)
+    await db.commit()
+    new_post = await load_post(db, new_post.id)
 
-    user = db.get(User, user_id)
-    project = db.get(Project, project_id)
-    log_activity(
+    user = await profile_cache.load(db, user_id)
+    project = await db.get(Project, project_id)
+    await log_activity_async(
         db=db, user_id=user_id, workspace_id=project.workspace_id, action_type="POST",
         content=f"📝 '{user.name}'님이 프로젝트 '{project.name}'에 새 글 '{new_post.title}'을(를) 올렸습니다."
     )
@@ -69,23 +93,23 @@ def get_post(post_id: int, db: Session = Depends(get_db)):
 # 4. 게시글 삭제
 @router.delete("/posts/{post_id}")
 @vectorize(search_description="Delete post", capture_return_value=True)
-async def delete_post(post_id: int, user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
-    post = db.get(Post, post_id)
+async def delete_post(post_id: int, user_id: int = Depends(get_current_user_id), db: AsyncSession = Depends(get_async_db)):
+    post = await db.get(Post, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     if post.user_id != user_id:
         raise HTTPException(status_code=403, detail="작성자만 삭제할 수 있습니다.")
 
-    user = db.get(User, user_id)
-    project = db.get(Project, post.project_id)
+    user = await profile_cache.load(db, user_id)
+    project = await db.get(Project, post.project_id)
     project_id = post.project_id
-    log_activity(
+    await log_activity_async(
         db=db, user_id=user_id, workspace_id=project.workspace_id, action_type="POST",
         content=f"🗑️ '{user.name}'님이 글 '{post.title}'을(를) 삭제했습니다."
     )
 
-    db.delete(post)
-    db.commit()
+    await db.delete(post)
+    await db.commit()
 
     await board_event_manager.broadcast(project_id, {
         "type": "POST_DELETED",
@@ -102,17 +126,17 @@ async def create_post_comment(
         post_id: int,
         comment_data: PostCommentCreate,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     comment = PostComment(post_id=post_id, user_id=user_id, content=comment_data.content)
     db.add(comment)
-    db.commit()
-    db.refresh(comment)
+    await db.commit()
+    await db.refresh(comment, attribute_names=["user"])  # 응답에 작성자 정보 포함
 
-    user = db.get(User, user_id)
-    post = db.get(Post, post_id)
-    project = db.get(Project, post.project_id)
-    log_activity(
+    user = await profile_cache.load(db, user_id)
+    post = await db.get(Post, post_id)
+    project = await db.get(Project, post.project_id)
+    await log_activity_async(
         db=db, user_id=user_id, workspace_id=project.workspace_id, action_type="COMMENT",
         content=f"💬 '{user.name}'님이 글 '{post.title}'에 댓글을 남겼습니다."
     )
@@ -131,20 +155,20 @@ async def create_post_comment(
 async def delete_post_comment(
         comment_id: int,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    comment = db.get(PostComment, comment_id)
+    comment = await db.get(PostComment, comment_id)
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
 
     if comment.user_id != user_id:
         raise HTTPException(status_code=403, detail="작성자만 삭제할 수 있습니다.")
 
-    post = db.get(Post, comment.post_id)
+    post = await db.get(Post, comment.post_id)
     post_id = comment.post_id
 
-    db.delete(comment)
-    db.commit()
+    await db.delete(comment)
+    await db.commit()
 
     if post:
         await board_event_manager.broadcast(post.project_id, {
@@ -161,10 +185,10 @@ async def update_post(
         post_id: int,
         post_data: PostUpdate,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     # 1. 게시글 조회
-    post = db.get(Post, post_id)
+    post = await load_post(db, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
@@ -182,12 +206,11 @@ async def update_post(
     post.updated_at = datetime.now()
 
     db.add(post)
-    db.commit()
-    db.refresh(post)
+    await db.commit()
 
-    user = db.get(User, user_id)
-    project = db.get(Project, post.project_id)
-    log_activity(
+    user = await profile_cache.load(db, user_id)
+    project = await db.get(Project, post.project_id)
+    await log_activity_async(
         db=db, user_id=user_id, workspace_id=project.workspace_id, action_type="POST",
         content=f"✏️ '{user.name}'님이 글 '{post.title}'을(를) 수정했습니다."
     )
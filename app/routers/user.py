@@ -10,6 +10,10 @@ from app.models.user import User
 from app.schemas import UserResponse, UserUpdate
 from vectorwave import vectorize
 from app.utils.logger import log_activity
+from app.utils.board_cache import board_cache
+from app.utils.presence import presence_registry
+from app.utils.profile_cache import profile_cache
+from app.utils.thumbnails import thumbnail_generator
 from datetime import datetime
 
 router = APIRouter(tags=["User"])
@@ -46,10 +50,16 @@ def update_profile_image(
     # /static/ 경로로 접근할 수 있게 저장합니다.
     image_url = f"/static/{filename}"
     user.profile_image = image_url
+    user.profile_image_thumbnail = None  # 새 썸네일은 백그라운드에서 생성
 
     db.add(user)
     db.commit()
     db.refresh(user)
+    # 카드 담당자/게시글 작성자로 노출되는 프로필이므로 보드 캐시/ETag 무효화
+    board_cache.invalidate_all()
+    profile_cache.invalidate(user_id)
+    presence_registry.invalidate_user(user_id)
+    thumbnail_generator.enqueue("user", user_id, file_path)
 
     log_activity(
         db=db, user_id=user_id, workspace_id=None, action_type="UPDATE",
@@ -89,6 +99,10 @@ def update_my_info(
     db.add(user)
     db.commit()
     db.refresh(user)
+    # 카드 담당자/게시글 작성자로 노출되는 프로필이므로 보드 캐시/ETag 무효화
+    board_cache.invalidate_all()
+    profile_cache.invalidate(user_id)
+    presence_registry.invalidate_user(user_id)
 
     log_activity(
         db=db, user_id=user_id, workspace_id=None, action_type="UPDATE",
@@ -114,4 +128,7 @@ def withdraw_user(
 
     db.add(user)
     db.commit()
+    board_cache.invalidate_all()
+    profile_cache.invalidate(user_id)
+    presence_registry.invalidate_user(user_id)
     return {"message": "탈퇴 처리되었습니다."}
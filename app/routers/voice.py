@@ -4,6 +4,8 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from typing import Dict, List, Optional
 import json
 
+from app.utils.json_frame import encode_frame
+
 router = APIRouter(tags=["Voice Chat"])
 
 class ConnectionManager:
@@ -35,11 +37,12 @@ class ConnectionManager:
     async def broadcast(self, message: dict, project_id: str, exclude_user: int = None):
         """방에 있는 모든 사람에게 메시지 전송 (나 제외)"""
         if project_id in self.active_connections:
+            frame = encode_frame(message)  # 참여자 수와 관계없이 한 번만 직렬화
             # 딕셔너리 변경 에러 방지를 위해 리스트로 복사 후 순회
             for uid, connection in list(self.active_connections[project_id].items()):
                 if uid != exclude_user:
                     try:
-                        await connection.send_text(json.dumps(message))
+                        await connection.send_text(frame)
                     except Exception:
                         # 연결이 끊긴 소켓 정리
                         self.disconnect(project_id, uid)
@@ -50,7 +53,7 @@ class ConnectionManager:
             if to_user in self.active_connections[project_id]:
                 try:
                     target_ws = self.active_connections[project_id][to_user]
-                    await target_ws.send_text(json.dumps(message))
+                    await target_ws.send_text(encode_frame(message))
                 except Exception:
                     self.disconnect(project_id, to_user)
 
@@ -98,7 +101,7 @@ async def voice_chat_endpoint(websocket: WebSocket, project_id: str):
                     uid for uid in manager.active_connections[project_id].keys()
                     if uid != current_user_id
                 ]
-                await websocket.send_text(json.dumps({
+                await websocket.send_text(encode_frame({
                     "type": "existing_users",
                     "users": existing_users
                 }))
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
 from sqlmodel import Session, select
-from typing import List
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional
 import uuid
-from app.database import get_db
+from app.database import get_db, get_async_db, AsyncSessionLocal
 from app.models.user import User
 from app.models.session import UserSession
 from app.models.workspace import Workspace, WorkspaceMember, Project
@@ -12,15 +13,16 @@ from app.models.invitation import Invitation
 from app.schemas import InvitationCreate, InvitationResponse, InvitationInfo
 from datetime import datetime, timedelta
 from typing import Any
-from app.utils.logger import log_activity
+from app.utils.logger import log_activity, log_activity_async
 from vectorwave import *
 from app.schemas import WorkspaceUpdate, ProjectUpdate
-from fastapi.concurrency import run_in_threadpool
-import asyncio
 import json
 from fastapi import Request
 from fastapi.responses import StreamingResponse
 from app.utils.connection_manager import workspace_event_manager
+from app.utils.session_cache import session_cache, activity_tracker
+from app.utils.board_cache import board_cache
+from app.utils.presence import presence_registry
 
 router = APIRouter(tags=["Workspace & Project"])
 
@@ -32,16 +34,35 @@ def get_current_user_id(session_id: str = Cookie(None), db: Session = Depends(ge
     if not session_id:
         raise HTTPException(status_code=401, detail="로그인이 필요합니다.")
 
-    session = db.get(UserSession, session_id)
-    if not session or session.expires_at < datetime.now():
-        raise HTTPException(status_code=401, detail="세션이 만료되었습니다.")
+    # 1. 캐시 히트 시 DB 조회 없이 바로 인증
+    user_id = session_cache.get(session_id)
+    if user_id is None:
+        session = db.get(UserSession, session_id)
+        if not session or session.expires_at < datetime.now():
+            raise HTTPException(status_code=401, detail="세션이 만료되었습니다.")
+        session_cache.set(session_id, session.user_id, session.expires_at)
+        user_id = session.user_id
+
+    # 2. last_active_at은 메모리에 모았다가 주기적으로 일괄 UPDATE
+    activity_tracker.touch(user_id)
+    # 3. 온라인 상태 갱신 (오프라인 -> 온라인 전환 시 online-members 구독자에게 전송)
+    presence_registry.touch(user_id)
+
+    return user_id
 
-    user = db.get(User, session.user_id)
-    if user:
-        user.last_active_at = datetime.now()
-        db.add(user)
-        db.commit()
 
+async def get_session_user_id(session_id: Optional[str]) -> Optional[int]:
+    """WebSocket용: 세션 쿠키로 확인한 유저 ID (없거나 만료되었으면 None, get_current_user_id와 같은 캐시 사용)"""
+    if not session_id:
+        return None
+    user_id = session_cache.get(session_id)
+    if user_id is not None:
+        return user_id
+    async with AsyncSessionLocal() as db:
+        session = await db.get(UserSession, session_id)
+    if not session or session.expires_at < datetime.now():
+        return None
+    session_cache.set(session_id, session.user_id, session.expires_at)
     return session.user_id
 
 
@@ -104,10 +125,10 @@ async def create_project(
         workspace_id: int,
         project_data: ProjectCreate,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     # 권한 확인: 내가 이 워크스페이스 멤버인가?
-    member = db.get(WorkspaceMember, (workspace_id, user_id))
+    member = await db.get(WorkspaceMember, (workspace_id, user_id))
     if not member:
         raise HTTPException(status_code=403, detail="워크스페이스 멤버가 아닙니다.")
 
@@ -117,11 +138,11 @@ async def create_project(
         workspace_id=workspace_id
     )
     db.add(new_project)
-    db.commit()
-    db.refresh(new_project)
+    await db.commit()
+    await db.refresh(new_project)
 
-    user = db.get(User, user_id)
-    log_activity(
+    user = await db.get(User, user_id)
+    await log_activity_async(
         db=db,
         user_id=user_id,
         workspace_id=workspace_id,
@@ -164,20 +185,20 @@ async def add_workspace_member(
         workspace_id: int,
         request: AddMemberRequest,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     # 1. 권한 확인: 초대하는 사람(나)이 해당 워크스페이스의 admin인지 확인
-    my_membership = db.get(WorkspaceMember, (workspace_id, user_id))
+    my_membership = await db.get(WorkspaceMember, (workspace_id, user_id))
     if not my_membership or my_membership.role != "admin":
         raise HTTPException(status_code=403, detail="팀원 초대 권한이 없습니다 (관리자 전용).")
 
     # 2. 초대할 유저가 존재하는지 확인
-    target_user = db.exec(select(User).where(User.email == request.email)).first()
+    target_user = (await db.exec(select(User).where(User.email == request.email))).first()
     if not target_user:
         raise HTTPException(status_code=404, detail="해당 이메일을 가진 사용자가 존재하지 않습니다.")
 
     # 3. 이미 멤버인지 확인
-    existing_member = db.get(WorkspaceMember, (workspace_id, target_user.id))
+    existing_member = await db.get(WorkspaceMember, (workspace_id, target_user.id))
     if existing_member:
         raise HTTPException(status_code=400, detail="이미 워크스페이스의 멤버입니다.")
 
@@ -188,11 +209,11 @@ async def add_workspace_member(
         role="member"
     )
     db.add(new_member)
-    db.commit()
+    await db.commit()
 
-    actor = db.get(User, user_id)
-    ws = db.get(Workspace, workspace_id)
-    log_activity(
+    actor = await db.get(User, user_id)
+    ws = await db.get(Workspace, workspace_id)
+    await log_activity_async(
         db=db,
         user_id=user_id,
         workspace_id=workspace_id,
@@ -200,6 +221,7 @@ async def add_workspace_member(
         content=f"👥 '{actor.name}'님이 '{target_user.name}'님을 '{ws.name}' 워크스페이스 멤버로 추가했습니다."
     )
 
+    presence_registry.invalidate_workspace(workspace_id)
     await workspace_event_manager.broadcast(workspace_id, {
         "type": "MEMBER_JOINED",
         "user_id": user_id,
@@ -258,58 +280,25 @@ async def stream_online_members(
 ):
     """
     Server-Sent Events (SSE) 엔드포인트
-    클라이언트가 연결하면, 5초마다 온라인 멤버 변경사항을 확인하여 푸시합니다.
+    연결 시 현재 온라인 멤버를 보내고, 이후에는 온라인 멤버가 바뀔 때만 푸시합니다.
+    (presence_registry가 워크스페이스별로 한 번 계산한 결과를 모든 구독자가 공유)
     """
     # 1. 권한 확인 (이 워크스페이스 멤버인가?)
     #    스트림 연결 전에 먼저 확인해서, 권한 없으면 즉시 차단합니다.
     member = db.get(WorkspaceMember, (workspace_id, user_id))
     if not member:
         raise HTTPException(status_code=403, detail="워크스페이스 멤버만 조회할 수 있습니다.")
+    db.close()  # 스트림이 열려 있는 동안 DB 커넥션을 잡고 있지 않도록 반납
 
     async def event_generator():
-        prev_online_ids: set = set()
-
-        while True:
-            # 클라이언트 연결 끊김 체크
-            if await request.is_disconnected():
-                break
-
-            # 2. 동기 DB 작업을 쓰레드풀에서 실행 (서버 블로킹 방지)
-            def fetch_online_users():
-                active_threshold = datetime.now() - timedelta(minutes=1)
-                statement = (
-                    select(User)
-                    .join(WorkspaceMember, User.id == WorkspaceMember.user_id)
-                    .where(WorkspaceMember.workspace_id == workspace_id)
-                    .where(User.last_active_at >= active_threshold)
-                )
-                return db.exec(statement).all()
-
-            # await로 결과를 기다림 (이 동안 다른 요청 처리 가능)
-            online_users = await run_in_threadpool(fetch_online_users)
-
-            current_online_ids = {user.id for user in online_users}
-
-            # 변경사항이 있거나, 최초 연결(prev가 비어있음)인 경우 전송
-            # (단, 아무도 없을 때도 빈 리스트를 보내줘야 화면이 갱신되므로 조건 수정)
-            if current_online_ids != prev_online_ids or not prev_online_ids:
-                data = json.dumps({
-                    "online_members": [
-                        {
-                            "id": user.id,
-                            "name": user.name,
-                            "email": user.email,
-                            "profile_image": user.profile_image
-                        }
-                        for user in online_users
-                    ]
-                }, ensure_ascii=False)
-
+        # 2. 변경 이벤트 구독 (첫 프레임은 현재 온라인 목록)
+        queue = await presence_registry.subscribe(workspace_id)
+        try:
+            while True:
+                data = await queue.get()
                 yield f"data: {data}\n\n"
-                prev_online_ids = current_online_ids
-
-            # 5초 대기
-            await asyncio.sleep(5)
+        finally:
+            presence_registry.unsubscribe(workspace_id, queue)
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
@@ -388,10 +377,10 @@ def get_invitation_info(
 async def accept_invitation(
         token: str,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     # 1. 초대장 조회
-    invite = db.exec(select(Invitation).where(Invitation.token == token)).first()
+    invite = (await db.exec(select(Invitation).where(Invitation.token == token))).first()
     if not invite:
         raise HTTPException(status_code=404, detail="유효하지 않은 초대 링크입니다.")
 
@@ -400,7 +389,7 @@ async def accept_invitation(
         raise HTTPException(status_code=400, detail="만료된 초대 링크입니다.")
 
     # 3. 이미 멤버인지 확인
-    existing_member = db.get(WorkspaceMember, (invite.workspace_id, user_id))
+    existing_member = await db.get(WorkspaceMember, (invite.workspace_id, user_id))
     if existing_member:
         return {"message": "이미 워크스페이스의 멤버입니다."}
 
@@ -411,12 +400,12 @@ async def accept_invitation(
         role=invite.role
     )
     db.add(new_member)
-    db.commit()
+    await db.commit()
 
-    new_comer = db.get(User, user_id)
-    ws = db.get(Workspace, invite.workspace_id)
+    new_comer = await db.get(User, user_id)
+    ws = await db.get(Workspace, invite.workspace_id)
 
-    log_activity(
+    await log_activity_async(
         db=db,
         user_id=user_id,
         workspace_id=invite.workspace_id,
@@ -425,6 +414,7 @@ async def accept_invitation(
     )
 
     # 📡 실시간 broadcast: 해당 워크스페이스 멤버들에게 알림
+    presence_registry.invalidate_workspace(invite.workspace_id)
     await workspace_event_manager.broadcast(invite.workspace_id, {
         "type": "MEMBER_JOINED",
         "user_id": user_id,
@@ -453,7 +443,12 @@ async def workspace_events_endpoint(websocket: WebSocket, workspace_id: int, use
         await websocket.close(code=4001, reason="user_id required")
         return
 
+    # 온라인 표시는 세션 쿠키로 확인된 유저만 (query param의 user_id는 누구나 바꿔서 보낼 수 있음)
+    presence_user_id = await get_session_user_id(websocket.cookies.get("session_id"))
+
     await workspace_event_manager.connect(websocket, workspace_id, user_id)
+    if presence_user_id is not None:
+        presence_registry.connect(presence_user_id)
     try:
         while True:
             data = await websocket.receive_text()
@@ -466,6 +461,9 @@ async def workspace_events_endpoint(websocket: WebSocket, workspace_id: int, use
                 pass
     except WebSocketDisconnect:
         workspace_event_manager.disconnect(websocket, workspace_id)
+    finally:
+        if presence_user_id is not None:
+            presence_registry.disconnect(presence_user_id)
 
 
 @router.delete("/workspaces/{workspace_id}")
@@ -493,28 +491,29 @@ def delete_workspace(
 async def delete_project(
         project_id: int,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    project = db.get(Project, project_id)
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
     # 권한 체크: 워크스페이스 소유자만 삭제 가능하도록 설정 (필요시 로직 변경 가능)
-    workspace = db.get(Workspace, project.workspace_id)
+    workspace = await db.get(Workspace, project.workspace_id)
     if workspace.owner_id != user_id:
         raise HTTPException(status_code=403, detail="워크스페이스 소유자만 프로젝트를 삭제할 수 있습니다.")
 
     project_name = project.name
     workspace_id = project.workspace_id
 
-    user = db.get(User, user_id)
-    log_activity(
+    user = await db.get(User, user_id)
+    await log_activity_async(
         db=db, user_id=user_id, workspace_id=workspace.id, action_type="DELETE",
         content=f"🗑️ '{user.name}'님이 프로젝트 '{project_name}'을(를) 삭제했습니다."
     )
 
-    db.delete(project)
-    db.commit()
+    await db.delete(project)
+    await db.commit()
+    board_cache.invalidate(project_id)
 
     await workspace_event_manager.broadcast(workspace_id, {
         "type": "PROJECT_DELETED",
@@ -532,10 +531,10 @@ async def remove_workspace_member(
         workspace_id: int,
         target_user_id: int,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     # 1. 워크스페이스 확인
-    workspace = db.get(Workspace, workspace_id)
+    workspace = await db.get(Workspace, workspace_id)
     if not workspace:
         raise HTTPException(status_code=404, detail="Workspace not found")
 
@@ -550,28 +549,29 @@ async def remove_workspace_member(
         raise HTTPException(status_code=400, detail="소유자는 탈퇴할 수 없습니다. 워크스페이스를 삭제해주세요.")
 
     # 3. 멤버 조회 및 삭제
-    member = db.exec(
+    member = (await db.exec(
         select(WorkspaceMember)
         .where(WorkspaceMember.workspace_id == workspace_id)
         .where(WorkspaceMember.user_id == target_user_id)
-    ).first()
+    )).first()
 
     if not member:
         raise HTTPException(status_code=404, detail="해당 멤버를 찾을 수 없습니다.")
 
-    actor = db.get(User, user_id)
-    target = db.get(User, target_user_id)
+    actor = await db.get(User, user_id)
+    target = await db.get(User, target_user_id)
     action_type = "LEAVE" if user_id == target_user_id else "KICK"
     content = f"👋 '{target.name}'님이 나갔습니다." if user_id == target_user_id else f"🚫 '{actor.name}'님이 '{target.name}'님을 내보냈습니다."
 
-    log_activity(
+    await log_activity_async(
         db=db, user_id=user_id, workspace_id=workspace_id, action_type=action_type,
         content=content
     )
 
-    db.delete(member)
-    db.commit()
+    await db.delete(member)
+    await db.commit()
 
+    presence_registry.invalidate_workspace(workspace_id)
     await workspace_event_manager.broadcast(workspace_id, {
         "type": "MEMBER_LEFT",
         "user_id": user_id,
@@ -592,10 +592,10 @@ async def update_workspace(
         workspace_id: int,
         ws_data: WorkspaceUpdate,
         user_id: int = Depends(get_current_user_id),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     # 1. 워크스페이스 조회
-    workspace = db.get(Workspace, workspace_id)
+    workspace = await db.get(Workspace, workspace_id)
     if not workspace:
         raise HTTPException(status_code=404, detail="Workspace not found")
 
@@ -610,11 +610,11 @@ async def update_workspace(
         workspace.description = ws_data.description
 
     db.add(workspace)
-    db.commit()
-    db.refresh(workspace)
+    await db.commit()
+    await db.refresh(workspace)
 
-    user = db.get(User, user_id)
-    log_activity(
+    user = await db.get(User, user_id)
+    await log_activity_async(
         db=db, user_id=user_id, workspace_id=workspace_id, action_type="UPDATE",
         content=f"⚙️ '{user.name}'님이 워크스페이스 정보를 수정했습니다."
     )
@@ -26,6 +26,7 @@ class UserResponse(BaseModel):
     nickname: Optional[str] = None
     is_student_verified: bool
     profile_image: Optional[str] = None
+    profile_image_thumbnail: Optional[str] = None
     class Config:
         from_attributes = True
 
@@ -172,6 +173,8 @@ class FileVersionResponse(BaseModel):
     file_size: int
     created_at: datetime
     uploader_id: int
+    sha256: Optional[str] = None
+    thumbnail_url: Optional[str] = None  # 생성 전이거나 이미지/PDF가 아니면 None
 
 
 class FileResponse(BaseModel):
@@ -184,6 +187,25 @@ class FileResponse(BaseModel):
     latest_version: Optional[FileVersionResponse] = None
 
 
+class UploadSessionCreate(BaseModel):
+    filename: str
+    file_size: int
+    chunk_size: Optional[int] = None  # 없으면 서버 기본값
+
+
+class UploadSessionResponse(BaseModel):
+    id: str
+    project_id: int
+    filename: str
+    file_size: int
+    chunk_size: int
+    total_chunks: int
+    received_chunks: List[int]
+    # 앞에서부터 끊김 없이 받은 바이트 수 (순서대로 보내는 클라이언트는 여기서부터 이어서 전송)
+    offset: int
+    expires_at: datetime
+
+
 class CardCommentCreate(BaseModel):
     content: str
 
@@ -424,6 +446,7 @@ class CommunityPostResponse(BaseModel):
     title: str
     content: str
     image_url: Optional[str] = None
+    image_thumbnail_url: Optional[str] = None
     user_id: int
     created_at: datetime
     updated_at: datetime
@@ -446,4 +469,12 @@ class CardUpdateItem(CardUpdate):
     id: int
 
 class BatchCardUpdateRequest(BaseModel):
-    cards: List[CardUpdateItem]
\ No newline at end of file
+    cards: List[CardUpdateItem]
+
+
+# 🖼️ 캔버스 초기 렌더링용 보드 전체 스냅샷 (그룹 + 카드 + 연결선)
+class BoardSnapshotResponse(BaseModel):
+    project_id: int = PydanticField(serialization_alias="boardId")
+    columns: List[BoardColumnResponse] = []
+    cards: List[CardResponse] = []
+    connections: List[CardConnectionResponse] = []
@@ -0,0 +1,344 @@
+import os
+import json
+import uuid
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import insert, select, delete, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import DATABASE_URL, async_engine, run_after_commit
+from app.models.realtime import RealtimePayload
+from app.utils.json_frame import dumps
+
+logger = logging.getLogger(__name__)
+
+# memory: 단일 프로세스 (기본값) / redis, postgres: 여러 워커·노드 간 이벤트 전달
+REALTIME_BACKPLANE = os.getenv("REALTIME_BACKPLANE", "memory").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+REDIS_CHANNEL_PREFIX = os.getenv("REDIS_CHANNEL_PREFIX", "domo:realtime:")
+PG_CHANNEL_PREFIX = os.getenv("PG_CHANNEL_PREFIX", "domo_realtime_")
+# NOTIFY 본문 한도는 8000바이트 -> 넘으면 realtime_payloads에 저장하고 id만 전달
+PG_NOTIFY_MAX_BYTES = 7500
+REALTIME_PAYLOAD_TTL = float(os.getenv("REALTIME_PAYLOAD_TTL", 300))  # 초, 이후 정리
+
+Handler = Callable[[Any], Awaitable[None]]
+
+
+class Backplane(ABC):
+    """
+    실시간 이벤트 pub/sub 인터페이스
+    - 각 매니저는 broadcast() 시 자기 워커의 소켓에 바로 전달하고, publish()로 다른 워커에 알림
+    - 구현체는 send()만 구현하면 됨 (트랜잭션 연동이 가능한 구현체는 publish()도 재정의)
+    - 다른 워커에서 온 메시지는 subscribe()로 등록한 핸들러가 받아 로컬 소켓에 전달
+    - 자기 자신이 보낸 메시지(origin == node_id)는 무시 (이미 로컬 전달됨)
+    - 수신 연결이 끊겼다 다시 연결되면 on_reconnect()로 등록한 핸들러 호출 (끊긴 동안의 메시지는 유실)
+    """
+    def __init__(self):
+        self.node_id = uuid.uuid4().hex[:12]
+        self.handlers: Dict[str, Handler] = {}
+        self.reconnect_handlers: List[Callable[[], None]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, channel: str, handler: Handler):
+        """start() 전에 채널별 핸들러 등록"""
+        self.handlers[channel] = handler
+
+    def on_reconnect(self, handler: Callable[[], None]):
+        """
+        start() 전에 등록: 다른 워커의 메시지를 받는 연결이 다시 연결된 직후 호출
+        끊긴 동안 받지 못한 변경이 있을 수 있으므로 로컬 상태(캐시, 클라이언트)를 다시 맞추는 용도
+        """
+        self.reconnect_handlers.append(handler)
+
+    def _reconnected(self):
+        for handler in self.reconnect_handlers:
+            try:
+                handler()
+            except Exception as e:
+                logger.error(f"[Backplane] Reconnect handler failed: {e}")
+
+    async def start(self):
+        """구현체는 super().start()를 먼저 호출 (publish_threadsafe()용 이벤트 루프 기록)"""
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self):
+        self._loop = None
+
+    async def publish(self, channel: str, data: Any, db: Optional[AsyncSession] = None):
+        """
+        다른 워커에 메시지 전달
+        db를 넘기면 해당 트랜잭션이 커밋된 뒤에 전달 (롤백되면 전달하지 않음)
+        """
+        if db is None:
+            await self.send(channel, data)
+            return
+
+        def schedule():
+            asyncio.get_running_loop().create_task(self.send(channel, data))
+        run_after_commit(db, schedule)
+
+    def publish_threadsafe(self, channel: str, data: Any):
+        """
+        동기 코드(쓰레드풀에서 실행되는 라우터 등)에서 다른 워커에 전달 - 이벤트 루프에서 send() 예약
+        start() 전/stop() 후에는 무시
+        """
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            loop.create_task(self.send(channel, data))
+        else:
+            loop.call_soon_threadsafe(lambda: loop.create_task(self.send(channel, data)))
+
+    @abstractmethod
+    async def send(self, channel: str, data: Any):
+        """다른 워커에 바로 전달 (구현체별 전송 방식)"""
+
+    def envelope(self, data: Any) -> dict:
+        return {"origin": self.node_id, "data": data}
+
+    async def dispatch(self, channel: str, envelope: dict):
+        if envelope.get("origin") == self.node_id:
+            return
+        handler = self.handlers.get(channel)
+        if handler is None:
+            return
+        try:
+            await handler(envelope["data"])
+        except Exception as e:
+            logger.error(f"[Backplane] Handler for '{channel}' failed: {e}")
+
+
+class InMemoryBackplane(Backplane):
+    """
+    프로세스 내부 구현 (단일 워커 운영 / 테스트용)
+    같은 hub를 공유하는 인스턴스끼리 메시지를 주고받으므로 테스트에서 여러 워커를 흉내낼 수 있음
+    """
+    def __init__(self, hub: Optional[List["InMemoryBackplane"]] = None):
+        super().__init__()
+        self.hub = hub if hub is not None else []
+
+    async def start(self):
+        await super().start()
+        if self not in self.hub:
+            self.hub.append(self)
+
+    async def stop(self):
+        await super().stop()
+        if self in self.hub:
+            self.hub.remove(self)
+
+    async def send(self, channel: str, data: Any):
+        envelope = self.envelope(data)
+        for backplane in list(self.hub):
+            if backplane is not self:
+                await backplane.dispatch(channel, envelope)
+
+
+class RedisBackplane(Backplane):
+    """
+    Redis pub/sub 구현 (pip install redis 필요)
+    워커마다 구독 연결 1개를 두고 채널별 핸들러로 전달
+    """
+    def __init__(self, url: str = REDIS_URL, prefix: str = REDIS_CHANNEL_PREFIX):
+        super().__init__()
+        self.url = url
+        self.prefix = prefix
+        self._redis = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        await super().start()
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("REALTIME_BACKPLANE=redis 를 사용하려면 'redis' 패키지가 필요합니다.")
+        self._redis = redis.from_url(self.url)
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        await super().stop()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def send(self, channel: str, data: Any):
+        try:
+            await self._redis.publish(self.prefix + channel, dumps(self.envelope(data)))
+        except Exception as e:
+            # 다른 워커 전달 실패가 요청 처리를 실패시키지 않도록 로그만 남김
+            logger.error(f"[Backplane] Redis publish failed: {e}")
+
+    async def _listen(self):
+        channels = [self.prefix + channel for channel in self.handlers]
+        subscribed = False
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(*channels)
+                if subscribed:
+                    self._reconnected()
+                subscribed = True
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    channel = message["channel"].decode().removeprefix(self.prefix)
+                    await self.dispatch(channel, json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 연결이 끊기면 잠시 후 재구독
+                logger.error(f"[Backplane] Redis subscription lost: {e}")
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(1)
+
+
+class PostgresBackplane(Backplane):
+    """
+    Postgres LISTEN/NOTIFY 구현 (별도 브로커 없이 사용 중인 DB로 전달)
+    - 워커마다 LISTEN 전용 연결 1개, 끊기면 재연결 (끊긴 동안의 알림은 유실 -> on_reconnect 핸들러 호출)
+    - publish(db=...)는 변경 작업과 같은 트랜잭션에서 pg_notify 실행 -> 커밋될 때만 전달됨
+    - NOTIFY 한도를 넘는 메시지는 realtime_payloads 테이블에 저장하고 id만 전달 (수신 측에서 조회)
+    """
+    def __init__(self, dsn: str = DATABASE_URL, prefix: str = PG_CHANNEL_PREFIX):
+        super().__init__()
+        self.dsn = dsn
+        self.prefix = prefix
+        # 알림 수신 순서대로 처리하기 위한 큐 (참조 조회 중에도 순서 유지)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        await super().start()
+        self._tasks = [
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._consume()),
+            asyncio.create_task(self._cleanup()),
+        ]
+
+    async def stop(self):
+        await super().stop()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def publish(self, channel: str, data: Any, db: Optional[AsyncSession] = None):
+        if db is not None:
+            # 요청 트랜잭션 안에서 실행 (실패하면 요청도 실패)
+            await self._notify(db, channel, data)
+            return
+        await self.send(channel, data)
+
+    async def send(self, channel: str, data: Any):
+        try:
+            async with async_engine.begin() as conn:
+                await self._notify(conn, channel, data)
+        except Exception as e:
+            logger.error(f"[Backplane] pg_notify failed: {e}")
+
+    async def _notify(self, executor, channel: str, data: Any):
+        """executor: AsyncSession 또는 AsyncConnection (같은 트랜잭션에서 실행)"""
+        payload = dumps(self.envelope(data))
+        if len(payload) > PG_NOTIFY_MAX_BYTES:
+            ref = (await executor.execute(
+                insert(RealtimePayload).values(payload=payload.decode("utf-8")).returning(RealtimePayload.id)
+            )).scalar_one()
+            payload = dumps({"origin": self.node_id, "ref": ref})
+        await executor.execute(select(func.pg_notify(self.prefix + channel, payload.decode("utf-8"))))
+
+    def _on_notify(self, connection, pid, pg_channel: str, payload: str):
+        self._queue.put_nowait((pg_channel.removeprefix(self.prefix), payload))
+
+    async def _listen(self):
+        import asyncpg
+        listening = False
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                for channel in self.handlers:
+                    await connection.add_listener(self.prefix + channel, self._on_notify)
+                logger.info(f"[Backplane] LISTEN on {len(self.handlers)} channels")
+                if listening:
+                    self._reconnected()
+                listening = True
+                await lost.wait()
+                logger.error("[Backplane] LISTEN connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[Backplane] LISTEN failed: {e}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(1)
+
+    async def _consume(self):
+        while True:
+            channel, payload = await self._queue.get()
+            try:
+                envelope = json.loads(payload)
+                if envelope.get("origin") == self.node_id:
+                    continue
+                if "ref" in envelope:
+                    envelope = await self._fetch(envelope["ref"])
+                    if envelope is None:
+                        continue
+                await self.dispatch(channel, envelope)
+            except Exception as e:
+                logger.error(f"[Backplane] Failed to handle notification: {e}")
+
+    async def _fetch(self, ref: int) -> Optional[dict]:
+        async with async_engine.connect() as conn:
+            payload = (await conn.execute(
+                select(RealtimePayload.payload).where(RealtimePayload.id == ref)
+            )).scalar_one_or_none()
+        if payload is None:
+            logger.warning(f"[Backplane] Payload {ref} not found (expired?)")
+            return None
+        return json.loads(payload)
+
+    async def _cleanup(self):
+        """수신 측이 모두 읽었을 시간이 지난 큰 본문 정리"""
+        while True:
+            await asyncio.sleep(60)
+            try:
+                cutoff = datetime.now() - timedelta(seconds=REALTIME_PAYLOAD_TTL)
+                async with async_engine.begin() as conn:
+                    await conn.execute(delete(RealtimePayload).where(RealtimePayload.created_at < cutoff))
+            except Exception as e:
+                logger.error(f"[Backplane] Payload cleanup failed: {e}")
+
+
+def create_backplane() -> Backplane:
+    if REALTIME_BACKPLANE == "redis":
+        return RedisBackplane()
+    if REALTIME_BACKPLANE == "postgres":
+        return PostgresBackplane()
+    return InMemoryBackplane()
+
+
+# 싱글톤 인스턴스
+backplane = create_backplane()
@@ -0,0 +1,140 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.utils.json_frame import dumps
+from app.utils.backplane import backplane
+
+BOARD_CACHE_MAX_BYTES = int(os.getenv("BOARD_CACHE_MAX_BYTES", 64 * 1024 * 1024))  # 전체 메모리 상한
+BOARD_CACHE_MAX_PROJECTS = int(os.getenv("BOARD_CACHE_MAX_PROJECTS", 1000))
+# 브로드캐스트/무효화 호출을 거치지 않는 변경이 반영되기까지의 최대 시간
+BOARD_CACHE_TTL = float(os.getenv("BOARD_CACHE_TTL", 300))  # 초
+
+
+class _ProjectEntry:
+    __slots__ = ("bodies", "size", "expires_at")
+
+    def __init__(self):
+        self.bodies: Dict[str, bytes] = {}
+        self.size = 0
+        self.expires_at = time.monotonic() + BOARD_CACHE_TTL
+
+
+class BoardCache:
+    """
+    프로젝트별 보드 조회 결과(직렬화된 JSON) 캐시
+    - key: "board", "cards", "connections", "snapshot" 등 조회 종류
+    - board_event_manager.broadcast()가 호출될 때마다 invalidate() -> version 증가
+    - 조회 시작 시점의 version과 저장 시점의 version이 다르면 저장하지 않음 (stale 방지)
+    - 프로젝트 단위 LRU + 전체 바이트 상한으로 비활성 프로젝트부터 제거
+    - invalidate_all()은 backplane으로 다른 워커에도 전달 (프로젝트별 무효화는 보드 이벤트 수신 시 처리됨)
+    """
+    def __init__(self, max_bytes: int = BOARD_CACHE_MAX_BYTES, max_projects: int = BOARD_CACHE_MAX_PROJECTS):
+        self.max_bytes = max_bytes
+        self.max_projects = max_projects
+        self._entries: "OrderedDict[int, _ProjectEntry]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        # 여러 프로젝트에 걸친 변경(프로필 수정 등) 시 증가하는 전역 세대 번호
+        self._generation = 0
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        # 동기 라우터는 쓰레드풀에서 실행되므로 lock으로 보호
+        self._lock = threading.Lock()
+        self.backplane = backplane
+        self.backplane.subscribe("board_cache", self._on_remote)
+        # 다른 워커의 무효화를 놓쳤을 수 있으므로 재연결 시 전부 비움
+        self.backplane.on_reconnect(self._invalidate_all)
+
+    @staticmethod
+    def encode(data: Any) -> bytes:
+        return dumps(data)
+
+    def version(self, project_id: int) -> Tuple[int, int]:
+        """(전역 세대, 프로젝트 버전) - 어느 쪽이든 바뀌면 이전 조회 결과는 무효"""
+        with self._lock:
+            return self._generation, self._versions.get(project_id, 0)
+
+    def get(self, project_id: int, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(project_id)
+            if entry and entry.expires_at < time.monotonic():
+                self._drop(project_id)
+                entry = None
+            body = entry.bodies.get(key) if entry else None
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(project_id)
+            self.hits += 1
+            return body
+
+    def set(self, project_id: int, key: str, body: bytes, version: Tuple[int, int]):
+        with self._lock:
+            # 조회하는 동안 변경 이벤트가 있었으면 버림
+            if (self._generation, self._versions.get(project_id, 0)) != version:
+                return
+            if len(body) > self.max_bytes:
+                return
+            entry = self._entries.get(project_id)
+            if entry is None:
+                entry = self._entries[project_id] = _ProjectEntry()
+            old = entry.bodies.get(key)
+            if old is not None:
+                entry.size -= len(old)
+                self._total_bytes -= len(old)
+            entry.bodies[key] = body
+            entry.size += len(body)
+            self._total_bytes += len(body)
+            self._entries.move_to_end(project_id)
+            self._evict()
+
+    def invalidate(self, project_id: int):
+        """보드 변경 시 호출: version 증가 + 캐시된 본문 제거"""
+        with self._lock:
+            self._versions[project_id] = self._versions.get(project_id, 0) + 1
+            self._drop(project_id)
+
+    def invalidate_all(self):
+        """
+        여러 프로젝트 응답에 포함되는 데이터(작성자/담당자 프로필) 변경 시 호출 (커밋 후, 아무 쓰레드에서나 가능)
+        다른 워커도 세대 번호를 올려야 예전 ETag에 304로 응답하지 않음
+        """
+        self._invalidate_all()
+        self.backplane.publish_threadsafe("board_cache", {"invalidate_all": True})
+
+    async def _on_remote(self, data: dict):
+        if data.get("invalidate_all"):
+            self._invalidate_all()
+
+    def _invalidate_all(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "projects": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _drop(self, project_id: int):
+        entry = self._entries.pop(project_id, None)
+        if entry:
+            self._total_bytes -= entry.size
+
+    def _evict(self):
+        while self._entries and (self._total_bytes > self.max_bytes or len(self._entries) > self.max_projects):
+            project_id, entry = self._entries.popitem(last=False)
+            self._total_bytes -= entry.size
+
+
+# 싱글톤 인스턴스
+board_cache = BoardCache()
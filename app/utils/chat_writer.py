@@ -0,0 +1,133 @@
+import os
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, insert, select
+
+from app.database import async_engine
+from app.models.chat import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+# 모아서 INSERT 하는 주기(초) / 한 번에 INSERT 하는 최대 건수
+CHAT_FLUSH_INTERVAL = float(os.getenv("CHAT_FLUSH_INTERVAL", 0.005))
+CHAT_FLUSH_MAX_BATCH = int(os.getenv("CHAT_FLUSH_MAX_BATCH", 500))
+# flush: 저장(커밋)된 뒤 발신자에게 응답 / immediate: 바로 응답 (서버가 죽으면 직전 메시지 유실 가능)
+CHAT_DURABILITY = os.getenv("CHAT_DURABILITY", "flush").lower()
+# 시퀀스에서 한 번에 받아올 id 수
+# 1보다 크면 워커가 여러 개일 때 id 순서와 작성 순서가 달라질 수 있음 (after_id 조회에서 누락 가능)
+CHAT_ID_BLOCK = int(os.getenv("CHAT_ID_BLOCK", 1))
+CHAT_ID_SEQUENCE = "chat_messages_id_seq"
+
+
+class ChatWriter:
+    """
+    채팅 메시지 write-behind 저장
+    - id는 시퀀스에서 먼저 받아오므로(커밋 불필요) 저장 전에 바로 브로드캐스트 가능
+    - 메시지는 큐에 모았다가 CHAT_FLUSH_INTERVAL마다 트랜잭션 하나로 INSERT
+    - add()가 반환하는 future는 해당 메시지가 커밋되면 완료 (CHAT_DURABILITY=flush일 때 응답 전 대기용)
+    """
+    def __init__(self):
+        self._queue: List[Tuple[dict, asyncio.Future]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._ids: List[int] = []
+        self._id_lock: Optional[asyncio.Lock] = None
+
+    async def next_id(self) -> int:
+        if self._id_lock is None:
+            self._id_lock = asyncio.Lock()
+        async with self._id_lock:
+            if not self._ids:
+                statement = select(func.nextval(CHAT_ID_SEQUENCE)).select_from(
+                    func.generate_series(1, CHAT_ID_BLOCK)
+                )
+                async with async_engine.connect() as conn:
+                    self._ids = sorted((await conn.execute(statement)).scalars().all(), reverse=True)
+            return self._ids.pop()
+
+    def add(self, row: dict) -> asyncio.Future:
+        """저장할 메시지(id 포함) 추가. 커밋되면 완료되는 future 반환"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((row, future))
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return future
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """남은 메시지를 모두 저장한 뒤 종료 (INSERT 도중 취소되어 유실되지 않도록 cancel 대신 신호)"""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            if not self._stopping:
+                # 잠깐 기다려서 그 사이에 들어온 메시지를 같은 트랜잭션으로 묶음
+                await asyncio.sleep(CHAT_FLUSH_INTERVAL)
+            self._wakeup.clear()
+            while self._queue:
+                await self.flush()
+            if self._stopping:
+                return
+
+    async def flush(self):
+        batch, self._queue = self._queue[:CHAT_FLUSH_MAX_BATCH], self._queue[CHAT_FLUSH_MAX_BATCH:]
+        if not batch:
+            return
+        try:
+            await self._insert([row for row, _ in batch])
+            results = [None] * len(batch)
+        except Exception as e:
+            logger.warning(f"[ChatWriter] Batch insert failed, retrying one by one: {e}")
+            results = await self._insert_each([row for row, _ in batch])
+
+        for (row, future), error in zip(batch, results):
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(row["id"])
+            else:
+                future.set_exception(error)
+                future.exception()  # 기다리는 쪽이 없어도(immediate) 경고가 남지 않도록
+
+    async def _insert(self, rows: List[dict]):
+        async with async_engine.begin() as conn:
+            await conn.execute(insert(ChatMessage), rows)
+
+    async def _insert_each(self, rows: List[dict]) -> List[Optional[Exception]]:
+        """잘못된 메시지 하나(존재하지 않는 프로젝트 등) 때문에 나머지가 버려지지 않도록 개별 저장"""
+        results: List[Optional[Exception]] = []
+        for row in rows:
+            try:
+                await self._insert([row])
+                results.append(None)
+            except Exception as e:
+                logger.error(f"[ChatWriter] Failed to save message {row['id']}: {e}")
+                results.append(e)
+        return results
+
+    @staticmethod
+    def new_row(message_id: int, project_id: int, user_id: int, content: str) -> dict:
+        return {
+            "id": message_id,
+            "project_id": project_id,
+            "user_id": user_id,
+            "content": content,
+            "created_at": datetime.now(),
+        }
+
+
+# 싱글톤 인스턴스
+chat_writer = ChatWriter()
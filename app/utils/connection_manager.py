@@ -1,17 +1,46 @@
-from typing import List, Dict, Optional
+import os
+import uuid
+import asyncio
+from collections import OrderedDict, deque
+from typing import List, Dict, Optional, Union, Deque, Tuple
 from fastapi import WebSocket
+from sqlmodel.ext.asyncio.session import AsyncSession
 import logging
 
+from app.database import run_after_commit
+from app.utils.board_cache import board_cache
+from app.utils.json_frame import encode_frame
+from app.utils.backplane import backplane
+
 logger = logging.getLogger(__name__)
 
+# 보드 WebSocket 수신자별 송신 큐 크기 / 1건 전송 제한 시간(초)
+BOARD_SEND_QUEUE_SIZE = int(os.getenv("BOARD_SEND_QUEUE_SIZE", 256))
+BOARD_SEND_TIMEOUT = float(os.getenv("BOARD_SEND_TIMEOUT", 10))
+# 큐가 넘친 수신자에게 보내는 메시지 (밀린 이벤트 대신 전체 보드를 다시 불러오도록)
+RESYNC_FRAME = encode_frame({"type": "RESYNC"})
+# 재접속 시 누락 이벤트를 다시 보내기 위해 프로젝트별로 보관하는 최근 이벤트 수
+BOARD_REPLAY_BUFFER_SIZE = int(os.getenv("BOARD_REPLAY_BUFFER_SIZE", 500))
+BOARD_REPLAY_MAX_PROJECTS = int(os.getenv("BOARD_REPLAY_MAX_PROJECTS", 1000))
+# 프로세스(워커)마다 다른 값: 재시작/다른 워커로 재접속하면 seq를 이어 쓸 수 없음을 알림
+# (backplane 재연결 시에는 BoardEventManager가 새 값으로 바꿈)
+BOARD_EVENT_EPOCH = uuid.uuid4().hex[:8]
+# 커서 이동은 보낸 사람별 마지막 위치만 모아 두었다가 프로젝트별 CURSORS 1건으로 전송 (초당 횟수)
+BOARD_CURSOR_TICK_HZ = float(os.getenv("BOARD_CURSOR_TICK_HZ", 15))
+
 
 class ConnectionManager:
     """
     일반 WebSocket 연결 관리자
     프로젝트별 연결 관리
+    - channel을 지정하면 backplane을 통해 다른 워커의 소켓에도 전달
     """
-    def __init__(self):
+    def __init__(self, channel: Optional[str] = None):
         self.active_connections: Dict[int, List[WebSocket]] = {}
+        self.channel = channel
+        self.backplane = backplane
+        if channel:
+            self.backplane.subscribe(channel, self._on_remote)
 
     async def connect(self, websocket: WebSocket, project_id: int):
         await websocket.accept()
@@ -26,11 +55,21 @@ class ConnectionManager:
                 if not self.active_connections[project_id]:
                     del self.active_connections[project_id]
 
-    async def broadcast(self, message: dict, project_id: int, sender_socket: WebSocket):
+    async def broadcast(self, message: Union[dict, str], project_id: int, sender_socket: WebSocket):
+        frame = encode_frame(message)  # 수신자 수와 관계없이 한 번만 직렬화
+        await self._deliver(frame, project_id, sender_socket)
+        if self.channel:
+            await self.backplane.publish(self.channel, {"key": project_id, "frame": frame})
+
+    async def _on_remote(self, data: dict):
+        await self._deliver(data["frame"], data["key"])
+
+    async def _deliver(self, frame: str, project_id: int, sender_socket: Optional[WebSocket] = None):
+        """이 워커에 연결된 소켓에만 전송"""
         if project_id in self.active_connections:
             for connection in self.active_connections[project_id]:
                 if connection != sender_socket:
-                    await connection.send_json(message)
+                    await connection.send_text(frame)
 
 
 class VoiceConnectionManager:
@@ -103,7 +142,7 @@ class VoiceConnectionManager:
             return []
         return [s for s in self.active_connections[project_id] if s != exclude_socket]
 
-    async def broadcast(self, message: dict, project_id: int, sender_socket: WebSocket):
+    async def broadcast(self, message: Union[dict, str], project_id: int, sender_socket: WebSocket):
         """
         발신자를 제외한 같은 방의 모든 연결에 메시지 전송
         """
@@ -113,11 +152,12 @@ class VoiceConnectionManager:
             
         recipients = 0
         failed = 0
+        frame = encode_frame(message)
         
         for connection in self.active_connections[project_id]:
             if connection != sender_socket:
                 try:
-                    await connection.send_json(message)
+                    await connection.send_text(frame)
                     recipients += 1
                 except Exception as e:
                     logger.error(f"[VoiceManager] Failed to send to connection: {e}")
@@ -125,7 +165,7 @@ class VoiceConnectionManager:
                     
         logger.debug(f"[VoiceManager] Broadcast complete: {recipients} success, {failed} failed")
 
-    async def broadcast_all(self, message: dict, project_id: int):
+    async def broadcast_all(self, message: Union[dict, str], project_id: int):
         """
         같은 방의 모든 연결에 메시지 전송 (발신자 포함)
         주로 user_left 알림에 사용
@@ -133,13 +173,14 @@ class VoiceConnectionManager:
         if project_id not in self.active_connections:
             return
             
+        frame = encode_frame(message)
         for connection in self.active_connections[project_id]:
             try:
-                await connection.send_json(message)
+                await connection.send_text(frame)
             except Exception as e:
                 logger.error(f"[VoiceManager] Failed to send to connection: {e}")
 
-    async def send_to_user(self, message: dict, project_id: int, target_user_id: int):
+    async def send_to_user(self, message: Union[dict, str], project_id: int, target_user_id: int):
         """
         특정 userId를 가진 소켓에만 메시지 전송
         """
@@ -149,7 +190,7 @@ class VoiceConnectionManager:
         for socket, user_id in self.socket_user_map[project_id].items():
             if user_id == target_user_id:
                 try:
-                    await socket.send_json(message)
+                    await socket.send_text(encode_frame(message))
                     return True
                 except Exception as e:
                     logger.error(f"[VoiceManager] Failed to send to user {target_user_id}: {e}")
@@ -157,27 +198,240 @@ class VoiceConnectionManager:
         return False
 
 
+class BoardSubscriber:
+    """
+    보드 이벤트 수신자 1명 (WebSocket 또는 SSE)
+    - 크기가 제한된 송신 큐를 가지며, WebSocket은 전용 writer task가 큐를 비움
+    - 큐가 넘치면 밀린 이벤트를 버리고 RESYNC 1건으로 대체 (클라이언트가 보드를 다시 불러옴)
+    - RESYNC조차 전달되기 전에 또 넘치면 연결을 끊음
+    """
+    def __init__(self, websocket: Optional[WebSocket] = None):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=BOARD_SEND_QUEUE_SIZE)
+        self.resync_pending = False
+        self.closed = False
+        self.writer: Optional[asyncio.Task] = None
+
+    def offer(self, frame: str) -> bool:
+        """큐에 인코딩된 이벤트 추가 (대기하지 않음). 연결을 끊어야 하면 False"""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            if self.resync_pending:
+                return False
+            self._clear()
+            self.queue.put_nowait(RESYNC_FRAME)
+            self.resync_pending = True
+            logger.warning("[BoardManager] Slow consumer, sending resync")
+            return True
+
+    def close(self):
+        """남은 이벤트를 버리고 종료 신호(None) 전달"""
+        if self.closed:
+            return
+        self.closed = True
+        self._clear()
+        self.queue.put_nowait(None)
+
+    async def next(self) -> Optional[str]:
+        frame = await self.queue.get()
+        if frame is RESYNC_FRAME:
+            self.resync_pending = False
+        return frame
+
+    def _clear(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+
 class BoardEventManager:
+    """
+    보드 이벤트 fan-out
+    - broadcast()는 각 수신자 큐에 넣기만 하고 바로 반환 (느린 클라이언트가 요청 처리를 막지 않음)
+    - 전송 실패/타임아웃된 소켓은 writer task가 자동으로 정리
+    - 다른 워커에서 발생한 이벤트도 backplane을 통해 받아 같은 경로(캐시 무효화, seq 부여)로 처리
+    """
     def __init__(self):
-        # { project_id: [WebSocket, ...] }
-        self.active_connections: Dict[int, List[WebSocket]] = {}
-
-    async def connect(self, websocket: WebSocket, project_id: int):
+        # { project_id: [BoardSubscriber, ...] }
+        self.subscribers: Dict[int, List[BoardSubscriber]] = {}
+        self.backplane = backplane
+        self.backplane.subscribe("board", self._on_remote)
+        self.backplane.on_reconnect(self._resync_all)
+        self.epoch = BOARD_EVENT_EPOCH
+        # { project_id: 마지막 seq }, { project_id: deque[(seq, frame)] } (최근 사용 프로젝트 순)
+        self.seqs: Dict[int, int] = {}
+        self.history: "OrderedDict[int, Deque[Tuple[int, str]]]" = OrderedDict()
+        # { project_id: { 보낸 사람: 마지막 CURSOR_MOVE } }, { project_id: 예약된 flush task }
+        self.cursors: Dict[int, Dict[Union[int, str], dict]] = {}
+        self.cursor_tasks: Dict[int, asyncio.Task] = {}
+
+    async def connect(
+            self, websocket: WebSocket, project_id: int,
+            last_seq: Optional[int] = None, epoch: Optional[str] = None
+    ) -> BoardSubscriber:
+        """
+        연결 등록 후 HELLO(epoch, 현재 seq) 전송
+        재접속(last_seq, epoch 전달) 시 버퍼에 남아 있으면 누락분만 재전송, 아니면 RESYNC
+        """
         await websocket.accept()
-        if project_id not in self.active_connections:
-            self.active_connections[project_id] = []
-        self.active_connections[project_id].append(websocket)
+        subscriber = BoardSubscriber(websocket)
+        # 등록과 재전송 큐잉 사이에 await가 없으므로 새 이벤트와 순서가 섞이지 않음
+        self.subscribers.setdefault(project_id, []).append(subscriber)
+        current_seq = self.seqs.get(project_id, 0)
+        subscriber.offer(encode_frame({"type": "HELLO", "epoch": self.epoch, "seq": current_seq}))
+        if last_seq is not None:
+            missed = self._missed_frames(project_id, last_seq, epoch)
+            if missed is None:
+                subscriber.offer(RESYNC_FRAME)
+            for frame in missed or []:
+                subscriber.offer(frame)
+        subscriber.writer = asyncio.create_task(self._writer(subscriber, project_id))
+        return subscriber
+
+    def _missed_frames(self, project_id: int, last_seq: int, epoch: Optional[str]) -> Optional[List[str]]:
+        """last_seq 이후 이벤트 목록. 버퍼로 메울 수 없으면 None (전체 스냅샷 필요)"""
+        current_seq = self.seqs.get(project_id, 0)
+        if epoch != self.epoch or last_seq > current_seq:
+            return None
+        if last_seq == current_seq:
+            return []
+        history = self.history.get(project_id)
+        if not history or history[0][0] > last_seq + 1:
+            return None
+        missed = [frame for seq, frame in history if seq > last_seq]
+        # HELLO 1건 + 재전송분이 큐에 다 들어가야 함
+        if len(missed) >= BOARD_SEND_QUEUE_SIZE:
+            return None
+        return missed
+
+    def subscribe(self, project_id: int) -> BoardSubscriber:
+        """SSE 등 소켓이 없는 수신자 등록 (호출 측에서 next()로 직접 소비)"""
+        subscriber = BoardSubscriber()
+        self.subscribers.setdefault(project_id, []).append(subscriber)
+        return subscriber
 
     def disconnect(self, websocket: WebSocket, project_id: int):
-        if project_id in self.active_connections:
-            if websocket in self.active_connections[project_id]:
-                self.active_connections[project_id].remove(websocket)
+        for subscriber in list(self.subscribers.get(project_id, [])):
+            if subscriber.websocket is websocket:
+                self.unsubscribe(subscriber, project_id)
+
+    def unsubscribe(self, subscriber: BoardSubscriber, project_id: int):
+        subscribers = self.subscribers.get(project_id)
+        if subscribers and subscriber in subscribers:
+            subscribers.remove(subscriber)
+            if not subscribers:
+                del self.subscribers[project_id]
+        subscriber.close()
+
+    async def broadcast(self, project_id: int, message: dict, db: Optional[AsyncSession] = None):
+        """
+        해당 프로젝트에 접속한 모든 유저에게 이벤트 전송
+        db를 넘기면(커밋 전에 호출) 트랜잭션이 커밋될 때 전달되고, 롤백되면 버려짐
+        """
+        if db is None:
+            self._deliver_event(project_id, message)
+        else:
+            run_after_commit(db, lambda: self._deliver_event(project_id, message))
+        await self.backplane.publish("board", {"key": project_id, "message": message}, db=db)
+
+    async def relay(self, project_id: int, message: Union[dict, str], exclude: Optional[WebSocket] = None):
+        """데이터 변경 없이 전달만 하는 메시지 (커서 이동 등, 캐시 무효화/seq 없음)"""
+        frame = encode_frame(message)
+        self._fan_out(project_id, frame, exclude)
+        await self.backplane.publish("board", {"key": project_id, "frame": frame})
+
+    def move_cursor(self, project_id: int, sender: Union[int, str], message: dict):
+        """
+        커서 이동은 바로 보내지 않고 보낸 사람별 마지막 위치만 보관
+        tick마다 프로젝트별로 모아 CURSORS 1건으로 전송 (전송량이 마우스 이벤트 빈도와 무관해짐)
+        """
+        self.cursors.setdefault(project_id, {})[sender] = message
+        if project_id not in self.cursor_tasks:
+            self.cursor_tasks[project_id] = asyncio.create_task(self._flush_cursors(project_id))
+
+    async def _flush_cursors(self, project_id: int):
+        try:
+            await asyncio.sleep(1 / BOARD_CURSOR_TICK_HZ)
+        finally:
+            self.cursor_tasks.pop(project_id, None)
+        pending = self.cursors.pop(project_id, None)
+        if not pending:
+            return
+        # 보낸 사람 본인 커서도 포함됨 -> 클라이언트에서 자기 user_id는 무시
+        await self.relay(project_id, {"type": "CURSORS", "cursors": list(pending.values())})
 
-    async def broadcast(self, project_id: int, message: dict):
-        """해당 프로젝트에 접속한 모든 유저에게 이벤트 전송"""
-        if project_id in self.active_connections:
-            for connection in self.active_connections[project_id]:
-                await connection.send_json(message)
+    def _resync_all(self):
+        """
+        backplane 재연결: 끊긴 동안 다른 워커의 이벤트를 놓쳤을 수 있음
+        -> 접속 중인 수신자는 RESYNC, epoch를 바꿔서 이전 seq로 재접속하는 클라이언트도 RESYNC
+        """
+        self.epoch = uuid.uuid4().hex[:8]
+        self.history.clear()
+        for project_id, subscribers in list(self.subscribers.items()):
+            for subscriber in list(subscribers):
+                if not subscriber.offer(RESYNC_FRAME):
+                    self.unsubscribe(subscriber, project_id)
+        logger.warning("[BoardManager] Backplane reconnected, sent resync to all subscribers")
+
+    async def _on_remote(self, data: dict):
+        if "message" in data:
+            self._deliver_event(data["key"], data["message"])
+        else:
+            self._fan_out(data["key"], data["frame"])
+
+    def _deliver_event(self, project_id: int, message: dict):
+        """이 워커 기준 seq 부여 + 재전송 버퍼에 보관 후 로컬 수신자에게 전달"""
+        # 모든 보드 변경은 여기를 거치므로 캐시 무효화도 여기서 처리
+        board_cache.invalidate(project_id)
+
+        seq = self.seqs.get(project_id, 0) + 1
+        self.seqs[project_id] = seq
+        frame = encode_frame({**message, "seq": seq})
+
+        history = self.history.get(project_id)
+        if history is None:
+            history = self.history[project_id] = deque(maxlen=BOARD_REPLAY_BUFFER_SIZE)
+        history.append((seq, frame))
+        self.history.move_to_end(project_id)
+        while len(self.history) > BOARD_REPLAY_MAX_PROJECTS:
+            # 오래 변경이 없던 프로젝트의 버퍼부터 제거 (seq는 유지 -> 재접속 시 RESYNC)
+            self.history.popitem(last=False)
+
+        self._fan_out(project_id, frame)
+
+    def _fan_out(self, project_id: int, frame: str, exclude: Optional[WebSocket] = None):
+        """인코딩된 프레임을 로컬 수신자 큐에 넣음 (수신자 수와 관계없이 직렬화는 한 번)"""
+        subscribers = self.subscribers.get(project_id)
+        if not subscribers:
+            return
+        for subscriber in list(subscribers):
+            if exclude is not None and subscriber.websocket is exclude:
+                continue
+            if not subscriber.offer(frame):
+                logger.warning(f"[BoardManager] Dropping slow consumer in project {project_id}")
+                self.unsubscribe(subscriber, project_id)
+
+    async def _writer(self, subscriber: BoardSubscriber, project_id: int):
+        websocket = subscriber.websocket
+        try:
+            while True:
+                frame = await subscriber.next()
+                if frame is None:
+                    break
+                await asyncio.wait_for(websocket.send_text(frame), timeout=BOARD_SEND_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"[BoardManager] Send failed, removing socket: {e}")
+        finally:
+            self.unsubscribe(subscriber, project_id)
+        try:
+            await asyncio.wait_for(websocket.close(code=1013), timeout=BOARD_SEND_TIMEOUT)
+        except Exception:
+            pass
 
 
 class WorkspaceEventManager:
@@ -192,6 +446,8 @@ class WorkspaceEventManager:
         self.active_connections: Dict[int, List[WebSocket]] = {}
         # { workspace_id: { socket: user_id } }
         self.socket_user_map: Dict[int, Dict[WebSocket, int]] = {}
+        self.backplane = backplane
+        self.backplane.subscribe("workspace", self._on_remote)
 
     async def connect(self, websocket: WebSocket, workspace_id: int, user_id: int):
         await websocket.accept()
@@ -214,14 +470,22 @@ class WorkspaceEventManager:
                     del self.socket_user_map[workspace_id]
         logger.debug(f"[WorkspaceManager] Disconnected from workspace {workspace_id}")
 
-    async def broadcast(self, workspace_id: int, message: dict):
-        """해당 워크스페이스에 접속한 모든 유저에게 이벤트 전송"""
+    async def broadcast(self, workspace_id: int, message: Union[dict, str]):
+        """해당 워크스페이스에 접속한 모든 유저에게 이벤트 전송 (다른 워커 포함)"""
+        frame = encode_frame(message)
+        await self._deliver(workspace_id, frame)
+        await self.backplane.publish("workspace", {"key": workspace_id, "frame": frame})
+
+    async def _on_remote(self, data: dict):
+        await self._deliver(data["key"], data["frame"])
+
+    async def _deliver(self, workspace_id: int, frame: str):
         if workspace_id not in self.active_connections:
             return
         dead_connections = []
         for connection in self.active_connections[workspace_id]:
             try:
-                await connection.send_json(message)
+                await connection.send_text(frame)
             except Exception as e:
                 logger.error(f"[WorkspaceManager] Failed to send: {e}")
                 dead_connections.append(connection)
@@ -237,6 +501,8 @@ class CommunityEventManager:
     """
     def __init__(self):
         self.active_connections: List[WebSocket] = []
+        self.backplane = backplane
+        self.backplane.subscribe("community", self._on_remote)
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
@@ -248,12 +514,20 @@ class CommunityEventManager:
             self.active_connections.remove(websocket)
         logger.debug(f"[CommunityManager] Disconnected. Total: {len(self.active_connections)}")
 
-    async def broadcast(self, message: dict):
-        """모든 연결된 클라이언트에게 이벤트 전송"""
+    async def broadcast(self, message: Union[dict, str]):
+        """모든 연결된 클라이언트에게 이벤트 전송 (다른 워커 포함)"""
+        frame = encode_frame(message)
+        await self._deliver(frame)
+        await self.backplane.publish("community", {"frame": frame})
+
+    async def _on_remote(self, data: dict):
+        await self._deliver(data["frame"])
+
+    async def _deliver(self, frame: str):
         dead_connections = []
         for connection in self.active_connections:
             try:
-                await connection.send_json(message)
+                await connection.send_text(frame)
             except Exception as e:
                 logger.error(f"[CommunityManager] Failed to send: {e}")
                 dead_connections.append(connection)
@@ -265,6 +539,6 @@ class CommunityEventManager:
 manager = ConnectionManager()
 voice_manager = VoiceConnectionManager()
 board_event_manager = BoardEventManager()
-chat_manager = ConnectionManager()
+chat_manager = ConnectionManager(channel="chat")
 workspace_event_manager = WorkspaceEventManager()
 community_event_manager = CommunityEventManager()
@@ -0,0 +1,60 @@
+import uuid
+import hashlib
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.utils.board_cache import board_cache
+
+# 프로세스마다 다른 값 -> 재시작/다른 워커의 버전 카운터와 ETag가 겹치지 않음
+PROCESS_EPOCH = uuid.uuid4().hex[:8]
+
+
+def project_etag(project_id: int, kind: str, request: Optional[Request] = None) -> str:
+    """
+    프로젝트 버전(board_cache.version) 기반 strong ETag
+    - 프로젝트 데이터가 바뀌면 board_event_manager.broadcast()에서 버전이 증가
+    - 쿼리 파라미터가 다르면 응답도 다르므로 ETag에 포함
+    """
+    generation, version = board_cache.version(project_id)
+    tag = f"{PROCESS_EPOCH}-{generation}-{project_id}-{version}-{kind}"
+    if request is not None and request.url.query:
+        tag += "-" + hashlib.sha1(request.url.query.encode()).hexdigest()[:12]
+    return f'"{tag}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 헤더와 비교 (여러 값, *, W/ 접두어 허용)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [value.strip() for value in header.split(",")]
+    return any(value.removeprefix("W/") == etag for value in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def http_date(value: datetime) -> str:
+    """Last-Modified 형식 (RFC 7231, GMT)"""
+    return formatdate(value.timestamp(), usegmt=True)
+
+
+def not_modified_since(request: Request, last_modified: datetime) -> bool:
+    """If-Modified-Since 비교 (If-None-Match가 있으면 그쪽이 우선이므로 무시)"""
+    if request.headers.get("if-none-match"):
+        return False
+    header = request.headers.get("if-modified-since")
+    if not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    return int(last_modified.timestamp()) <= int(since.timestamp())
@@ -0,0 +1,419 @@
+import os
+import uuid
+import shutil
+import asyncio
+import hashlib
+import logging
+import zipfile
+from functools import partial
+from datetime import datetime
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import func, update, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import AsyncSessionLocal, run_after_commit, run_after_rollback
+from app.models.file import FileMetadata, FileVersion, FileBlob, UploadSession, UploadChunk
+from app.utils.thumbnail_render import remove_thumbnails
+
+logger = logging.getLogger(__name__)
+
+# 업로드를 읽고 쓰는 단위
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))
+# 배치 업로드에서 동시에 저장하는 파일 수
+FILE_BATCH_CONCURRENCY = int(os.getenv("FILE_BATCH_CONCURRENCY", 8))
+# 프로젝트 전체 저장 용량 / (선택) 파일 1개 최대 크기 - 0이면 제한 없음 (기본값)
+FILE_MAX_UPLOAD_BYTES = int(os.getenv("FILE_MAX_UPLOAD_BYTES", 0))
+PROJECT_STORAGE_QUOTA_BYTES = int(os.getenv("PROJECT_STORAGE_QUOTA_BYTES", 0))
+# 내용 주소(SHA-256) 기반 저장 위치: blobs/ab/cd/abcd...
+BLOB_DIR = os.getenv("FILE_BLOB_DIR", "/app/uploads/files/blobs")
+# 이어받기(청크) 업로드: 임시 파일 위치 / 기본·최대 청크 크기 / 마지막 청크 이후 보관 시간(초) / 정리 주기(초)
+UPLOAD_SESSION_DIR = os.getenv("UPLOAD_SESSION_DIR", "/app/uploads/files/sessions")
+RESUMABLE_CHUNK_SIZE = int(os.getenv("RESUMABLE_CHUNK_SIZE", 8 * 1024 * 1024))
+RESUMABLE_MAX_CHUNK_SIZE = int(os.getenv("RESUMABLE_MAX_CHUNK_SIZE", 64 * 1024 * 1024))
+# 청크 최소 크기(청크가 1개인 작은 파일 제외) / 세션당 최대 청크 수 - 청크 기록 행 수 제한
+RESUMABLE_MIN_CHUNK_SIZE = int(os.getenv("RESUMABLE_MIN_CHUNK_SIZE", 64 * 1024))
+RESUMABLE_MAX_CHUNKS = int(os.getenv("RESUMABLE_MAX_CHUNKS", 10000))
+UPLOAD_SESSION_TTL = float(os.getenv("UPLOAD_SESSION_TTL", 24 * 3600))
+UPLOAD_SESSION_SWEEP_INTERVAL = float(os.getenv("UPLOAD_SESSION_SWEEP_INTERVAL", 600))
+# ZIP 내보내기 압축 수준 (0: 압축 안 함 ~ 9) - 이미 압축된 문서/이미지가 많아 기본은 속도 우선
+FILE_EXPORT_COMPRESSLEVEL = int(os.getenv("FILE_EXPORT_COMPRESSLEVEL", 1))
+
+
+async def project_quota_remaining(db: AsyncSession, project_id: int) -> Optional[int]:
+    """프로젝트 남은 저장 용량 (None이면 제한 없음)"""
+    if PROJECT_STORAGE_QUOTA_BYTES <= 0:
+        return None
+    used = (await db.exec(
+        select(func.coalesce(func.sum(FileVersion.file_size), 0))
+        .join(FileMetadata, FileMetadata.id == FileVersion.file_id)
+        .where(FileMetadata.project_id == project_id)
+    )).one()
+    return max(PROJECT_STORAGE_QUOTA_BYTES - used, 0)
+
+
+def upload_limit(quota_remaining: Optional[int]) -> Optional[int]:
+    """파일 1개에 허용되는 최대 바이트 수: 파일 1개 한도와 프로젝트 남은 용량 중 작은 값 (None이면 제한 없음)"""
+    limits = [limit for limit in (FILE_MAX_UPLOAD_BYTES if FILE_MAX_UPLOAD_BYTES > 0 else None, quota_remaining)
+              if limit is not None]
+    return min(limits) if limits else None
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"업로드 가능한 용량을 초과했습니다. (최대 {max_bytes} bytes)"
+    )
+
+
+async def save_upload(file: UploadFile, saved_path: str, max_bytes: Optional[int] = None) -> Tuple[int, str]:
+    """
+    업로드 파일을 청크 단위로 저장하면서 크기와 SHA-256 계산 -> (file_size, sha256)
+    - 디스크 쓰기/해시 계산은 쓰레드에서 실행 (이벤트 루프를 막지 않음)
+    - max_bytes를 넘는 순간 중단하고 저장 중이던 파일 삭제 (413)
+    """
+    # 크기를 알 수 있으면 읽기 전에 바로 거절
+    if max_bytes is not None and file.size is not None and file.size > max_bytes:
+        raise _too_large(max_bytes)
+
+    digest = hashlib.sha256()
+    size = 0
+    buffer = await asyncio.to_thread(open, saved_path, "wb")
+
+    def write(chunk: bytes):
+        digest.update(chunk)
+        buffer.write(chunk)
+
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if max_bytes is not None and size > max_bytes:
+                raise _too_large(max_bytes)
+            await asyncio.to_thread(write, chunk)
+        await asyncio.to_thread(buffer.close)
+    except BaseException:
+        await asyncio.to_thread(buffer.close)
+        await asyncio.to_thread(_remove_quietly, saved_path)
+        raise
+
+    return size, digest.hexdigest()
+
+
+async def save_uploads(
+        files: List[UploadFile], saved_paths: List[str], quota_remaining: Optional[int] = None
+) -> List[Tuple[int, str]]:
+    """
+    여러 파일을 동시에(최대 FILE_BATCH_CONCURRENCY개) save_upload() -> [(file_size, sha256), ...] (입력 순서)
+    - 파일마다 1개 한도를 적용하고, 모두 받은 뒤 합계가 프로젝트 남은 용량을 넘으면 413
+    - 하나라도 실패하면 이미 저장한 임시 파일까지 모두 삭제하고 첫 번째 오류를 그대로 전달
+    """
+    semaphore = asyncio.Semaphore(FILE_BATCH_CONCURRENCY)
+    max_bytes = upload_limit(quota_remaining)
+
+    async def save(file: UploadFile, saved_path: str) -> Tuple[int, str]:
+        async with semaphore:
+            return await save_upload(file, saved_path, max_bytes)
+
+    results = await asyncio.gather(
+        *(save(file, path) for file, path in zip(files, saved_paths)), return_exceptions=True
+    )
+    error = next((result for result in results if isinstance(result, BaseException)), None)
+    if error is None and quota_remaining is not None and sum(size for size, _ in results) > quota_remaining:
+        error = _too_large(quota_remaining)
+    if error is not None:
+        for path, result in zip(saved_paths, results):
+            if not isinstance(result, BaseException):
+                await asyncio.to_thread(_remove_quietly, path)
+        raise error
+    return results
+
+
+def blob_path(sha256: str) -> str:
+    return os.path.join(BLOB_DIR, sha256[:2], sha256[2:4], sha256)
+
+
+def _blob_lock(sha256: str):
+    """같은 내용(해시)에 대한 등록과 파일 정리를 순서대로 실행하기 위한 트랜잭션 advisory lock"""
+    return select(func.pg_advisory_xact_lock(func.hashtext(sha256)))
+
+
+async def acquire_blob(db: AsyncSession, temp_path: str, sha256: str, file_size: int) -> str:
+    """
+    save_upload()로 받은 임시 파일을 내용 주소 저장소에 등록하고 참조 수 +1 -> 저장 경로 반환
+    - FileVersion 추가와 같은 트랜잭션에서 호출할 것
+    - 파일은 커밋 전에 옮김 -> 커밋된 blob 행은 항상 실제 파일이 있음 (롤백되면 다른 참조가 없을 때 삭제)
+    - 같은 내용이 이미 있으면 임시 파일만 지우고 기존 blob 공유 (중복 저장 없음)
+    """
+    saved_path = blob_path(sha256)
+    # 트랜잭션이 끝날 때까지 같은 내용의 등록/정리를 막음 (옮긴 파일을 다른 요청이 지우지 않도록)
+    await db.execute(_blob_lock(sha256))
+    statement = pg_insert(FileBlob).values(
+        sha256=sha256, saved_path=saved_path, file_size=file_size, ref_count=1, created_at=datetime.now()
+    ).on_conflict_do_update(
+        index_elements=[FileBlob.sha256],
+        set_={"ref_count": FileBlob.ref_count + 1}
+    )
+    await db.execute(statement)
+    if await asyncio.to_thread(_place_blob, temp_path, saved_path):
+        run_after_rollback(db, partial(_schedule_blob_cleanup, sha256, saved_path))
+    return saved_path
+
+
+async def release_blob(db: AsyncSession, version: FileVersion):
+    """
+    FileVersion 삭제 시 호출 (커밋 전): 참조 수 -1, 마지막 참조였으면 blob 행 삭제
+    - 실제 파일은 커밋된 뒤에 삭제 (롤백되면 그대로 유지)
+    - blob 저장소 도입 전에 올라온 버전은 전용 파일이므로 커밋 후 바로 삭제
+    """
+    if version.sha256 is None or version.saved_path != blob_path(version.sha256):
+        run_after_commit(db, partial(_remove_with_thumbnails, version.saved_path))
+        return
+
+    ref_count = (await db.execute(
+        update(FileBlob)
+        .where(FileBlob.sha256 == version.sha256)
+        .values(ref_count=FileBlob.ref_count - 1)
+        .returning(FileBlob.ref_count)
+    )).scalar_one_or_none()
+    if ref_count is not None and ref_count <= 0:
+        await db.execute(delete(FileBlob).where(FileBlob.sha256 == version.sha256))
+        run_after_commit(db, partial(_schedule_blob_cleanup, version.sha256, version.saved_path))
+
+
+def _schedule_blob_cleanup(sha256: str, saved_path: str):
+    asyncio.get_running_loop().create_task(_remove_unreferenced_blob(sha256, saved_path))
+
+
+async def _remove_unreferenced_blob(sha256: str, saved_path: str):
+    """
+    커밋(참조 해제)/롤백(등록 취소) 후 blob 파일 삭제: 그 사이에 같은 내용이 다시 올라왔으면(행이 있음) 유지
+    acquire_blob()과 같은 advisory lock을 잡으므로 새로 등록되는 파일을 지우지 않음
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(_blob_lock(sha256))
+            if await db.get(FileBlob, sha256) is None:
+                await asyncio.to_thread(_remove_with_thumbnails, saved_path)
+            await db.commit()
+    except Exception as e:
+        logger.error(f"[FileStorage] Failed to remove blob {sha256}: {e}")
+
+
+def _place_blob(temp_path: str, saved_path: str) -> bool:
+    """
+    임시 파일을 blob 위치로 이동 -> 새로 옮겼으면 True (이미 있으면 임시 파일만 삭제하고 False)
+    임시 디렉터리가 다른 파일시스템이어도 되도록 shutil.move로 같은 디렉터리에 옮긴 뒤 이름 변경
+    (복사 도중 실패해도 blob 위치에 잘린 파일이 남지 않음)
+    """
+    if os.path.exists(saved_path):
+        _remove_quietly(temp_path)  # 같은 내용이 이미 저장되어 있음
+        return False
+    os.makedirs(os.path.dirname(saved_path), exist_ok=True)
+    staging_path = f"{saved_path}.{uuid.uuid4().hex}.part"
+    try:
+        shutil.move(temp_path, staging_path)
+        os.replace(staging_path, saved_path)
+    except BaseException:
+        _remove_quietly(staging_path)
+        raise
+    return True
+
+
+def _remove_with_thumbnails(path: str):
+    _remove_quietly(path)
+    remove_thumbnails(path)
+
+
+def total_chunks(file_size: int, chunk_size: int) -> int:
+    """청크 수 (빈 파일도 청크 1개로 취급)"""
+    return max((file_size + chunk_size - 1) // chunk_size, 1)
+
+
+def create_sparse_file(path: str, size: int):
+    """청크를 위치에 바로 쓸 수 있도록 전체 크기의 빈(sparse) 파일 생성 (디스크는 쓴 만큼만 사용)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as buffer:
+        buffer.truncate(size)
+
+
+async def write_chunk(stream: AsyncIterator[bytes], path: str, offset: int, length: int):
+    """
+    요청 본문을 받는 대로 임시 파일의 offset 위치에 기록 (메모리에 모으지 않음)
+    길이가 length와 다르면 400 (같은 번호로 다시 보내면 덮어씀)
+    """
+    try:
+        buffer = await asyncio.to_thread(open, path, "r+b")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="업로드 세션이 없거나 만료되었습니다.")
+
+    written = 0
+    try:
+        await asyncio.to_thread(buffer.seek, offset)
+        async for data in stream:
+            if not data:
+                continue
+            written += len(data)
+            if written > length:
+                break
+            await asyncio.to_thread(buffer.write, data)
+    finally:
+        await asyncio.to_thread(buffer.close)
+
+    if written != length:
+        raise HTTPException(status_code=400, detail=f"청크 크기가 올바르지 않습니다. ({length} bytes 필요)")
+
+
+async def hash_file(path: str) -> str:
+    """완성된 파일의 SHA-256 (청크가 순서 없이 들어오므로 commit 시점에 한 번 계산)"""
+    def compute() -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as buffer:
+            for chunk in iter(lambda: buffer.read(UPLOAD_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    return await asyncio.to_thread(compute)
+
+
+async def discard_upload_session(db: AsyncSession, upload: UploadSession, remove_file: bool = True):
+    """세션/청크 기록 삭제 (커밋은 호출 측에서)"""
+    await db.execute(delete(UploadChunk).where(UploadChunk.upload_id == upload.id))
+    await db.delete(upload)
+    if remove_file:
+        await asyncio.to_thread(_remove_quietly, upload.temp_path)
+
+
+class UploadSessionSweeper:
+    """UPLOAD_SESSION_TTL 동안 청크가 오지 않은(중단된) 이어받기 업로드를 주기적으로 정리"""
+    def __init__(self, interval: float = UPLOAD_SESSION_SWEEP_INTERVAL):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def sweep(self) -> int:
+        async with AsyncSessionLocal() as db:
+            expired = (await db.exec(
+                select(UploadSession).where(UploadSession.expires_at < datetime.now())
+            )).all()
+            for upload in expired:
+                await discard_upload_session(db, upload)
+            await db.commit()
+        if expired:
+            logger.info(f"[Upload] Removed {len(expired)} expired upload sessions")
+        return len(expired)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"[Upload] Session sweep failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+async def remove_temp_files(paths: List[str]):
+    """저장 실패/취소 시 남은 임시 파일 정리 (이미 옮겨졌거나 없는 파일은 무시)"""
+    for path in paths:
+        await asyncio.to_thread(_remove_quietly, path)
+
+
+class _ZipStreamBuffer:
+    """
+    ZipFile이 쓰는 바이트를 모아 두었다가 drain()으로 넘겨주는 쓰기 전용 스트림
+    seek/tell이 없으므로 ZipFile은 data descriptor 방식으로 기록 (파일 크기/CRC를 내용 뒤에 씀)
+    """
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+async def stream_zip(
+        entries: List[Tuple[str, str, datetime, int]],
+        is_disconnected: Optional[Callable] = None
+) -> AsyncIterator[bytes]:
+    """
+    [(압축 파일 내 이름, 원본 경로, 수정 시각, 크기), ...]를 ZIP으로 만들면서 바로 전송
+    - 아카이브 전체를 메모리나 임시 파일에 만들지 않음 (원본을 UPLOAD_CHUNK_SIZE씩 읽어 압축한 만큼만 보냄)
+    - 크기가 4GB를 넘는 파일/아카이브는 ZIP64로 기록
+    - 파일을 시작할 때마다 is_disconnected()를 확인해서 클라이언트가 끊겼으면 중단
+    """
+    compression = zipfile.ZIP_DEFLATED if FILE_EXPORT_COMPRESSLEVEL > 0 else zipfile.ZIP_STORED
+    buffer = _ZipStreamBuffer()
+    compresslevel = FILE_EXPORT_COMPRESSLEVEL if FILE_EXPORT_COMPRESSLEVEL > 0 else None
+    archive = zipfile.ZipFile(buffer, "w", compression=compression)
+
+    for name, path, modified_at, file_size in entries:
+        if is_disconnected is not None and await is_disconnected():
+            return
+        try:
+            source = await asyncio.to_thread(open, path, "rb")
+        except OSError:
+            logger.warning(f"[Export] Skipping missing file: {path}")
+            continue
+
+        info = zipfile.ZipInfo(name, date_time=max(modified_at, datetime(1980, 1, 1)).timetuple()[:6])
+        info.compress_type = compression
+        # ZipInfo로 열면 ZipFile의 compresslevel이 적용되지 않으므로 항목마다 지정 (3.13부터 이름 변경)
+        if hasattr(info, "compress_level"):
+            info.compress_level = compresslevel
+        else:
+            info._compresslevel = compresslevel
+        info.file_size = file_size  # ZIP64 필요 여부 판단용
+        try:
+            target = archive.open(info, "w")
+
+            def pump() -> bool:
+                chunk = source.read(UPLOAD_CHUNK_SIZE)
+                if chunk:
+                    target.write(chunk)
+                return bool(chunk)
+
+            while await asyncio.to_thread(pump):
+                data = buffer.drain()
+                if data:
+                    yield data
+            await asyncio.to_thread(target.close)
+        finally:
+            await asyncio.to_thread(source.close)
+        yield buffer.drain()
+
+    archive.close()  # 중앙 디렉터리 기록
+    yield buffer.drain()
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# 싱글톤 인스턴스
+upload_session_sweeper = UploadSessionSweeper()
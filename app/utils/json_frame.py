@@ -0,0 +1,27 @@
+import json
+from typing import Any, Union
+
+from fastapi.encoders import jsonable_encoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(data: Any) -> bytes:
+    """JSON 직렬화 (orjson이 있으면 사용, 없으면 표준 json)"""
+    if orjson is not None:
+        return orjson.dumps(data, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=jsonable_encoder, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_frame(message: Union[dict, str]) -> str:
+    """
+    WebSocket/SSE로 보낼 텍스트 프레임
+    수신자가 여러 명이어도 한 번만 인코딩하고 같은 문자열을 재사용
+    (이미 인코딩된 문자열은 그대로 반환)
+    """
+    if isinstance(message, str):
+        return message
+    return dumps(message).decode("utf-8")
@@ -1,4 +1,5 @@
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.activity import ActivityLog
 
 def log_activity(
@@ -18,4 +19,24 @@ def log_activity(
         workspace_id=workspace_id
     )
     db.add(log)
-    db.commit()
\ No newline at end of file
+    db.commit()
+
+
+async def log_activity_async(
+        db: AsyncSession,
+        user_id: int,
+        content: str,
+        action_type: str,
+        workspace_id: int = None
+):
+    """
+    log_activity의 비동기 세션 버전 (async 라우터에서 사용)
+    """
+    log = ActivityLog(
+        user_id=user_id,
+        content=content,
+        action_type=action_type,
+        workspace_id=workspace_id
+    )
+    db.add(log)
+    await db.commit()
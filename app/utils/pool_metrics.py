@@ -0,0 +1,70 @@
+import threading
+import time
+from typing import Dict, Type
+
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool
+
+
+class PoolMetrics:
+    """
+    커넥션 풀 대기 시간 집계
+    - 커넥션을 얻기까지 걸린 시간 (대기 + 필요 시 새 연결 생성 + pre-ping)
+    - 풀 고갈로 인한 타임아웃 횟수
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def snapshot(self, pool: Pool) -> Dict:
+        """현재 풀 상태 + 누적 대기 시간 통계"""
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            stats = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / attempts * 1000, 3) if attempts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+        # QueuePool 계열만 size/overflow 정보를 가짐
+        if hasattr(pool, "checkedout"):
+            stats.update({
+                "pool_size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            })
+        return {"name": self.name, **stats}
+
+
+def instrumented_pool_class(base: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    """
+    connect() 소요 시간을 metrics에 기록하는 풀 클래스 생성
+    (dispose 시 recreate()가 self.__class__를 쓰므로 재생성된 풀도 같은 metrics를 사용)
+    """
+    class InstrumentedPool(base):
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                conn = super().connect()
+            except exc.TimeoutError:
+                metrics.record(time.perf_counter() - start, timed_out=True)
+                raise
+            metrics.record(time.perf_counter() - start)
+            return conn
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
@@ -0,0 +1,322 @@
+import os
+import time
+import asyncio
+import threading
+import logging
+from typing import Callable, Dict, List, Optional, Set
+
+from sqlmodel import select
+
+from app.database import AsyncSessionLocal
+from app.models.user import User
+from app.models.workspace import WorkspaceMember
+from app.utils.json_frame import encode_frame
+from app.utils.backplane import backplane
+
+logger = logging.getLogger(__name__)
+
+# 마지막 요청 이후 온라인으로 보는 시간 / 오프라인 판정·다른 워커 heartbeat 주기 (초)
+PRESENCE_TIMEOUT = float(os.getenv("PRESENCE_TIMEOUT", 60))
+PRESENCE_SWEEP_INTERVAL = float(os.getenv("PRESENCE_SWEEP_INTERVAL", 5))
+
+
+class _WorkspacePresence:
+    __slots__ = ("members", "frame", "subscribers")
+
+    def __init__(self, members: Dict[int, dict]):
+        self.members = members  # { user_id: 프로필 } (조회 순서 유지)
+        self.frame: Optional[str] = None  # 마지막으로 보낸 online_members
+        self.subscribers: List[asyncio.Queue] = []
+
+
+class PresenceRegistry:
+    """
+    메모리 기반 온라인 상태 관리 (online-members SSE의 5초 폴링 대체)
+    - 인증된 요청(get_current_user_id)과 워크스페이스 WebSocket 연결/해제로 갱신
+    - 온라인/오프라인이 바뀐 유저가 속한 워크스페이스만 다시 계산하고,
+      결과가 달라졌을 때만 전송 (워크스페이스당 한 번 계산·인코딩해서 모든 구독자가 공유)
+    - 멤버 목록은 워크스페이스에 첫 구독자가 생길 때 한 번 조회, 마지막 구독자가 나가면 제거
+    - 여러 워커: 온라인 전환은 즉시, 활동 중인 유저는 PRESENCE_SWEEP_INTERVAL마다 backplane으로 공유
+    """
+    def __init__(self):
+        self._last_seen: Dict[int, float] = {}     # { user_id: 마지막 요청 시각 }
+        self._connections: Dict[int, int] = {}     # { user_id: 열린 WebSocket 수 }
+        self._online: Set[int] = set()
+        self._local_active: Set[int] = set()       # 이번 주기에 이 워커에서 활동한 유저
+        self._workspaces: Dict[int, _WorkspacePresence] = {}
+        self._user_workspaces: Dict[int, Set[int]] = {}
+        self._loading: Dict[int, asyncio.Lock] = {}
+        # get_current_user_id는 쓰레드풀에서 실행되므로 lock으로 보호
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self.backplane = backplane
+        self.backplane.subscribe("presence", self._on_remote)
+
+    # ---------------------------------------------------------------
+    # 활동 기록 (아무 쓰레드에서나 호출 가능)
+    # ---------------------------------------------------------------
+    def touch(self, user_id: int):
+        """인증된 요청마다 호출"""
+        with self._lock:
+            self._last_seen[user_id] = time.time()
+            self._local_active.add(user_id)
+        if user_id not in self._online:
+            self._call(self._mark_online, user_id, True)
+
+    def connect(self, user_id: int):
+        """WebSocket 연결 시 호출 (연결이 열려 있는 동안 온라인)"""
+        self._connections[user_id] = self._connections.get(user_id, 0) + 1
+        with self._lock:
+            self._local_active.add(user_id)
+        self._mark_online(user_id, True)
+
+    def disconnect(self, user_id: int):
+        """WebSocket 종료 시 호출 (최근 요청도 없으면 바로 오프라인)"""
+        count = self._connections.get(user_id, 0) - 1
+        if count > 0:
+            self._connections[user_id] = count
+            return
+        self._connections.pop(user_id, None)
+        if self._expired(user_id, time.time()):
+            self._mark_offline(user_id)
+
+    def invalidate_workspace(self, workspace_id: int):
+        """멤버 추가/탈퇴 후 호출 -> 멤버 목록 다시 조회"""
+        self._call(self._reload, [workspace_id], True)
+
+    def invalidate_user(self, user_id: int):
+        """프로필(이름, 이미지) 변경/탈퇴 후 호출 -> 해당 유저가 속한 워크스페이스 다시 조회"""
+        self._call(self._reload_user, user_id, True)
+
+    # ---------------------------------------------------------------
+    # 구독 (SSE)
+    # ---------------------------------------------------------------
+    async def subscribe(self, workspace_id: int) -> asyncio.Queue:
+        """
+        현재 online_members 프레임이 바로 들어 있는 큐 반환
+        큐 크기는 1: 소비가 늦으면 최신 목록으로 덮어씀 (전체 목록이므로 중간 상태는 필요 없음)
+        """
+        state = await self._load(workspace_id)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        state.subscribers.append(queue)
+        queue.put_nowait(state.frame)
+        return queue
+
+    def unsubscribe(self, workspace_id: int, queue: asyncio.Queue):
+        state = self._workspaces.get(workspace_id)
+        if state is None or queue not in state.subscribers:
+            return
+        state.subscribers.remove(queue)
+        if not state.subscribers:
+            self._unload(workspace_id)
+
+    # ---------------------------------------------------------------
+    # 생명주기
+    # ---------------------------------------------------------------
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(PRESENCE_SWEEP_INTERVAL)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"[Presence] Sweep failed: {e}")
+
+    async def sweep(self):
+        """다른 워커에 활동 중인 유저 공유 + 시간이 지난 유저 오프라인 처리"""
+        with self._lock:
+            active, self._local_active = self._local_active, set()
+        active |= set(self._connections)
+        if active:
+            await self.backplane.publish("presence", {"active": sorted(active)})
+
+        now = time.time()
+        for user_id in [user_id for user_id in self._online if self._expired(user_id, now)]:
+            self._mark_offline(user_id)
+
+    # ---------------------------------------------------------------
+    # 내부 처리 (이벤트 루프에서만 실행)
+    # ---------------------------------------------------------------
+    def _call(self, callback: Callable, *args):
+        """이벤트 루프 쓰레드에서 callback 실행 (쓰레드풀에서 호출된 경우 넘겨서 실행)"""
+        if self._loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            callback(*args)
+        else:
+            self._loop.call_soon_threadsafe(callback, *args)
+
+    def _expired(self, user_id: int, now: float) -> bool:
+        if self._connections.get(user_id):
+            return False
+        with self._lock:
+            last_seen = self._last_seen.get(user_id, 0)
+        return now - last_seen >= PRESENCE_TIMEOUT
+
+    def _mark_online(self, user_id: int, publish: bool):
+        if user_id in self._online:
+            return
+        self._online.add(user_id)
+        if publish:
+            self._publish({"active": [user_id]})
+        self._refresh_user(user_id)
+
+    def _mark_offline(self, user_id: int):
+        self._online.discard(user_id)
+        with self._lock:
+            self._last_seen.pop(user_id, None)
+        self._refresh_user(user_id)
+
+    def _refresh_user(self, user_id: int):
+        for workspace_id in list(self._user_workspaces.get(user_id, ())):
+            self._refresh(workspace_id)
+
+    def _refresh(self, workspace_id: int):
+        """온라인 목록을 다시 만들어 달라졌을 때만 구독자에게 전송"""
+        state = self._workspaces.get(workspace_id)
+        if state is None:
+            return
+        frame = encode_frame({
+            "online_members": [
+                profile for member_id, profile in state.members.items() if member_id in self._online
+            ]
+        })
+        if frame == state.frame:
+            return
+        state.frame = frame
+        for queue in state.subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(frame)
+
+    async def _load(self, workspace_id: int) -> _WorkspacePresence:
+        state = self._workspaces.get(workspace_id)
+        if state is not None:
+            return state
+        # 같은 워크스페이스에 동시에 접속해도 조회는 한 번만
+        lock = self._loading.setdefault(workspace_id, asyncio.Lock())
+        async with lock:
+            state = self._workspaces.get(workspace_id)
+            if state is None:
+                members = await self._fetch_members(workspace_id)
+                state = self._workspaces[workspace_id] = _WorkspacePresence(members)
+                self._index(workspace_id, members)
+                self._refresh(workspace_id)
+        if not lock.locked():
+            self._loading.pop(workspace_id, None)
+        return state
+
+    async def _fetch_members(self, workspace_id: int) -> Dict[int, dict]:
+        """
+        멤버 프로필 조회 + 최근 활동한 멤버는 온라인으로 반영
+        (재시작 직후에도 last_active_at 기준으로 바로 보이도록)
+        """
+        statement = (
+            select(User.id, User.name, User.email, User.profile_image, User.last_active_at)
+            .join(WorkspaceMember, User.id == WorkspaceMember.user_id)
+            .where(WorkspaceMember.workspace_id == workspace_id)
+        )
+        async with AsyncSessionLocal() as db:
+            rows = (await db.exec(statement)).all()
+
+        members = {}
+        newly_online = []
+        now = time.time()
+        for row in rows:
+            members[row.id] = {
+                "id": row.id,
+                "name": row.name,
+                "email": row.email,
+                "profile_image": row.profile_image,
+            }
+            last_active = row.last_active_at.timestamp() if row.last_active_at else 0
+            if row.id not in self._online and now - last_active < PRESENCE_TIMEOUT:
+                with self._lock:
+                    self._last_seen[row.id] = max(self._last_seen.get(row.id, 0), last_active)
+                self._online.add(row.id)
+                newly_online.append(row.id)
+        # 다른 워크스페이스 목록에도 반영
+        for user_id in newly_online:
+            self._refresh_user(user_id)
+        return members
+
+    def _index(self, workspace_id: int, members: Dict[int, dict]):
+        for user_id in members:
+            self._user_workspaces.setdefault(user_id, set()).add(workspace_id)
+
+    def _unindex(self, workspace_id: int, members: Dict[int, dict]):
+        for user_id in members:
+            workspaces = self._user_workspaces.get(user_id)
+            if workspaces is not None:
+                workspaces.discard(workspace_id)
+                if not workspaces:
+                    del self._user_workspaces[user_id]
+
+    def _unload(self, workspace_id: int):
+        state = self._workspaces.pop(workspace_id, None)
+        if state is not None:
+            self._unindex(workspace_id, state.members)
+
+    def _reload(self, workspace_ids: List[int], publish: bool):
+        if publish:
+            self._publish({"reload": workspace_ids})
+        for workspace_id in workspace_ids:
+            if workspace_id in self._workspaces:
+                asyncio.create_task(self._reload_workspace(workspace_id))
+
+    def _reload_user(self, user_id: int, publish: bool):
+        if publish:
+            self._publish({"reload_user": user_id})
+        self._reload(list(self._user_workspaces.get(user_id, ())), False)
+
+    async def _reload_workspace(self, workspace_id: int):
+        try:
+            members = await self._fetch_members(workspace_id)
+        except Exception as e:
+            logger.error(f"[Presence] Failed to reload workspace {workspace_id}: {e}")
+            return
+        state = self._workspaces.get(workspace_id)
+        if state is None:
+            return  # 조회하는 동안 구독자가 모두 나감
+        self._unindex(workspace_id, state.members)
+        state.members = members
+        self._index(workspace_id, members)
+        self._refresh(workspace_id)
+
+    def _publish(self, data: dict):
+        asyncio.create_task(self.backplane.publish("presence", data))
+
+    async def _on_remote(self, data: dict):
+        if "active" in data:
+            now = time.time()
+            with self._lock:
+                for user_id in data["active"]:
+                    self._last_seen[user_id] = now
+            for user_id in data["active"]:
+                self._mark_online(user_id, False)
+        elif "reload" in data:
+            self._reload(data["reload"], False)
+        elif "reload_user" in data:
+            self._reload_user(data["reload_user"], False)
+
+
+# 싱글톤 인스턴스
+presence_registry = PresenceRegistry()
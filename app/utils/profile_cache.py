@@ -0,0 +1,68 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.user import User
+from app.schemas import UserResponse
+
+# 다른 워커에서 변경된 프로필이 반영되기까지의 최대 시간
+USER_PROFILE_CACHE_TTL = float(os.getenv("USER_PROFILE_CACHE_TTL", 60))  # 초
+USER_PROFILE_CACHE_MAX_SIZE = int(os.getenv("USER_PROFILE_CACHE_MAX_SIZE", 10000))
+
+
+class UserProfileCache:
+    """
+    유저 프로필 LRU + TTL 캐시 (user_id -> UserResponse)
+    - 채팅/활동 로그/게시글 응답처럼 이름, 닉네임, 프로필 이미지만 필요한 곳에서 db.get(User) 대신 사용
+    - routers/user.py에서 프로필 변경 시 invalidate()
+    - 동기 라우터는 쓰레드풀에서 실행되므로 lock으로 보호
+    """
+    def __init__(self, ttl: float = USER_PROFILE_CACHE_TTL, max_size: int = USER_PROFILE_CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        # { user_id: (프로필, 캐시 만료 시각(monotonic)) }
+        self._entries: "OrderedDict[int, Tuple[UserResponse, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[UserResponse]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if not entry:
+                return None
+            profile, cached_until = entry
+            if cached_until < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return profile
+
+    def set(self, user: User) -> UserResponse:
+        profile = UserResponse.model_validate(user)
+        with self._lock:
+            self._entries[user.id] = (profile, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return profile
+
+    async def load(self, db: AsyncSession, user_id: int) -> Optional[UserResponse]:
+        """캐시 미스일 때만 조회 (없는 유저는 None)"""
+        profile = self.get(user_id)
+        if profile is None:
+            user = await db.get(User, user_id)
+            if user is None:
+                return None
+            profile = self.set(user)
+        return profile
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+# 싱글톤 인스턴스
+profile_cache = UserProfileCache()
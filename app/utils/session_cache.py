@@ -0,0 +1,143 @@
+import os
+import time
+import asyncio
+import threading
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import update, values, column, Integer, DateTime
+
+from app.database import async_engine
+from app.models.user import User
+from app.utils.backplane import backplane
+
+logger = logging.getLogger(__name__)
+
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", 60))           # 초
+SESSION_CACHE_MAX_SIZE = int(os.getenv("SESSION_CACHE_MAX_SIZE", 10000))
+ACTIVITY_FLUSH_INTERVAL = float(os.getenv("ACTIVITY_FLUSH_INTERVAL", 5))  # 초
+
+
+class SessionCache:
+    """
+    유효한 세션 TTL 캐시 (session_id -> user_id)
+    - 캐시 히트 시 user_sessions 조회 없이 인증 처리
+    - 로그아웃 시 invalidate()로 즉시 제거 (backplane으로 다른 워커의 캐시에서도 제거)
+    - backplane 재연결 시에는 놓친 로그아웃이 있을 수 있으므로 전부 비움
+    - get_current_user_id가 쓰레드풀에서 실행되므로 lock으로 보호
+    """
+    def __init__(self, ttl: float = SESSION_CACHE_TTL, max_size: int = SESSION_CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        # { session_id: (user_id, 세션 만료 시각, 캐시 만료 시각(monotonic)) }
+        self._entries: "OrderedDict[str, Tuple[int, datetime, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.backplane = backplane
+        self.backplane.subscribe("session", self._on_remote)
+        self.backplane.on_reconnect(self.clear)
+
+    def get(self, session_id: str) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if not entry:
+                return None
+            user_id, expires_at, cached_until = entry
+            if cached_until < time.monotonic() or expires_at < datetime.now():
+                del self._entries[session_id]
+                return None
+            self._entries.move_to_end(session_id)
+            return user_id
+
+    def set(self, session_id: str, user_id: int, expires_at: datetime):
+        with self._lock:
+            self._entries[session_id] = (user_id, expires_at, time.monotonic() + self.ttl)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, session_id: str):
+        """아무 쓰레드에서나 호출 가능 (동기 라우터 포함)"""
+        self._remove(session_id)
+        self.backplane.publish_threadsafe("session", {"invalidate": session_id})
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    async def _on_remote(self, data: dict):
+        self._remove(data["invalidate"])
+
+    def _remove(self, session_id: str):
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+
+class ActivityTracker:
+    """
+    users.last_active_at 갱신을 메모리에 모아두었다가
+    ACTIVITY_FLUSH_INTERVAL마다 UPDATE ... FROM (VALUES ...) 한 번으로 반영
+    """
+    def __init__(self, interval: float = ACTIVITY_FLUSH_INTERVAL):
+        self.interval = interval
+        self._pending: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def touch(self, user_id: int):
+        with self._lock:
+            self._pending[user_id] = datetime.now()
+
+    def _drain(self) -> Dict[int, datetime]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    async def flush(self):
+        pending = self._drain()
+        if not pending:
+            return
+
+        activity = values(
+            column("id", Integer), column("last_active_at", DateTime),
+            name="activity"
+        ).data(list(pending.items()))
+        statement = (
+            update(User)
+            .where(User.id == activity.c.id)
+            .values(last_active_at=activity.c.last_active_at)
+        )
+        try:
+            async with async_engine.begin() as conn:
+                await conn.execute(statement)
+        except Exception as e:
+            logger.error(f"[ActivityTracker] Flush failed: {e}")
+            # 실패한 항목은 더 최신 값이 없을 때만 되돌려 다음 주기에 재시도
+            with self._lock:
+                for user_id, ts in pending.items():
+                    self._pending.setdefault(user_id, ts)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()  # 종료 전 남은 활동 기록 반영
+
+
+# 싱글톤 인스턴스
+session_cache = SessionCache()
+activity_tracker = ActivityTracker()
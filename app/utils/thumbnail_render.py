@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import subprocess
+
+# 프로세스 풀 작업자가 import하는 모듈 -> app 모듈(DB, 모델, 매니저)을 import하지 않음
+
+# 썸네일 긴 변 크기(px) / 형식(webp, jpeg)
+THUMBNAIL_SIZE = int(os.getenv("THUMBNAIL_SIZE", 320))
+THUMBNAIL_FORMAT = os.getenv("THUMBNAIL_FORMAT", "webp").lower()
+PDF_RENDER_TIMEOUT = float(os.getenv("PDF_RENDER_TIMEOUT", 30))  # 초
+
+
+def thumbnail_path(source: str) -> str:
+    """원본 옆에 저장 (예: abc.png -> abc.png.thumb.webp)"""
+    return f"{source}.thumb.{'jpg' if THUMBNAIL_FORMAT == 'jpeg' else THUMBNAIL_FORMAT}"
+
+
+def unsupported_marker(source: str) -> str:
+    """썸네일을 만들 수 없는 원본 표시 (재시작 후 다시 시도하지 않음)"""
+    return f"{source}.thumb.none"
+
+
+def remove_thumbnails(source: str):
+    """원본 삭제 시 함께 호출"""
+    for path in (thumbnail_path(source), unsupported_marker(source)):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def render_thumbnail(source: str, target: str, size: int, image_format: str) -> str:
+    """
+    프로세스 풀에서 실행 -> "done" | "unsupported" | "unavailable" | "missing"
+    - 이미지: 긴 변 size px로 축소 (EXIF 회전 반영)
+    - PDF: pdftoppm(poppler-utils)이 있으면 첫 페이지를 그려서 같은 방식으로 축소
+    - 임시 파일에 저장 후 rename -> 중간에 죽어도 깨진 썸네일이 남지 않음 (같은 원본은 다시 만들지 않음)
+    """
+    if os.path.exists(target):
+        return "done"
+    if os.path.exists(unsupported_marker(source)):
+        return "unsupported"
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return "unavailable"
+
+    try:
+        with open(source, "rb") as buffer:
+            is_pdf = buffer.read(5) == b"%PDF-"
+    except FileNotFoundError:
+        return "missing"
+
+    temp_target = f"{target}.{os.getpid()}.tmp"
+    with tempfile.TemporaryDirectory() as workdir:
+        image_path = source
+        if is_pdf:
+            pdftoppm = shutil.which("pdftoppm")
+            if pdftoppm is None:
+                return "unavailable"
+            page_prefix = os.path.join(workdir, "page")
+            try:
+                subprocess.run(
+                    [pdftoppm, "-f", "1", "-l", "1", "-singlefile", "-png",
+                     "-scale-to", str(size * 2), source, page_prefix],
+                    check=True, capture_output=True, timeout=PDF_RENDER_TIMEOUT
+                )
+            except (subprocess.SubprocessError, OSError):
+                mark_unsupported(source)
+                return "unsupported"
+            image_path = page_prefix + ".png"
+
+        try:
+            with Image.open(image_path) as original:
+                image = ImageOps.exif_transpose(original)
+                image.thumbnail((size, size))
+                has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+                image = image.convert("RGBA" if has_alpha and image_format == "webp" else "RGB")
+                image.save(temp_target, format=image_format.upper(), quality=80)
+        except Exception:
+            # 이미지가 아니거나 손상된 파일
+            try:
+                os.remove(temp_target)
+            except OSError:
+                pass
+            mark_unsupported(source)
+            return "unsupported"
+
+    os.replace(temp_target, target)
+    return "done"
+
+
+def mark_unsupported(source: str):
+    try:
+        open(unsupported_marker(source), "w").close()
+    except OSError:
+        pass
@@ -0,0 +1,260 @@
+import os
+import asyncio
+import logging
+import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy import update
+from sqlmodel import select
+
+from app.database import AsyncSessionLocal, async_engine
+from app.models.file import FileMetadata, FileVersion
+from app.models.community import CommunityPost
+from app.models.user import User
+from app.utils.board_cache import board_cache
+from app.utils.profile_cache import profile_cache
+from app.utils.connection_manager import board_event_manager, community_event_manager
+from app.utils.thumbnail_render import (
+    THUMBNAIL_SIZE, THUMBNAIL_FORMAT, thumbnail_path, render_thumbnail, mark_unsupported
+)
+
+logger = logging.getLogger(__name__)
+
+# 썸네일 생성 프로세스 수
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", 2))
+# /static 으로 제공되는 디렉터리 (main.py의 StaticFiles와 같아야 함)
+STATIC_ROOT = "/app/uploads"
+
+# 종류별 (모델, 원본 컬럼, 썸네일 컬럼, 원본 컬럼이 URL인지)
+THUMBNAIL_TARGETS = {
+    "file_version": (FileVersion, "saved_path", "thumbnail_url", False),
+    "community_post": (CommunityPost, "image_url", "image_thumbnail_url", True),
+    "user": (User, "profile_image", "profile_image_thumbnail", True),
+}
+
+
+def static_url(path: str) -> Optional[str]:
+    relative = os.path.relpath(path, STATIC_ROOT)
+    if relative.startswith(".."):
+        return None
+    return f"/static/{relative}"
+
+
+def static_path(url: str) -> Optional[str]:
+    if not url or not url.startswith("/static/"):
+        return None
+    return os.path.join(STATIC_ROOT, url.removeprefix("/static/"))
+
+
+class ThumbnailGenerator:
+    """
+    업로드된 이미지/PDF의 썸네일을 백그라운드 프로세스 풀에서 생성
+    - 업로드 라우터는 커밋 후 enqueue()만 호출하고 바로 응답
+    - 생성되면 해당 행의 썸네일 URL 컬럼을 채우고 실시간 이벤트로 알림
+    - 시작 시 썸네일 URL이 비어 있는 행을 다시 등록 -> 처리 도중 서버가 죽어도 이어서 생성
+    - 작업 프로세스가 죽으면 풀을 한 번만 다시 만들고, 그 풀에서 실행 중이던 작업은 단독 풀(작업자 1개)에서 재시도
+      -> 단독으로 실행해도 죽는 원본만 만들 수 없다고 표시
+    - Pillow가 없으면 비활성화 (PDF는 pdftoppm도 필요)
+    """
+    def __init__(self, workers: int = THUMBNAIL_WORKERS):
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: Set[Tuple[str, int]] = set()  # 대기/처리 중인 (종류, id) - 중복 등록 방지
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._retry_queue: Optional[asyncio.Queue] = None
+        self._retry_pool: Optional[ProcessPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def available() -> bool:
+        return importlib.util.find_spec("PIL") is not None
+
+    def enqueue(self, kind: str, row_id: int, source: str, project_id: Optional[int] = None):
+        """
+        원본 저장이 커밋된 뒤 호출 (아무 쓰레드에서나 가능)
+        kind: THUMBNAIL_TARGETS의 키, source: 원본 파일 경로
+        """
+        if self._loop is None:
+            return
+        job = (kind, row_id, source, project_id)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._put(job)
+        else:
+            self._loop.call_soon_threadsafe(self._put, job)
+
+    def start(self):
+        if not self.available():
+            logger.warning("[Thumbnail] Pillow not installed, thumbnail generation disabled")
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._retry_queue = asyncio.Queue()
+        self._pool = self._new_pool(self.workers)
+        self._retry_pool = self._new_pool(1)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._work_retries()))
+        self._tasks.append(asyncio.create_task(self._resume()))
+
+    async def stop(self):
+        self._loop = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # 남은 작업은 다음 시작 시 _resume()에서 다시 등록됨
+        for pool in (self._pool, self._retry_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._retry_pool = None
+
+    def _new_pool(self, workers: int) -> ProcessPoolExecutor:
+        # fork 대신 spawn: 이벤트 루프/DB 연결 상태를 자식 프로세스로 복제하지 않음
+        # (작업 함수는 app 모듈을 import하지 않는 thumbnail_render에 있으므로 자식 프로세스 시작이 가벼움)
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _put(self, job: tuple):
+        key = (job[0], job[1])
+        if self._queue is None or key in self._pending:
+            return
+        self._pending.add(key)
+        self._queue.put_nowait(job)
+
+    async def _resume(self):
+        """썸네일 URL이 아직 없는 원본 다시 등록 (파일 버전은 만들 수 없다고 기록된 것 제외)"""
+        try:
+            async with AsyncSessionLocal() as db:
+                versions = (await db.exec(
+                    select(FileVersion.id, FileVersion.saved_path, FileMetadata.project_id)
+                    .join(FileMetadata, FileMetadata.id == FileVersion.file_id)
+                    .where(FileVersion.thumbnail_url == None, FileVersion.thumbnail_unsupported == None)
+                )).all()
+                posts = (await db.exec(
+                    select(CommunityPost.id, CommunityPost.image_url)
+                    .where(CommunityPost.image_url != None, CommunityPost.image_thumbnail_url == None)
+                )).all()
+                users = (await db.exec(
+                    select(User.id, User.profile_image)
+                    .where(User.profile_image != None, User.profile_image_thumbnail == None)
+                )).all()
+        except Exception as e:
+            logger.error(f"[Thumbnail] Failed to load pending thumbnails: {e}")
+            return
+
+        for version_id, saved_path, project_id in versions:
+            self._put(("file_version", version_id, saved_path, project_id))
+        for kind, rows in (("community_post", posts), ("user", users)):
+            for row_id, url in rows:
+                source = static_path(url)
+                if source is not None:
+                    self._put((kind, row_id, source, None))
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            pool = self._pool
+            try:
+                await self._process(job, pool)
+            except BrokenProcessPool:
+                # 같은 풀에서 실행 중이던 작업이 모두 실패하므로 어느 원본 때문인지 알 수 없음 -> 단독 재시도
+                self._replace_pool(pool)
+                self._retry_queue.put_nowait(job)
+                continue
+            self._pending.discard(job[:2])
+
+    async def _work_retries(self):
+        while True:
+            job = await self._retry_queue.get()
+            pool = self._retry_pool
+            try:
+                await self._process(job, pool)
+            except BrokenProcessPool:
+                # 혼자 실행해도 작업 프로세스가 죽음 (손상된 이미지 등) -> 다시 시도하지 않음
+                logger.error(f"[Thumbnail] Worker crashed on {job[2]}, marking as unsupported")
+                await asyncio.to_thread(mark_unsupported, job[2])
+                await self._save_unsupported(job[0], job[1])
+                self._retry_pool = self._new_pool(1)
+                pool.shutdown(wait=False, cancel_futures=True)
+            self._pending.discard(job[:2])
+
+    def _replace_pool(self, broken: ProcessPoolExecutor):
+        """여러 작업이 동시에 BrokenProcessPool을 받아도 풀은 한 번만 다시 만듦"""
+        if self._pool is not broken:
+            return
+        logger.error("[Thumbnail] Worker process crashed, restarting pool")
+        self._pool = self._new_pool(self.workers)
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    async def _process(self, job: tuple, pool: ProcessPoolExecutor):
+        """BrokenProcessPool 외의 오류는 로그만 남김"""
+        kind, row_id, source, project_id = job
+        target = thumbnail_path(source)
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                pool, render_thumbnail, source, target, THUMBNAIL_SIZE, THUMBNAIL_FORMAT
+            )
+            if result == "done":
+                await self._save(kind, row_id, source, project_id, target)
+            elif result == "unsupported":
+                await self._save_unsupported(kind, row_id)
+        except BrokenProcessPool:
+            raise
+        except Exception as e:
+            logger.error(f"[Thumbnail] Failed to create thumbnail for {kind} {row_id}: {e}")
+
+    async def _save_unsupported(self, kind: str, row_id: int):
+        """
+        파일 버전은 문서/압축 파일 등 대부분이 썸네일 대상이 아니므로 DB에 기록
+        -> 재시작할 때마다 모든 버전을 다시 등록하지 않음 (게시글/프로필은 이미지 업로드라 원본 옆 표시 파일로 충분)
+        """
+        if kind != "file_version":
+            return
+        try:
+            async with async_engine.begin() as conn:
+                await conn.execute(
+                    update(FileVersion).where(FileVersion.id == row_id).values(thumbnail_unsupported=True)
+                )
+        except Exception as e:
+            logger.error(f"[Thumbnail] Failed to mark file version {row_id} as unsupported: {e}")
+
+    async def _save(self, kind: str, row_id: int, source: str, project_id: Optional[int], target: str):
+        url = static_url(target)
+        if url is None:
+            return
+        model, source_column, thumbnail_column, source_is_url = THUMBNAIL_TARGETS[kind]
+        # 생성하는 동안 원본이 바뀌었으면(새 프로필 사진 등) 반영하지 않음
+        source_value = static_url(source) if source_is_url else source
+        async with async_engine.begin() as conn:
+            result = await conn.execute(
+                update(model)
+                .where(model.id == row_id, getattr(model, source_column) == source_value)
+                .values({thumbnail_column: url})
+            )
+        if result.rowcount == 0:
+            return
+
+        if kind == "file_version" and project_id is not None:
+            await board_event_manager.broadcast(project_id, {
+                "type": "FILE_THUMBNAIL_READY",
+                "data": {"version_id": row_id, "thumbnail_url": url}
+            })
+        elif kind == "community_post":
+            await community_event_manager.broadcast({
+                "type": "POST_THUMBNAIL_READY",
+                "data": {"id": row_id, "image_thumbnail_url": url}
+            })
+        elif kind == "user":
+            # 프로필은 보드/채팅 응답에도 포함되므로 캐시 무효화
+            profile_cache.invalidate(row_id)
+            board_cache.invalidate_all()
+
+
+# 싱글톤 인스턴스
+thumbnail_generator = ThumbnailGenerator()
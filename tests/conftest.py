@@ -0,0 +1,66 @@
+# DB를 쓰는 테스트는 DATABASE_URL의 PostgreSQL(테스트용 DB)에 연결해서 실행 (연결할 수 없으면 건너뜀)
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+
+from app.database import engine, async_engine
+
+
+@pytest.fixture(scope="session")
+def database():
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except OperationalError:
+        pytest.skip("DATABASE_URL의 PostgreSQL에 연결할 수 없습니다.")
+    return engine
+
+
+@pytest.fixture(scope="session")
+def client(database):
+    """관리자 계정으로 로그인한 클라이언트 (세션 쿠키가 secure라서 https)"""
+    from app.main import app
+    with TestClient(app, base_url="https://testserver") as c:
+        c.post("/api/auth/auth/setup-admin")
+        response = c.post("/api/auth/login", json={"email": "admin@domo.com", "password": "admin1234"})
+        assert response.status_code == 200, response.text
+        yield c
+
+
+@pytest.fixture
+def workspace_id(client) -> int:
+    """테스트마다 새 워크스페이스"""
+    response = client.post("/api/workspaces", json={"name": f"test-{uuid.uuid4().hex[:8]}"})
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+@pytest.fixture
+def project_id(client, workspace_id) -> int:
+    response = client.post(f"/api/workspaces/{workspace_id}/projects", json={"name": "test"})
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+class QueryCounter:
+    """동기/비동기 엔진에서 실행된 SQL 수"""
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+@pytest.fixture
+def query_counter():
+    counter = QueryCounter()
+    engines = [engine, async_engine.sync_engine]
+    for target in engines:
+        event.listen(target, "before_cursor_execute", counter)
+    yield counter
+    for target in engines:
+        event.remove(target, "before_cursor_execute", counter)
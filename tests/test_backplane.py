@@ -0,0 +1,128 @@
+import uuid
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import ASYNC_DATABASE_URL
+from app.utils.backplane import InMemoryBackplane, PostgresBackplane
+from app.utils.connection_manager import board_event_manager, RESYNC_FRAME
+from app.utils.session_cache import session_cache
+
+
+async def _two_workers():
+    """같은 hub를 공유하는 워커 2개 -> (보내는 쪽, 받는 쪽, 받은 메시지 목록)"""
+    hub = []
+    sender, receiver = InMemoryBackplane(hub), InMemoryBackplane(hub)
+    received = []
+
+    async def handler(data):
+        received.append(data)
+
+    receiver.subscribe("board", handler)
+    await sender.start()
+    await receiver.start()
+    return sender, receiver, received
+
+
+def test_in_memory_delivers_to_other_workers_only():
+    async def run():
+        sender, receiver, received = await _two_workers()
+        echoed = []
+
+        async def sender_handler(data):
+            echoed.append(data)
+
+        sender.subscribe("board", sender_handler)
+        await sender.publish("board", {"key": 1})
+        assert received == [{"key": 1}]
+        assert echoed == []  # 보낸 워커는 이미 로컬로 전달했으므로 다시 받지 않음
+
+    asyncio.run(run())
+
+
+def test_transactional_publish_is_delivered_only_on_commit(database):
+    async def run():
+        engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=NullPool)
+        sender, receiver, received = await _two_workers()
+        try:
+            async with AsyncSession(engine) as db:
+                await db.execute(text("SELECT 1"))
+                await sender.publish("board", {"key": "rolled back"}, db=db)
+                assert received == []
+                await db.rollback()
+
+                await db.execute(text("SELECT 1"))
+                await sender.publish("board", {"key": "committed"}, db=db)
+                assert received == []
+                await db.commit()
+            await asyncio.sleep(0)  # 커밋 후 예약된 send() 실행
+            assert received == [{"key": "committed"}]
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_board_resync_after_reconnect():
+    subscriber = board_event_manager.subscribe(-1)
+    try:
+        old_epoch = board_event_manager.epoch
+        board_event_manager._resync_all()
+        assert subscriber.queue.get_nowait() is RESYNC_FRAME
+        # 재연결 전 epoch로 이어받으려는 클라이언트도 전체 보드를 다시 불러와야 함
+        assert board_event_manager.epoch != old_epoch
+        assert board_event_manager._missed_frames(-1, 0, old_epoch) is None
+    finally:
+        board_event_manager.unsubscribe(subscriber, -1)
+
+
+def test_postgres_listen_reconnect_calls_handlers(database):
+    async def run():
+        prefix = f"test_{uuid.uuid4().hex[:8]}_"
+        backplane = PostgresBackplane(prefix=prefix)
+        reconnected = asyncio.Event()
+        backplane.subscribe("board", lambda data: None)
+        backplane.on_reconnect(reconnected.set)
+        await backplane.start()
+        terminate = text(
+            "SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE query = :query AND pid <> pg_backend_pid()"
+        )
+        try:
+            with database.connect() as conn:
+                for _ in range(50):
+                    await asyncio.sleep(0.1)
+                    if conn.execute(terminate, {"query": f'LISTEN "{prefix}board"'}).rowcount:
+                        break
+                else:
+                    pytest.fail("LISTEN connection not found")
+            await asyncio.wait_for(reconnected.wait(), timeout=5)
+        finally:
+            await backplane.stop()
+
+    asyncio.run(run())
+
+
+def test_session_invalidation_reaches_other_workers(monkeypatch):
+    async def run():
+        sender, receiver, received = await _two_workers()
+        receiver.subscribe("session", receiver.handlers["board"])
+        monkeypatch.setattr(session_cache, "backplane", sender)
+        session_id = uuid.uuid4().hex
+
+        # 로그아웃은 쓰레드풀에서 실행되는 동기 라우터
+        await asyncio.to_thread(session_cache.invalidate, session_id)
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert received == [{"invalidate": session_id}]
+
+        # 받은 워커는 캐시해 둔 세션을 제거 (TTL까지 기다리지 않음)
+        session_cache.set(session_id, 1, datetime.now() + timedelta(days=1))
+        await session_cache._on_remote(received[0])
+        assert session_cache.get(session_id) is None
+
+    asyncio.run(run())
@@ -0,0 +1,36 @@
+import pytest
+
+
+def _add_cards(client, project_id: int, column_id: int, file_id: int, user_id: int, count: int):
+    """담당자 1명, 파일 1개가 연결된 카드 count개 + 앞 카드와의 연결선"""
+    previous_id = None
+    for index in range(count):
+        response = client.post(f"/api/projects/{project_id}/cards", json={
+            "title": f"card {index}", "column_id": column_id, "assignee_ids": [user_id]
+        })
+        assert response.status_code == 200, response.text
+        card_id = response.json()["id"]
+        assert client.post(f"/api/cards/{card_id}/files/{file_id}").status_code == 200
+        if previous_id is not None:
+            assert client.post("/api/cards/connections", json={"from": previous_id, "to": card_id}).status_code == 200
+        previous_id = card_id
+
+
+@pytest.mark.parametrize("path", ["board", "board/snapshot", "cards"])
+def test_board_query_count_does_not_depend_on_card_count(client, project_id, query_counter, path):
+    user_id = client.get("/api/users/me").json()["id"]
+    column_id = client.post(f"/api/projects/{project_id}/columns", json={"title": "todo"}).json()["id"]
+    file_id = client.post(
+        f"/api/projects/{project_id}/files", files={"file": ("a.txt", b"hello", "text/plain")}
+    ).json()["id"]
+
+    counts = {}
+    for total, added in ((2, 2), (12, 10)):
+        # 카드 추가 시 보드 캐시가 무효화되므로 매번 DB에서 다시 조회됨
+        _add_cards(client, project_id, column_id, file_id, user_id, added)
+        query_counter.count = 0
+        response = client.get(f"/api/projects/{project_id}/{path}")
+        assert response.status_code == 200, response.text
+        counts[total] = query_counter.count
+
+    assert counts[2] == counts[12], counts
@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import text
+
+from app.routers.chat import chat_page_query
+
+
+def _plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+@pytest.fixture
+def chat_rows(database, client, workspace_id, project_id):
+    """
+    다른 프로젝트 메시지 사이에 섞인 project_id의 메시지 (전체의 1%) - 트랜잭션 안에서만 존재, 끝나면 롤백
+    비중이 크면 기본 키 인덱스를 거꾸로 읽으면서 걸러도 비용이 비슷해서 플래너가 그쪽을 고를 수 있음
+    """
+    other_id = client.post(f"/api/workspaces/{workspace_id}/projects", json={"name": "other"}).json()["id"]
+    user_id = client.get("/api/users/me").json()["id"]
+    with database.connect() as conn:
+        transaction = conn.begin()
+        conn.execute(text(
+            "INSERT INTO chat_messages (project_id, user_id, content, created_at) "
+            "SELECT CASE WHEN g % 100 = 0 THEN :project_id ELSE :other_id END, :user_id, 'message ' || g, now() "
+            "FROM generate_series(1, 200000) g"
+        ), {"project_id": project_id, "other_id": other_id, "user_id": user_id})
+        conn.execute(text("ANALYZE chat_messages"))
+        middle_id = conn.execute(text(
+            "SELECT percentile_disc(0.5) WITHIN GROUP (ORDER BY id) FROM chat_messages WHERE project_id = :project_id"
+        ), {"project_id": project_id}).scalar_one()
+        yield conn, middle_id
+        transaction.rollback()
+
+
+def test_obsolete_chat_index_is_dropped(database):
+    with database.connect() as conn:
+        indexes = set(conn.execute(text(
+            "SELECT indexname FROM pg_indexes WHERE tablename = 'chat_messages'"
+        )).scalars())
+    assert "ix_chat_messages_project_id_id" in indexes
+    assert "ix_chat_messages_project_id" not in indexes
+
+
+@pytest.mark.parametrize("page", ["latest", "before", "after"])
+def test_chat_page_uses_composite_index_without_sort(chat_rows, project_id, page):
+    conn, middle_id = chat_rows
+    query = chat_page_query(
+        project_id, 50,
+        after_id=middle_id if page == "after" else 0,
+        before_id=middle_id if page == "before" else None,
+    )
+    sql = str(query.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar_one()[0]["Plan"]
+
+    nodes = list(_plan_nodes(plan))
+    assert any(node.get("Index Name") == "ix_chat_messages_project_id_id" for node in nodes), plan
+    assert not any(node["Node Type"] == "Sort" for node in nodes), plan